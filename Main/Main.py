@@ -1,28 +1,94 @@
 import streamlit as st
 import time
-from modules.config import WELCOME_MSG
-from modules.db_manager import load_db, update_db, save_log
-from modules.ai_manager import get_ai_response, parse_tools
+import threading
+from modules.config import WELCOME_MSG, STREAM_RESPONSES, LOCAL_PREVIEW_ENABLED, METRICS_PROMETHEUS_PORT, SERVICE_URL
+from modules.db_manager import get_tools_snapshot, get_facets, submit_vote, save_log
+from modules.ai_manager import (
+    get_ai_response, stream_ai_response, StreamStats, parse_tools,
+    build_quick_question, warm_quick_answers, rate_limited_backoff, queue_label, rank_local_tools,
+    record_model_error, answer_version,
+)
+from modules.answer_parser import parse_answer_tools, is_quick_question
+from modules.local_ranker import preview_markdown, degraded_answer
+from modules.metrics import metrics, new_trace, serve_prometheus
+from modules.service_client import get_service_client, RemoteFacets, ServiceError
 from google.api_core import exceptions
 
 st.set_page_config(page_title="Job-Fit AI 네비게이터", page_icon="🤖", layout="wide")
 
+# 계측: 실행(사용자 동작) 1회마다 추적 ID 발급 → 이 실행의 시트/프롬프트/모델/투표 기록을 하나로 묶음
+new_trace()
+serve_prometheus(METRICS_PROMETHEUS_PORT)
+
 # 1. 세션 초기화
 if "messages" not in st.session_state: st.session_state.messages = []
-if "master_df" not in st.session_state: st.session_state.master_df = load_db()
 
-df_tools = st.session_state.master_df
+# 추천 API 서비스(SERVICE_URL)가 설정되면 이 화면은 서비스만 부르는 얇은 클라이언트로 동작
+service = get_service_client() if SERVICE_URL else None
+
+if service is None:
+    # 도구 DB는 프로세스 공용 스냅샷을 사용하고, 세션에는 버전 번호만 기록
+    snapshot = get_tools_snapshot()
+    st.session_state.db_version = snapshot.version
+    df_tools = snapshot.df
+
+    # 직무/상황 목록은 스냅샷별 패싯 인덱스에서 읽기만 함 (rerun 마다 df 를 훑지 않음)
+    facets = get_facets(snapshot)
+
+    # 새 스냅샷이면 빠른 추천 답변을 백그라운드에서 미리 생성 (설정으로 켠 경우)
+    warm_quick_answers(df_tools, snapshot.version, facets)
+    db_loaded, db_source = not df_tools.empty, snapshot.source
+else:
+    try:
+        facets = service.facets()
+    except ServiceError as e:
+        print(f"💥 [서비스 연결 실패] {e}")
+        facets = RemoteFacets.empty()
+    st.session_state.db_version = facets.version
+    db_loaded, db_source = facets.rows > 0, facets.source
+
+SERVICE_DOWN_MSG = "⚠️ 추천 서비스에 연결하지 못했습니다. 잠시 후 다시 시도해 주세요."
+
+def service_vote(action_type, tool_data):
+    # 서비스가 꺼졌거나 재시작 중이면 화면을 멈추지 않고 실패로 돌려줌
+    try:
+        return service.vote(action_type, tool_data)
+    except ServiceError as e:
+        print(f"💥 [서비스 투표 실패] {e}")
+        return False, SERVICE_DOWN_MSG
+
+# 투표도 서비스가 설정되면 서비스로 보냄 (둘 다 (성공 여부, 메시지) 반환)
+vote = service_vote if service is not None else submit_vote
 
 # ==========================================
 # 429 오류 처리 (st.status 사용)
 # ==========================================
+def queue_status(status):
+    # 공용 대기열에서 기다리는 동안 순번/예상 시간을 상태바에 표시
+    def on_wait(position, eta):
+        status.update(label=queue_label(position, eta), state="running")
+    return on_wait
+
+def wait_backoff(status, attempt, max_retries, cancel=None):
+    # 429: 지터가 섞인 대기 시간 동안 상태바에 남은 시간을 표시 (사용자들이 동시에 재시도하지 않도록)
+    remaining = rate_limited_backoff(attempt)
+    while remaining > 0:
+        if cancel is not None and cancel.is_set(): return False
+        status.update(label=f"⏳ 사용량이 많아 잠시 쉬고 있습니다... {remaining:.0f}초 ({attempt + 1}/{max_retries})", state="running")
+        time.sleep(min(1.0, remaining))
+        remaining -= 1.0
+    return True
+
+def cache_version(messages):
+    # 빠른 추천 첫 질문은 (직무, 상황) 도구 목록 해시로 찾음 (미리 만든 답변과 같은 키, 투표로 바뀌지 않음)
+    return answer_version(messages, facets, st.session_state.db_version)
+
 def get_ai_response_safe(messages, df):
     """
     AI 응답을 요청하되, 429 오류가 발생하면 
     상태바(Spinner) 안에서 대기 과정을 보여줍니다.
     """
     max_retries = 3
-    wait_time = 30  # 30초 대기
 
     # st.status를 사용하여 로딩 과정을 깔끔하게 묶기
     with st.status("AI가 답변을 생성하고 있습니다...", expanded=False) as status:
@@ -30,7 +96,8 @@ def get_ai_response_safe(messages, df):
         for attempt in range(max_retries):
             try:
                 # 1. 답변 생성 시도
-                response = get_ai_response(messages, df)
+                response = get_ai_response(messages, df, db_version=cache_version(messages),
+                                           on_wait=queue_status(status))
                 
                 # 성공하면 상태 업데이트 후 반환
                 status.update(label="✅ 답변 생성 완료!", state="complete", expanded=False)
@@ -38,19 +105,95 @@ def get_ai_response_safe(messages, df):
                 
             except exceptions.ResourceExhausted:
                 # 2. 429 오류 발생 시 (이 부분이 핵심!)
-                msg = f"⏳ 사용량이 많아 잠시 쉬고 있습니다... ({attempt + 1}/{max_retries})"
-                status.update(label=msg, state="running") # 상태바 메시지 변경
-            
-                for _ in range(wait_time):
-                    time.sleep(1)
+                record_model_error("answer", "ResourceExhausted", attempt < max_retries - 1)
+                if attempt < max_retries - 1: wait_backoff(status, attempt, max_retries)
                 
             except Exception as e:
                 # 그 외 오류
+                record_model_error("answer", type(e).__name__, False)
                 status.update(label="❌ 오류 발생", state="error")
                 return f"❌ 오류가 발생했습니다: {str(e)}"
 
     return "❌ 재시도 횟수를 초과했습니다. 잠시 후 다시 질문해 주세요."
 
+def stream_ai_response_safe(messages, df, ph):
+    """
+    get_ai_response_safe 의 스트리밍 버전. 받은 청크를 ph 에 바로 이어 그립니다.
+    대화 삭제로 취소되면 None 을 반환합니다.
+    """
+    max_retries = 3
+
+    cancel = threading.Event()
+    st.session_state.stream_cancel = cancel
+
+    with st.status("AI가 답변을 생성하고 있습니다...", expanded=False) as status:
+
+        for attempt in range(max_retries):
+            text = ""
+            stats = StreamStats()
+            stream = stream_ai_response(messages, df, cancel_event=cancel, stats=stats,
+                                        db_version=cache_version(messages),
+                                        on_wait=queue_status(status))
+            try:
+                for chunk in stream:
+                    text += chunk
+                    ph.markdown(text + " ▌")
+
+                if stats.cancelled: return None
+                status.update(label="✅ 답변 생성 완료!", state="complete", expanded=False)
+                return text
+
+            except exceptions.ResourceExhausted:
+                ph.empty()
+                record_model_error("stream", "ResourceExhausted", attempt < max_retries - 1)
+                if attempt < max_retries - 1 and not wait_backoff(status, attempt, max_retries, cancel):
+                    return None
+
+            except Exception as e:
+                record_model_error("stream", type(e).__name__, False)
+                status.update(label="❌ 오류 발생", state="error")
+                return f"❌ 오류가 발생했습니다: {str(e)}"
+
+            finally:
+                # 중간에 rerun(대화 삭제 등)으로 빠져나와도 스트림을 닫음
+                stream.close()
+
+    return "❌ 재시도 횟수를 초과했습니다. 잠시 후 다시 질문해 주세요."
+
+def service_answer(messages, preview, ph, job, situation):
+    """
+    서비스 모드 답변. 서비스가 보내는 이벤트(미리보기 → 대기 상태/청크 → 완료)를 받는 대로 그립니다.
+    429 재시도, 대체 답변, 로그 저장은 서비스가 처리합니다. 반환: (답변, 추출된 도구, 대체 답변 여부)
+    """
+    done, text = None, ""
+    with st.status("AI가 답변을 생성하고 있습니다...", expanded=False) as status:
+        try:
+            events = service.recommend_stream(messages, st.session_state.get("USER_API_KEY"), job, situation)
+            for event in events:
+                kind = event["type"]
+                if kind == "preview" and LOCAL_PREVIEW_ENABLED and event["tools"]:
+                    with preview.container(border=True): st.markdown(preview_markdown(event["tools"]))
+                elif kind == "status":
+                    status.update(label=event["label"], state="running")
+                elif kind == "reset":
+                    text = ""
+                    ph.empty()
+                elif kind == "chunk":
+                    text += event["text"]
+                    ph.markdown(text + " ▌")
+                elif kind == "done":
+                    done = event
+        except ServiceError as e:
+            done = None
+            print(f"💥 [서비스 답변 실패] {e}")
+
+        if done is None:
+            status.update(label="❌ 오류 발생", state="error")
+            return "❌ 추천 서비스에 연결하지 못했습니다. 잠시 후 다시 질문해 주세요.", [], False
+        if done["answer"].startswith("❌"): status.update(label="❌ 오류 발생", state="error")
+        else: status.update(label="✅ 답변 생성 완료!", state="complete", expanded=False)
+    return done["answer"], done["tools"], done["degraded"]
+
 # [핵심] AI가 답변 생성 중인지 확인
 is_generating = False
 if st.session_state.messages and st.session_state.messages[-1]["role"] == "user":
@@ -65,6 +208,8 @@ def reset_conditions():
 
 # [함수 2] 대화 내용까지 싹 다 초기화하는 함수
 def reset_all():
+    # 답변 스트리밍 중이면 취소
+    if "stream_cancel" in st.session_state: st.session_state.stream_cancel.set()
     st.session_state.messages = []
     reset_conditions()
     for k in list(st.session_state.keys()):
@@ -113,24 +258,20 @@ with st.sidebar:
     if "sb_situation" not in st.session_state: st.session_state.sb_situation = "직접 입력"
     if "sb_output" not in st.session_state: st.session_state.sb_output = []
 
-    if not df_tools.empty:
-        st.success("✅ DB 연결 완료")
+    if db_loaded:
+        if db_source == "disk": st.info("💾 저장된 DB 사본으로 표시 중 (최신 데이터 확인 중)")
+        else: st.success("✅ DB 연결 완료")
     else:
         st.error("DB 연결 실패")
     
     # 4. 직무, 상황, 결과물 선택창 (기존 코드 유지)
-    if not df_tools.empty:
-        current_jobs = sorted(df_tools['직무'].astype(str).unique().tolist())
-        current_jobs = [j for j in current_jobs if j != "직접 입력"]
-        job_options = ["직접 입력"] + current_jobs
-    else:
-        job_options = ["직접 입력"]
+    job_options = facets.job_options()
         
     selected_job = st.selectbox("직무", job_options, key="sb_job", disabled=is_generating)
     
     selected_situation = "직접 입력"
     if selected_job != "직접 입력":
-        sits = sorted(df_tools[df_tools['직무'] == selected_job]['상황'].astype(str).unique().tolist())
+        sits = facets.situation_options(selected_job)
         selected_situation = st.selectbox("상황", ["직접 입력"] + sits, key="sb_situation", disabled=is_generating)
 
     output_format = st.multiselect("결과물 양식", ["보고서", "PPT", "이미지", "영상", "엑셀", "코드"], key="sb_output", disabled=is_generating)
@@ -149,8 +290,7 @@ with st.sidebar:
         st.button("🗑️ 대화 삭제", 
                   type="primary", 
                   use_container_width=True, 
-                  key="btn_reset_all", # 명시적 키 부여
-                  disabled=is_generating,
+                  key="btn_reset_all", # 명시적 키 부여 (답변 생성 중에도 취소용으로 활성화)
                   on_click=reset_all)
 
     # 6. GitHub 홍보
@@ -171,6 +311,11 @@ with st.sidebar:
 st.title("🚀 Job-Fit AI 네비게이터")
 st.markdown(WELCOME_MSG)
 
+# 투표 결과 알림 (버튼 클릭 → rerun 뒤에 띄워야 바로 사라지지 않음)
+if "vote_toast" in st.session_state:
+    toast_msg, toast_icon = st.session_state.pop("vote_toast")
+    st.toast(toast_msg, icon=toast_icon)
+
 
 for i, m in enumerate(st.session_state.messages):
     with st.chat_message(m["role"]):
@@ -182,10 +327,19 @@ for i, m in enumerate(st.session_state.messages):
                 if st.button("🛠️ 도구 저장/피드백", key=f"btn_{i}", disabled=is_generating):
                     with st.status("답변을 분석하고 도구를 추출하고 있습니다...", expanded=False) as status:
                         u_q = st.session_state.messages[i-1]["content"] if i>0 else ""
-                        found = parse_tools(u_q, m["content"])
+                        found, failed = [], False
+                        if service is not None:
+                            try:
+                                found = service.extract(u_q, m["content"], st.session_state.get("USER_API_KEY"))
+                            except ServiceError as e:
+                                print(f"💥 [서비스 추출 실패] {e}")
+                                failed = True
+                        else:
+                            found = parse_tools(u_q, m["content"])
                         if found:
                             st.session_state[t_key] = found
                             st.rerun()
+                        elif failed: st.warning(SERVICE_DOWN_MSG)
                         else: st.warning("추출된 도구가 없습니다.")
             else:
                 tools = st.session_state[t_key]
@@ -195,27 +349,24 @@ for i, m in enumerate(st.session_state.messages):
                     with c1: st.markdown(f"**🔧 {t['추천도구']}**")
                     with c2:
                         if st.button("👍", key=f"like_{i}_{t['추천도구']}", disabled=is_generating):
-                            suc, msg, new_df = update_db('like', t, st.session_state.master_df)
+                            suc, msg = vote('like', t)
                             if suc:
-                                st.session_state.master_df = new_df
-                                st.toast(msg, icon="✅")
-                                time.sleep(1.5)
-                            st.rerun()
+                                st.session_state.vote_toast = (msg, "✅")
+                                st.rerun()
+                            st.warning(msg)
                     with c3:
                         if st.button("👎", key=f"dislike_{i}_{t['추천도구']}", disabled=is_generating):
-                            suc, msg, new_df = update_db('dislike', t, st.session_state.master_df)
-                            if suc and msg != "SILENT":
-                                st.session_state.master_df = new_df
-                                st.toast(msg, icon="📉")
-                                time.sleep(1.5)
-                            st.rerun()
+                            suc, msg = vote('dislike', t)
+                            if suc:
+                                st.session_state.vote_toast = (msg, "📉")
+                                st.rerun()
+                            if msg != "SILENT": st.warning(msg)
 
 # ==========================================
 # 4. 빠른 추천 버튼 & 질문 처리
 # ==========================================
 def quick_ask(job, sit, out):
-    outs_msg = f" (필요한 결과물: {', '.join(out)})" if out else ""
-    q = f"나의 직무는 **{job}**인데, **{sit}** 업무 할 때 도움되는 AI 도구 좀 추천해 줘.{outs_msg}"
+    q = build_quick_question(job, sit, out)
     st.session_state.messages.append({"role": "user", "content": q})
     st.session_state.sb_job = "직접 입력"
     st.session_state.sb_situation = "직접 입력"
@@ -241,16 +392,43 @@ if prompt := st.chat_input("어떤 업무 때문에 고민이신가요?(예시 :
 # ==========================================
 if st.session_state.messages and st.session_state.messages[-1]["role"] == "user":
     with st.chat_message("assistant"):
+        turn_started = time.perf_counter()
+        preview = st.empty()
         ph = st.empty()
-        
-        # 함수 호출
-        response_text = get_ai_response_safe(st.session_state.messages, st.session_state.master_df)
-        
+        log_job = selected_job if selected_job != "직접 입력" else "직접/기타"
+        log_sit = selected_situation if selected_situation != "직접 입력" else "직접/기타"
+
+        if service is not None:
+            # 미리보기/답변/대체 답변/로그/도구 추출 모두 서비스가 처리 (이 화면은 받아서 그리기만)
+            response_text, found, degraded = service_answer(st.session_state.messages, preview, ph, log_job, log_sit)
+        else:
+            # 모델 답변을 기다리는 동안 로컬 DB 추천을 먼저 표시 (수 ms, 모델 호출 없음)
+            local_tools = rank_local_tools(st.session_state.messages[-1]["content"], df_tools, facets.job_names())
+            if LOCAL_PREVIEW_ENABLED and local_tools:
+                with preview.container(border=True): st.markdown(preview_markdown(local_tools))
+
+            # 함수 호출
+            if STREAM_RESPONSES:
+                response_text = stream_ai_response_safe(st.session_state.messages, df_tools, ph)
+                if response_text is None: st.rerun()  # 사용자가 대화를 삭제해 취소됨
+            else:
+                response_text = get_ai_response_safe(st.session_state.messages, df_tools)
+
+            # 재시도 소진/API 키 오류: 오류 문구 대신 로컬 DB 추천으로 답변 (로그에는 남기지 않음)
+            degraded = response_text.startswith(("❌", "⚠️")) and bool(local_tools)
+            if degraded: response_text = degraded_answer(local_tools, response_text)
+
+            # 빠른 추천 질문이면 답변 양식에서 도구를 바로 추출해 두어 피드백 버튼이 즉시 표시됨
+            # (자유 질문은 직무/상황을 AI 가 유추해야 하므로 버튼으로 AI 추출)
+            question = st.session_state.messages[-1]["content"]
+            found = parse_answer_tools(question, response_text) if is_quick_question(question) else []
+            if not response_text.startswith("❌") and not degraded:
+                save_log(log_job, log_sit, st.session_state.messages[-1]["content"], response_text)
+        preview.empty()
+        metrics.observe_seconds("turn.answer", time.perf_counter() - turn_started,
+                                stream=STREAM_RESPONSES, degraded=degraded)
+
         ph.markdown(response_text)
         st.session_state.messages.append({"role": "assistant", "content": response_text})
-        
-        if not response_text.startswith("❌"):
-            log_job = selected_job if selected_job != "직접 입력" else "직접/기타"
-            log_sit = selected_situation if selected_situation != "직접 입력" else "직접/기타"
-            save_log(log_job, log_sit, st.session_state.messages[-2]["content"], response_text) 
+        if found: st.session_state[f"tools_{len(st.session_state.messages) - 1}"] = found
         st.rerun()
\ No newline at end of file
@@ -0,0 +1 @@
+# 오프라인 벤치마크 모음 (Main 폴더에서 `python -m benchmarks.<이름>` 으로 실행)
@@ -0,0 +1,49 @@
+import time
+import google.generativeai as genai
+from modules.client_pool import ModelPool
+from modules.config import MODEL_NAME
+
+# ---------------------------------------------------------
+# 요청당 모델 준비 비용: 매번 configure + 생성 vs 키별 풀 재사용
+#   (네트워크 호출 없이 클라이언트/모델 객체 생성 비용만 측정)
+#   실행: (Main 폴더에서) python -m benchmarks.bench_client_pool
+# ---------------------------------------------------------
+N = 200
+KEYS = [f"fake-key-{i}" for i in range(4)]
+SYSTEM = "역할: 'Job-Fit AI 도구 큐레이터'\n" * 50
+
+
+def system_prompt(i):
+    # 턴마다 DB 컨텍스트가 달라지므로 시스템 프롬프트도 매번 다름
+    return f"{SYSTEM}[DB 컨텍스트 {i}]"
+
+
+def legacy_setup(api_key, system):
+    # 기존 방식: 호출마다 전역 configure 후 모델 두 개 생성
+    genai.configure(api_key=api_key)
+    genai.GenerativeModel(MODEL_NAME, generation_config={"temperature": 0.7})
+    model = genai.GenerativeModel(MODEL_NAME, system_instruction=system)
+    # 실제 첫 요청 시점에 만들어지는 전역 클라이언트 생성 비용까지 포함
+    from google.generativeai import client
+    client.get_default_generative_client()
+    return model
+
+
+def main():
+    start = time.perf_counter()
+    for i in range(N): legacy_setup(KEYS[i % len(KEYS)], system_prompt(i))
+    legacy = (time.perf_counter() - start) / N
+
+    pool = ModelPool()
+    start = time.perf_counter()
+    for i in range(N): pool.get(KEYS[i % len(KEYS)], MODEL_NAME).start_chat([], system_instruction=system_prompt(i))
+    pooled = (time.perf_counter() - start) / N
+    # 시스템 프롬프트가 매번 달라도 키별 모델 하나로 재사용
+    assert pool.misses == len(KEYS) and pool.hits == N - len(KEYS)
+
+    print(f"legacy configure+build : {legacy * 1e6:9.1f} µs/request")
+    print(f"pooled (LRU hit)       : {pooled * 1e6:9.1f} µs/request  (hits={pool.hits}, misses={pool.misses})")
+
+
+if __name__ == "__main__":
+    main()
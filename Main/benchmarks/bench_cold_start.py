@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+from modules import ai_manager, db_manager
+from modules.disk_snapshot import DiskSnapshotCache
+from modules.sheets_backend import SheetsStorage
+from modules.snapshot import ToolSnapshotStore
+from .fake_gemini import FakeGenerativeModel, install
+from .fake_sheets import FakeWorksheet, FakeClient, make_rows
+
+# ---------------------------------------------------------
+# 콜드 스타트: 첫 스냅샷/첫 화면까지의 시간 (디스크 사본 없음 vs 있음)
+#   실행: (Main 폴더에서) python -m benchmarks.bench_cold_start
+# ---------------------------------------------------------
+# 가짜 시트는 실제로 대기합니다 (왕복 RTT + 셀당 전송 비용).
+SIZES = [1_000, 5_000, 20_000]
+RTT = 0.3
+PER_CELL = 0.00002
+RENDER_ROWS = 5_000
+
+
+def make_sheet(n):
+    ws = FakeWorksheet(make_rows(n), rtt=RTT, per_cell=PER_CELL, sleep=True)
+    return ws, SheetsStorage(lambda: FakeClient(ws), "fake://sheet")
+
+
+def make_store(storage, disk=None):
+    return ToolSnapshotStore(storage.load_tools, ttl=300, stamp_fn=storage.revision, disk=disk)
+
+
+def first_get(store):
+    start = time.perf_counter()
+    snap = store.get()
+    return time.perf_counter() - start, snap
+
+
+def run(n, tmp):
+    ws, storage = make_sheet(n)
+    cold, _ = first_get(make_store(storage))
+
+    disk = DiskSnapshotCache(os.path.join(tmp, f"tools-{n}.arrow"))
+    make_store(storage, disk).get()          # 이전 실행이 사본을 남겼다고 가정
+    size_kb = os.path.getsize(disk.path) / 1024
+
+    # 시트가 그대로인 재시작: 사본으로 즉시 응답 → 수정 시각만 확인하고 끝
+    store = make_store(storage, disk)
+    ws.reset_stats()
+    warm, snap = first_get(store)
+    store.wait_refresh()
+    same_calls = ws.calls
+    same_version = store.get().version == snap.version
+
+    # 시트가 바뀐 재시작: 사본으로 즉시 응답 → 백그라운드에서 새 버전으로 교체
+    ws.update_cell(2, 9, 999)
+    store = make_store(storage, disk)
+    changed, snap = first_get(store)
+    store.wait_refresh()
+    swapped = store.get().version != snap.version and int(store.get().df.loc[0, '추천수']) == 999
+    return cold, warm, changed, size_kb, same_calls, same_version, swapped
+
+
+def render_time(storage, disk):
+    # Main.py 첫 실행(사이드바 + 환영 화면)까지의 시간
+    from streamlit.testing.v1 import AppTest
+    store = make_store(storage, disk)
+    db_manager.get_snapshot_store = lambda: store
+    at = AppTest.from_file(os.path.join(os.path.dirname(__file__), "..", "Main.py"), default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception: raise RuntimeError(at.exception)
+    store.wait_refresh()
+    return elapsed
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'rows':>7} | {'no cache s':>10} | {'cached s':>9} | {'changed s':>9} | {'file KB':>8} | revalidate")
+        for n in SIZES:
+            cold, warm, changed, size_kb, calls, kept, swapped = run(n, tmp)
+            print(f"{n:>7} | {cold:>10.3f} | {warm:>9.4f} | {changed:>9.4f} | {size_kb:>8.0f} | "
+                  f"unchanged: {calls} API call, kept={kept}; changed: swapped={swapped}")
+
+        install(ai_manager, FakeGenerativeModel())
+        ws, storage = make_sheet(RENDER_ROWS)
+        disk = DiskSnapshotCache(os.path.join(tmp, "render.arrow"))
+        render_time(storage, None)   # import/초기화 비용을 먼저 치름
+        no_cache = render_time(storage, None)
+        make_store(storage, disk).get()
+        cached = render_time(storage, disk)
+        print(f"first render ({RENDER_ROWS} rows): no cache {no_cache:.2f}s, cached {cached:.2f}s")
@@ -0,0 +1,74 @@
+import time
+import pandas as pd
+from modules.config import CONTEXT_FIELD_CAPS, RETRIEVAL_TOP_K
+from modules.context_format import ContextEncoder, FORMATS
+from modules.rate_limiter import estimate_tokens
+from modules.retriever import ToolRetriever
+from .fake_sheets import HEADER
+
+# ---------------------------------------------------------
+# DB 컨텍스트 직렬화 포맷별 크기: 글자 수 / 추정 토큰 수
+#   실행: (Main 폴더에서) python -m benchmarks.bench_context_format
+# ---------------------------------------------------------
+# 실제 시트처럼 같은 도구가 여러 직무/상황에 반복되고(같은 링크), 설명이 긴 테이블을 만듭니다.
+ROWS = 5_000
+TOOLS = 250
+QUESTION = "나의 직무는 **직무3**인데, **상황7** 업무 할 때 도움되는 AI 도구 좀 추천해 줘."
+TIP = ("{name}은(는) {sit} 업무에서 초안 작성, 요약, 자료 조사까지 한 번에 처리할 수 있는 도구입니다. "
+       "프롬프트에 '대상 독자와 분량을 먼저 정해 줘'라고 입력하면 결과물 품질이 좋아지고, "
+       "무료 플랜은 하루 사용량 제한이 있으니 긴 문서는 나눠서 넣는 것을 추천합니다.")
+
+
+def make_table(n):
+    rows = []
+    for i in range(n):
+        t = i % TOOLS
+        name = f"Tool-{t}"
+        sit = f"상황{i % 12}"
+        rows.append([f"직무{i % 40}", sit, "보고서", name, TIP.format(name=name, sit=sit), "무료",
+                     f"https://www.tool{t}.example.com/ko/app", i % 3, i % 7])
+    return pd.DataFrame(rows, columns=HEADER)
+
+
+def measure(encoder, df, positions):
+    start = time.perf_counter()
+    text = encoder.encode(df, positions)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    encoder.encode(df, positions)
+    cached = time.perf_counter() - start
+    return len(text), estimate_tokens(text), cold, cached
+
+
+def main():
+    df = make_table(ROWS)
+    retriever = ToolRetriever()
+    retriever.sync(df)
+    top_k = retriever.query(QUESTION, RETRIEVAL_TOP_K)
+
+    print(f"{ROWS} rows, top-k {RETRIEVAL_TOP_K}, caps {CONTEXT_FIELD_CAPS}")
+    print(f"{'format':>6} | {'full chars':>10} | {'full tokens':>11} | {'top-k chars':>11} | "
+          f"{'top-k tokens':>12} | {'encode ms':>9} | {'cached ms':>9}")
+    base = None
+    for fmt in FORMATS:
+        full_chars, full_tokens, _, _ = measure(ContextEncoder(fmt, caps=CONTEXT_FIELD_CAPS), df, None)
+        encoder = ContextEncoder(fmt, caps=CONTEXT_FIELD_CAPS)
+        chars, tokens, cold, cached = measure(encoder, df, top_k)
+        base = base or tokens
+        print(f"{fmt:>6} | {full_chars:>10} | {full_tokens:>11} | {chars:>11} | "
+              f"{tokens:>12} ({tokens / base:4.0%}) | {cold * 1000:>9.2f} | {cached * 1000:>9.3f}")
+        assert encoder.stats()["hits"] == 1
+
+    # 새 스냅샷(새 df)이면 캐시를 비우고 다시 만듦
+    encoder = ContextEncoder("pipe", caps=CONTEXT_FIELD_CAPS)
+    encoder.encode(df, top_k)
+    changed = df.copy()
+    changed.loc[top_k[0], '특징_및_팁'] = "새로 바뀐 설명"
+    assert "새로 바뀐 설명" in encoder.encode(changed, top_k)
+    print("new snapshot → re-encoded ✅")
+    print("\nsample (pipe, first 4 lines):")
+    print("\n".join(encoder.encode(changed, top_k).splitlines()[:4]))
+
+
+if __name__ == "__main__":
+    main()
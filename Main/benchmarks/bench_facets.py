@@ -0,0 +1,69 @@
+import time
+import pandas as pd
+from modules.db_manager import _local_change
+from modules.facets import FacetIndex
+from .fake_sheets import make_rows, HEADER
+
+# ---------------------------------------------------------
+# 사이드바 rerun 비용: df 전체 unique()/필터 vs 스냅샷별 패싯 인덱스
+#   실행: (Main 폴더에서) python -m benchmarks.bench_facets
+# ---------------------------------------------------------
+SIZES = [1_000, 5_000, 20_000, 100_000]
+RERUNS = 200
+JOB = "직무3"
+
+
+def sidebar_scan(df):
+    # 기존 Main.py 사이드바 코드
+    jobs = ["직접 입력"] + [j for j in sorted(df['직무'].astype(str).unique().tolist()) if j != "직접 입력"]
+    sits = sorted(df[df['직무'] == JOB]['상황'].astype(str).unique().tolist())
+    return jobs, sits
+
+
+def sidebar_facets(facets):
+    return facets.job_options(), facets.situation_options(JOB)
+
+
+def per_rerun(fn, arg):
+    start = time.perf_counter()
+    for _ in range(RERUNS):
+        result = fn(arg)
+    return (time.perf_counter() - start) / RERUNS, result
+
+
+def same(a, b):
+    return (a.job_options() == b.job_options() and a.pairs.keys() == b.pairs.keys()
+            and all(a.count(*k) == b.count(*k) and a.top_tools(*k) == b.top_tools(*k) for k in a.pairs))
+
+
+def run(n):
+    df = pd.DataFrame(make_rows(n), columns=HEADER)
+    scan, expected = per_rerun(sidebar_scan, df)
+
+    facets = FacetIndex()
+    start = time.perf_counter()
+    facets.sync(df)
+    build = time.perf_counter() - start
+    read, got = per_rerun(sidebar_facets, facets)
+    assert got == expected, "패싯 결과가 기존 사이드바와 다름"
+
+    # 투표/추가/삭제: 바뀐 행만 반영 → 처음부터 만든 인덱스와 같아야 함
+    changes = [("Tool-3", 'update', {"score": 42}), ("Tool-4", 'delete', {}),
+               ("새 도구", 'append', {"new_row": dict(zip(HEADER, ["새 직무", "새 상황", "보고서", "새 도구", "", "무료", "", 0, 1]))})]
+    current, elapsed = df, 0.0
+    for target, action, kwargs in changes:
+        new_df, removed, added = _local_change(current, target, action, **kwargs)
+        start = time.perf_counter()
+        assert facets.advance(current, new_df, removed, added)
+        elapsed += time.perf_counter() - start
+        current = new_df
+    assert same(facets, FacetIndex().sync(current)), "증분 반영 결과가 재구성과 다름"
+    return scan, read, build, elapsed / len(changes)
+
+
+if __name__ == "__main__":
+    print(f"{'rows':>7} | {'scan ms/rerun':>13} | {'facet ms/rerun':>14} | {'build ms':>8} | {'advance ms':>10}")
+    for n in SIZES:
+        scan, read, build, advance = run(n)
+        print(f"{n:>7} | {scan * 1000:>13.3f} | {read * 1000:>14.4f} | {build * 1000:>8.1f} | {advance * 1000:>10.4f}")
+    print("incremental updates == rebuild ✅")
@@ -0,0 +1,75 @@
+import time
+import pandas as pd
+from modules import ai_manager
+from modules.config import HISTORY_TOKEN_BUDGET, HISTORY_KEEP_RECENT
+from modules.history import compact_history, history_tokens
+from modules.rate_limiter import estimate_tokens
+from .fake_gemini import CANNED_ANSWER, FakeGenerativeModel, install
+from .fake_sheets import make_rows, HEADER
+
+# ---------------------------------------------------------
+# 대화가 길어질 때 모델에 보내는 이전 대화 크기: 전체 재전송 vs 토큰 예산 압축
+#   실행: (Main 폴더에서) python -m benchmarks.bench_history
+# ---------------------------------------------------------
+# 턴 수가 늘어도 압축본이 예산을 넘지 않는지, 최근 메시지는 원문 그대로인지 확인합니다.
+# 답변이 아주 길면(예산보다 큰 답변) 최근 메시지만으로 예산을 넘을 수 있으나, 최근 메시지는 자르지 않습니다.
+TURNS = [1, 5, 20, 100, 300]
+LONG_ANSWER = CANNED_ANSWER * 8
+
+
+def conversation(turns, answer=CANNED_ANSWER):
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"나의 직무는 **직무{i % 7}**인데, **상황{i}** 업무 할 때 도움되는 AI 도구 좀 추천해 줘."})
+        messages.append({"role": "assistant", "content": answer})
+    messages.append({"role": "user", "content": "방금 추천한 것 중에 무료인 것만 다시 알려줘"})
+    return messages
+
+
+def check(messages, history):
+    tokens = history_tokens(history)
+    recent = [m["content"] for m in messages[:-1][-HISTORY_KEEP_RECENT:]]
+    # 예산은 최근 메시지를 뺀 나머지(오래된 대화 + 생략 요약 줄)에만 적용
+    older = history_tokens(history[:-len(recent)]) if recent else tokens
+    assert older <= HISTORY_TOKEN_BUDGET, f"예산 초과: {older}"
+    if sum(estimate_tokens(text) for text in recent) <= HISTORY_TOKEN_BUDGET:
+        assert tokens <= HISTORY_TOKEN_BUDGET, f"예산 초과: {tokens}"
+    # 최근 메시지는 원문 그대로 (앞 대화를 모두 뺐으면 첫 질문 앞에 생략 요약 줄이 붙음)
+    kept = [h["parts"][0] for h in history[-len(recent):]] if recent else []
+    assert len(kept) == len(recent) and all(k.endswith(r) for k, r in zip(kept, recent)), "최근 메시지가 바뀜"
+    roles = [h["role"] for h in history]
+    assert all(a != b for a, b in zip(roles, roles[1:])), "역할이 번갈아 이어지지 않음"
+    return tokens
+
+
+def main():
+    print(f"budget {HISTORY_TOKEN_BUDGET} tokens, keep {HISTORY_KEEP_RECENT} recent messages")
+    print(f"{'turns':>6} | {'full tokens':>11} | {'compacted':>9} | {'messages':>8} | {'compact ms':>10}")
+    for turns in TURNS:
+        messages = conversation(turns)
+        full = sum(estimate_tokens(m["content"]) for m in messages[:-1])
+        start = time.perf_counter()
+        history = compact_history(messages, HISTORY_TOKEN_BUDGET, HISTORY_KEEP_RECENT)
+        elapsed = (time.perf_counter() - start) * 1000
+        tokens = check(messages, history)
+        print(f"{turns:>6} | {full:>11} | {tokens:>9} | {len(history):>8} | {elapsed:>10.2f}")
+
+    # 예산보다 긴 답변: 최근 메시지는 그대로, 오래된 대화만 요약/생략
+    for turns in (1, 20, 300):
+        messages = conversation(turns, LONG_ANSWER)
+        history = compact_history(messages, HISTORY_TOKEN_BUDGET, HISTORY_KEEP_RECENT)
+        tokens = check(messages, history)
+        print(f"long answers, {turns} turns: {tokens} tokens, {len(history)} messages (recent kept verbatim) ✅")
+
+    # 실제 채팅 세션에 들어가는 history 도 같은지 (가짜 모델)
+    fake = install(ai_manager, FakeGenerativeModel(first_delay=0.0, interval=0.0))
+    df = pd.DataFrame(make_rows(100), columns=HEADER)
+    messages = conversation(TURNS[-1])
+    chat = ai_manager._start_chat(messages, df)
+    check(messages, chat.history)
+    print(f"start_chat({TURNS[-1]} turns): history {history_tokens(chat.history)} tokens ✅")
+    return fake
+
+
+if __name__ == "__main__":
+    main()
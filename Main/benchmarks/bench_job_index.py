@@ -0,0 +1,88 @@
+import difflib
+import random
+import time
+from modules.config import JOB_MATCH_CUTOFF
+from modules.job_index import JobTitleIndex
+
+# ---------------------------------------------------------
+# 신규 도구 직무 표준화: difflib 선형 탐색 vs 글자 색인 (결과가 같아야 함)
+#   실행: (Main 폴더에서) python -m benchmarks.bench_job_index
+# ---------------------------------------------------------
+SIZES = [100, 1_000, 10_000]
+QUERIES = 300
+FIELDS = ["마케팅", "퍼포먼스 마케팅", "데이터", "백엔드", "프론트엔드", "UX", "콘텐츠", "영업", "인사", "재무",
+          "회계", "법무", "물류", "구매", "품질", "생산", "연구", "교육", "고객지원", "브랜드", "서비스", "보안",
+          "클라우드", "게임", "영상", "광고", "전략", "사업개발", "디자인", "IT"]
+LEVELS = ["", "주니어 ", "시니어 ", "수석 ", "책임 "]
+ROLES = ["매니저", "분석가", "엔지니어", "디자이너", "기획자", "담당자", "리드", "전문가", "컨설턴트", "개발자", "PM", "운영자"]
+
+
+def job_titles(n, rng):
+    titles = {f"{lvl}{field} {role}" for field in FIELDS for lvl in LEVELS for role in ROLES}
+    titles = sorted(titles)
+    i = 0
+    while len(titles) < n:   # 팀/지역 이름을 붙여 어휘 확장
+        titles.append(f"{rng.choice(FIELDS)}{i % 97}팀 {rng.choice(ROLES)}")
+        i += 1
+    return titles[:n]
+
+
+def typo(title, rng):
+    chars = list(title)
+    op = rng.randrange(4)
+    pos = rng.randrange(len(chars))
+    if op == 0 and len(chars) > 2: del chars[pos]
+    elif op == 1: chars.insert(pos, rng.choice("가나다라 마케팅"))
+    elif op == 2 and pos + 1 < len(chars): chars[pos], chars[pos + 1] = chars[pos + 1], chars[pos]
+    return "".join(chars).replace("  ", " ")
+
+
+def queries(titles, rng):
+    out = [typo(rng.choice(titles), rng) for _ in range(QUERIES * 2 // 3)]
+    out += [rng.choice(["요리사", "우주비행사", "바리스타", "데이타 분석", "마켓팅", "개발"]) for _ in range(QUERIES // 3)]
+    return [q.strip() for q in out]
+
+
+def run(n, rng):
+    titles = job_titles(n, rng)
+    qs = queries(titles, rng)
+
+    start = time.perf_counter()
+    expected = []
+    for q in qs:
+        m = difflib.get_close_matches(q, titles, n=1, cutoff=JOB_MATCH_CUTOFF)
+        expected.append(m[0] if m else None)
+    linear = (time.perf_counter() - start) / len(qs)
+
+    start = time.perf_counter()
+    index = JobTitleIndex().sync(titles)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    got = [index.close_match(q, JOB_MATCH_CUTOFF) for q in qs]
+    indexed = (time.perf_counter() - start) / len(qs)
+
+    mismatches = [(q, e, g) for q, e, g in zip(qs, expected, got) if e != g]
+    assert not mismatches, f"difflib 과 결과가 다름: {mismatches[:3]}"
+    matched = sum(e is not None for e in expected)
+    return linear, indexed, build, index.scored / len(qs), matched, len(qs)
+
+
+def alias_demo():
+    index = JobTitleIndex()
+    index.sync(["마케팅 매니저", "데이터 분석가"])
+    job = index.normalize("마케팅매니져")
+    index.propose("Tool-A", "마케팅매니져", job)
+    index.confirm("Tool-A")
+    before = index.scored
+    assert index.normalize("마케팅매니져") == "마케팅 매니저" and index.scored == before
+    print(f"alias: '마케팅매니져' → '{job}' (second lookup without scoring) ✅")
+
+
+if __name__ == "__main__":
+    rng = random.Random(7)
+    print(f"{'titles':>7} | {'difflib ms/q':>12} | {'index ms/q':>10} | {'build ms':>8} | {'scored/q':>8} | matched")
+    for n in SIZES:
+        linear, indexed, build, scored, matched, total = run(n, rng)
+        print(f"{n:>7} | {linear * 1000:>12.3f} | {indexed * 1000:>10.3f} | {build * 1000:>8.1f} | {scored:>8.1f} | "
+              f"{matched}/{total} (identical to difflib)")
+    alias_demo()
@@ -0,0 +1,147 @@
+import argparse
+import logging
+import threading
+import time
+import pandas as pd
+from google.api_core import exceptions
+from modules import ai_manager
+from modules.key_pool import KeyPool, key_id
+from .fake_gemini import FakeGenerativeModel, QuotaBackend, FaultInjector, InvalidKey, install_keys
+from .fake_sheets import make_rows, HEADER
+
+# ---------------------------------------------------------
+# 공용 키 풀: 키마다 할당량을 강제하는 가짜 백엔드 + 잘못된 키 1개에 동시 사용자 몰리기
+#   1) 키 1개 vs 키 N개(+ 잘못된 키): 처리량, 429 수, 잘못된 키 격리
+#   2) 한 키가 계속 503 → 회로 열림(다른 키로 우회) → 복구 후 half_open 시험 호출로 다시 closed
+#   시간 축은 1분 → WINDOW 초로 축소해 실행합니다.
+#   실행: (Main 폴더에서) python -m benchmarks.bench_key_pool
+#         python -m benchmarks.bench_key_pool --keys 4 --sessions 120 --limit 10
+# ---------------------------------------------------------
+WINDOW = 1.0      # 할당량 기준 시간 (원래 60초)
+RETRIES = 6
+RETRYABLE = (exceptions.ResourceExhausted, exceptions.ServiceUnavailable, exceptions.InvalidArgument)
+
+
+def make_backend(n_keys, limit, invalid=True, faults=None):
+    """n_keys 개의 정상 키(키마다 QuotaBackend) + 잘못된 키 1개. 반환: (키 목록, {키: 모델}, {키: 할당량})"""
+    models, quotas = {}, {}
+    for i in range(n_keys):
+        api_key = f"fake-key-{i}"
+        quotas[api_key] = QuotaBackend(limit, WINDOW)
+        models[api_key] = FakeGenerativeModel(first_delay=0.05, interval=0.0, quota=quotas[api_key],
+                                              faults=(faults or {}).get(api_key))
+    if invalid:
+        models["fake-key-bad"] = FakeGenerativeModel(first_delay=0.05, interval=0.0, faults=InvalidKey())
+    return list(models), models, quotas
+
+
+def make_pool(keys, limit, quarantined):
+    return KeyPool(keys, limit, 10 ** 9, failure_threshold=3, cooldown=WINDOW / 2, max_cooldown=4 * WINDOW,
+                   window=WINDOW, on_quarantine=quarantined.append)
+
+
+def run_sessions(df, sessions, tag):
+    """sessions 명이 동시에 한 번씩 질문 (429/503/잘못된 키는 rate_limited_backoff 만큼 쉬고 다시 고른 키로 재시도)."""
+    served, gave_up, latencies = [0], [0], []
+    lock = threading.Lock()
+
+    def session(n):
+        messages = [{"role": "user", "content": f"{tag} 마케터 보고서 도구 추천 {n}"}]
+        start = time.perf_counter()
+        for attempt in range(RETRIES):
+            try:
+                ai_manager.generate_answer(messages, df)
+                with lock:
+                    served[0] += 1
+                    latencies.append(time.perf_counter() - start)
+                return
+            except RETRYABLE:
+                time.sleep(ai_manager.rate_limited_backoff(attempt))
+        with lock: gave_up[0] += 1
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else float("nan")
+    return served[0], gave_up[0], p95, time.perf_counter() - start
+
+
+def print_stats(pool):
+    print(f"    {'key':>12} | {'state':>11} | {'admitted':>8} | {'ok':>4} | {'429':>4} | {'503':>4} | {'invalid':>7}")
+    for s in pool.stats():
+        print(f"    {s['key']:>12} | {s['state']:>11} | {s['admitted']:>8} | {s['ok']:>4} | {s['rate_limited']:>4} | "
+              f"{s['unavailable']:>4} | {s['invalid']:>7}")
+
+
+def throughput(df, n_keys, limit, sessions):
+    print(f"{sessions} sessions, quota {limit}/{WINDOW}s per key")
+    print(f"{'keys':>10} | {'served':>6} | {'gave up':>7} | {'429s':>5} | {'p95 s':>6} | {'total s':>7} | {'req/s':>6}")
+    results = {}
+    for label, n, invalid in (("1", 1, False), (f"{n_keys}+bad", n_keys, True)):
+        keys, models, quotas = make_backend(n, limit, invalid=invalid)
+        quarantined = []
+        pool = install_keys(ai_manager, models, make_pool(keys, limit, quarantined))
+        served, gave_up, p95, total = run_sessions(df, sessions, label)
+        rejected = sum(q.rejected for q in quotas.values())
+        print(f"{label:>10} | {served:>6} | {gave_up:>7} | {rejected:>5} | {p95:>6.2f} | {total:>7.2f} | "
+              f"{served / total:>6.1f}")
+        results[label] = served / total
+        assert gave_up == 0
+        if invalid:
+            print_stats(pool)
+            bad = {s["key"]: s for s in pool.stats()}[key_id("fake-key-bad")]
+            # 잘못된 키는 격리되고 이후 선택되지 않음 (격리 전에 이미 고른 호출만 실패)
+            assert bad["state"] == "quarantined" and quarantined == ["fake-key-bad"]
+            assert bad["invalid"] == models["fake-key-bad"].faults.rejected and len(pool) == n
+            print(f"    bad key quarantined after {bad['invalid']} call(s)")
+    speedup = results[f"{n_keys}+bad"] / results["1"]
+    print(f"pool speedup {speedup:.1f}x with {n_keys} keys")
+    assert speedup > n_keys * 0.6
+
+
+def circuit(df, n_keys, limit, sessions):
+    """첫 키가 계속 503 → open(우회) → 장애가 끝나고 쉬는 시간이 지나면 half_open 시험 호출 → closed"""
+    sick = "fake-key-0"
+    faults = {sick: FaultInjector(rate_503=1.0, seed=7)}
+    keys, models, _ = make_backend(n_keys, limit, invalid=False, faults=faults)
+    pool = install_keys(ai_manager, models, make_pool(keys, limit, []))
+    state = lambda: {s["key"]: s for s in pool.stats()}[key_id(sick)]
+
+    served, gave_up, _, total = run_sessions(df, sessions, "503")
+    during = state()
+    print(f"503 on {key_id(sick)}: served {served}/{sessions} in {total:.2f}s, "
+          f"{during['unavailable']} failures → {during['state']}")
+    assert gave_up == 0 and during["state"] in ("open", "half_open")
+    # 열린 뒤에는 다른 키로 우회하므로 실패가 회로 차단 기준 근처에서 멈춤
+    assert during["unavailable"] < sessions / 4
+
+    faults[sick].rate_503 = 0.0
+    time.sleep(pool.max_cooldown)
+    served, gave_up, _, total = run_sessions(df, sessions, "recovered")
+    after = state()
+    print(f"recovered: served {served}/{sessions} in {total:.2f}s, {key_id(sick)} → {after['state']} "
+          f"({after['ok']} ok)")
+    print_stats(pool)
+    assert gave_up == 0 and after["state"] == "closed" and after["ok"] > 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="공용 키 풀 처리량/회로 차단 벤치마크")
+    parser.add_argument("--keys", type=int, default=3, help="정상 키 수 (잘못된 키 1개 추가)")
+    parser.add_argument("--limit", type=int, default=10, help=f"키 하나의 {WINDOW}초당 허용 요청 수")
+    parser.add_argument("--sessions", type=int, default=60)
+    args = parser.parse_args(argv)
+
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    # 재시도 대기도 WINDOW 비율로 축소
+    ai_manager.RATE_LIMIT_BACKOFF_BASE = WINDOW / 4
+    ai_manager.KEY_SWITCH_DELAY = 0.05
+    df = pd.DataFrame(make_rows(500), columns=HEADER)
+    throughput(df, args.keys, args.limit, args.sessions)
+    circuit(df, args.keys, args.limit, args.sessions)
+
+
+if __name__ == "__main__":
+    main()
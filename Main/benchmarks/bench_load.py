@@ -0,0 +1,280 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+import streamlit as st
+from google.api_core import exceptions
+from modules import ai_manager, db_manager
+from modules.metrics import metrics, summarize
+from modules.rate_limiter import backoff_delay
+from modules.sheets_backend import SheetsStorage
+from .fake_gemini import FakeGenerativeModel, FaultInjector, QuotaBackend, install, make_answer
+from .fake_sheets import FakeWorksheet, FakeClient, FakeAPIError, make_rows, SHEETS_QUOTA_PER_MIN
+
+# ---------------------------------------------------------
+# 오프라인 부하 벤치마크: 가짜 Gemini + 가짜 시트로 사용자 턴 전체를 N 개 세션이 동시에 반복
+#   실행: (Main 폴더에서) python -m benchmarks.bench_load
+#         python -m benchmarks.bench_load --rows 1000 10000 --sessions 32 --turns 5 --rate-429 0.05 --rate-503 0.02
+#         python -m benchmarks.bench_load --save base.json        # 기준 저장
+#         python -m benchmarks.bench_load --baseline base.json    # p95 가 기준보다 나빠지면 종료 코드 1
+# ---------------------------------------------------------
+# 세션 1개 = load_db 1회 + 턴 반복. 턴 = 스냅샷 → get_ai_response(429 는 Main 처럼 백오프 재시도)
+#          → parse_tools → update_db(👍) → save_log
+# 시크릿/네트워크 없이 db_manager.get_storage 와 ai_manager 의 키/모델 함수만 대역으로 바꿔 끼웁니다.
+STAGES = ["load_db", "snapshot", "get_ai_response", "ttft", "parse_tools", "update_db", "save_log", "turn"]
+MAX_RETRIES = 3          # Main.get_ai_response_safe 와 같은 시도 횟수
+FREE_QUESTION_RATE = 0.3  # 빠른 추천 양식이 아닌 자유 질문 비율 (답변 캐시에 안 맞음)
+NEW_TOOL_RATE = 0.2       # 답변에 DB 에 없는 도구가 섞이는 비율 (신규 등록 경로)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+        self.counts = defaultdict(int)
+
+    def add(self, stage, seconds):
+        with self.lock: self.samples[stage].append(seconds)
+
+    def error(self, stage, kind):
+        with self.lock: self.errors[stage][kind] += 1
+
+    def bump(self, name, n=1):
+        with self.lock: self.counts[name] += n
+
+    def time(self, stage):
+        recorder = self
+
+        class _Span:
+            def __enter__(self):
+                self.started = time.perf_counter()
+
+            def __exit__(self, exc_type, exc, tb):
+                recorder.add(stage, time.perf_counter() - self.started)
+                if exc_type is not None: recorder.error(stage, exc_type.__name__)
+                return False
+        return _Span()
+
+    def report(self):
+        out = {}
+        for stage in STAGES:
+            values = self.samples.get(stage)
+            if not values: continue
+            out[stage] = {"n": len(values), "errors": sum(self.errors[stage].values()),
+                          "p50": percentile(values, 0.5), "p95": percentile(values, 0.95),
+                          "p99": percentile(values, 0.99)}
+        return out
+
+
+class ListSink:
+    """계측 이벤트를 메모리에 모으는 sink (단계별 내부 지연 분해용)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = []
+
+    def write(self, event):
+        with self.lock: self.events.append(event)
+
+
+# --- 환경 구성 ---
+def fake_answers(names, seed):
+    """질문마다 DB 도구 2개 (+ 가끔 신규 도구) 를 섹션 1 에 넣은 답변."""
+    rng, lock, counter = random.Random(seed), threading.Lock(), iter(range(10 ** 9))
+
+    def answer(prompt):
+        with lock:
+            picks = rng.sample(names, 2)
+            if rng.random() < NEW_TOOL_RATE: picks.append(f"NewTool-{next(counter)}")
+        return make_answer(picks)
+    return answer
+
+
+def setup(args, rows, tmp):
+    """프로세스 공용 캐시를 비우고 가짜 시트/모델을 연결합니다. 반환: (시트, 로그 시트, 모델, 장애 주입기)"""
+    st.cache_resource.clear()
+    db_manager.SNAPSHOT_CACHE_PATH = None
+    db_manager.LOG_SPOOL_PATH = os.path.join(tmp, f"log-{rows}.jsonl")
+    db_manager.VOTE_JOURNAL_PATH = os.path.join(tmp, f"votes-{rows}.jsonl")
+    db_manager.JOB_ALIAS_PATH = os.path.join(tmp, f"aliases-{rows}.json")
+
+    quota = QuotaBackend(args.sheet_quota, 60.0, error=FakeAPIError) if args.sheet_quota else None
+    ws = FakeWorksheet(make_rows(rows), rtt=args.sheet_rtt, per_cell=args.sheet_per_cell, sleep=True, quota=quota)
+    log_ws = FakeWorksheet([], rtt=args.sheet_rtt, per_cell=args.sheet_per_cell, sleep=True, quota=quota)
+    storage = SheetsStorage(lambda: FakeClient(ws, log_ws), "fake://sheet")
+    db_manager.get_storage = lambda: storage
+
+    faults = FaultInjector(args.rate_429, args.rate_503, seed=args.seed)
+    model = FakeGenerativeModel(fake_answers([f"Tool-{i}" for i in range(rows)], args.seed),
+                                first_delay=args.model_latency, interval=args.chunk_interval,
+                                chunk_size=200, faults=faults)
+    install(ai_manager, model)
+    return ws, log_ws, model, faults, quota
+
+
+# --- 세션 ---
+def ask(messages, snap, args, recorder):
+    """Main.get_ai_response_safe / stream_ai_response_safe 와 같은 429 재시도 (대기 시간만 축소)."""
+    for attempt in range(MAX_RETRIES):
+        try:
+            if args.stream:
+                stats = ai_manager.StreamStats()
+                text = "".join(ai_manager.stream_ai_response(messages, snap.df, stats=stats, db_version=snap.version))
+                if stats.ttft is not None: recorder.add("ttft", stats.ttft)
+                return text
+            return ai_manager.get_ai_response(messages, snap.df, db_version=snap.version)
+        except exceptions.ResourceExhausted:
+            recorder.bump("retry_429")
+            if attempt < MAX_RETRIES - 1: time.sleep(backoff_delay(attempt, base=args.backoff))
+        except Exception as e:
+            return f"❌ 오류가 발생했습니다: {e}"
+    return "❌ 재시도 횟수를 초과했습니다."
+
+
+def session(sid, args, recorder, rng):
+    with recorder.time("load_db"):
+        db_manager.load_db()
+    for turn in range(args.turns):
+        with recorder.time("turn"):
+            with recorder.time("snapshot"):
+                snap = db_manager.get_tools_snapshot()
+            row = snap.df.iloc[rng.randrange(len(snap.df))]
+            job, sit = str(row['직무']), str(row['상황'])
+            if rng.random() < FREE_QUESTION_RATE:
+                question = f"[세션 {sid}-{turn}] {sit} 업무를 빨리 끝낼 수 있는 AI 도구 추천해줘"
+            else:
+                question = ai_manager.build_quick_question(job, sit, [])
+            messages = [{"role": "user", "content": question}]
+
+            with recorder.time("get_ai_response"):
+                answer = ask(messages, snap, args, recorder)
+            if answer.startswith(("❌", "⚠️")):
+                recorder.error("get_ai_response", answer.split(":")[0])
+                continue
+
+            with recorder.time("parse_tools"):
+                tools = ai_manager.parse_tools(question, answer)
+            if tools:
+                with recorder.time("update_db"):
+                    ok, msg, _ = db_manager.update_db('like', dict(rng.choice(tools)))
+                if not ok: recorder.error("update_db", msg.split(":")[0])
+            with recorder.time("save_log"):
+                if not db_manager.save_log(job, sit, question, answer): recorder.error("save_log", "dropped")
+
+
+def run(args, rows, tmp):
+    ws, log_ws, model, faults, quota = setup(args, rows, tmp)
+    recorder, sink = Recorder(), ListSink()
+    if args.metrics: metrics.enabled, metrics.sink = True, sink
+    threads = [threading.Thread(target=session, args=(i, args, recorder, random.Random(args.seed * 1000 + i)))
+               for i in range(args.sessions)]
+    start = time.perf_counter()
+    try:
+        for t in threads: t.start()
+        for t in threads: t.join()
+        elapsed = time.perf_counter() - start
+        db_manager.get_log_writer().close()
+    finally:
+        metrics.enabled, metrics.sink = False, None
+        metrics.reset()
+
+    stages = recorder.report()
+    turns = stages.get("turn", {}).get("n", 0)
+    cache = defaultdict(int)
+    for ev in sink.events:
+        if ev["name"] == "answer_cache": cache[ev["labels"]["result"]] += 1
+    summary = {
+        "stages": stages, "elapsed": elapsed, "turns_per_sec": turns / elapsed if elapsed else 0.0,
+        "model_calls": model.calls, "retry_429": recorder.counts["retry_429"],
+        "injected_429": faults.injected_429, "injected_503": faults.injected_503,
+        "sheet_calls": ws.calls + log_ws.calls, "sheet_quota_rejected": quota.rejected if quota else 0,
+        "cache_hits": cache["hit"], "cache_misses": cache["miss"], "log_rows": len(log_ws.values),
+    }
+    return summary, summarize([ev for ev in sink.events if ev["type"] == "seconds"])
+
+
+# --- 출력 / 기준 비교 ---
+def print_run(rows, summary, internal, args):
+    print(f"\n== {rows} rows · {args.sessions} sessions × {args.turns} turns"
+          f"{' · stream' if args.stream else ''} · {summary['elapsed']:.1f}s")
+    print(f"{'stage':>16} | {'n':>5} | {'err':>4} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+    for stage, s in summary["stages"].items():
+        print(f"{stage:>16} | {s['n']:>5} | {s['errors']:>4} | {s['p50'] * 1000:>8.1f} | "
+              f"{s['p95'] * 1000:>8.1f} | {s['p99'] * 1000:>8.1f}")
+    print(f"throughput {summary['turns_per_sec']:.2f} turns/s · model calls {summary['model_calls']} "
+          f"(429 injected {summary['injected_429']}, retried {summary['retry_429']}; 503 injected {summary['injected_503']})"
+          f" · answer cache {summary['cache_hits']} hit / {summary['cache_misses']} miss")
+    print(f"sheet calls {summary['sheet_calls']} (quota rejected {summary['sheet_quota_rejected']})"
+          f" · log rows written {summary['log_rows']}")
+    if internal:
+        print("internal stages (metrics): " + ", ".join(
+            f"{name} p50 {p50 * 1000:.1f}/p95 {p95 * 1000:.1f} ms" for name, _, n, _, p50, p95, _ in internal))
+
+
+def compare(results, baseline, tolerance, floor=0.005):
+    """p95 가 기준보다 tolerance 비율 넘게(그리고 floor 초 넘게) 느려진 단계 목록."""
+    regressions = []
+    for rows, summary in results.items():
+        base = baseline.get(rows, {}).get("stages", {})
+        for stage, s in summary["stages"].items():
+            if stage not in base: continue
+            old, new = base[stage]["p95"], s["p95"]
+            if new > old * (1 + tolerance) and new - old > floor:
+                regressions.append(f"{rows} rows {stage}: p95 {old * 1000:.1f} → {new * 1000:.1f} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 Gemini/시트로 사용자 턴 전체를 동시 실행해 단계별 지연 측정")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000], help="도구 DB 행 수 (여러 개 가능)")
+    parser.add_argument("--sessions", type=int, default=16, help="동시 세션 수")
+    parser.add_argument("--turns", type=int, default=4, help="세션당 질문 수")
+    parser.add_argument("--stream", action="store_true", help="스트리밍 경로(stream_ai_response)로 측정, TTFT 포함")
+    parser.add_argument("--model-latency", type=float, default=0.2, help="모델 첫 청크까지 지연 (초)")
+    parser.add_argument("--chunk-interval", type=float, default=0.01, help="모델 청크 간격 (초)")
+    parser.add_argument("--rate-429", type=float, default=0.05, help="모델 호출 429 주입 확률")
+    parser.add_argument("--rate-503", type=float, default=0.02, help="모델 호출 503 주입 확률")
+    parser.add_argument("--backoff", type=float, default=0.05, help="429 재시도 대기 기준 (초)")
+    parser.add_argument("--sheet-rtt", type=float, default=0.05, help="시트 API 왕복 지연 (초)")
+    parser.add_argument("--sheet-per-cell", type=float, default=0.000002, help="시트 셀당 전송 비용 (초)")
+    parser.add_argument("--sheet-quota", type=int, default=0,
+                        help=f"시트 API 분당 호출 한도 (0 이면 없음, 실제 기본 {SHEETS_QUOTA_PER_MIN})")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-metrics", dest="metrics", action="store_false", help="내부 단계 계측 끄기")
+    parser.add_argument("--save", help="결과를 JSON 으로 저장 (다음 실행의 --baseline)")
+    parser.add_argument("--baseline", help="비교할 기준 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="p95 허용 악화 비율")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            summary, internal = run(args, rows, tmp)
+            print_run(rows, summary, internal, args)
+            results[str(rows)] = summary
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+        print(f"\n💾 saved {args.save}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions: print(f"📉 regression: {line}")
+        if regressions: sys.exit(1)
+        print(f"✅ no p95 regression beyond {args.tolerance:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import time
+import pandas as pd
+from modules import ai_manager
+from modules.answer_parser import parse_answer_tools
+from modules.facets import FacetIndex
+from modules.local_ranker import degraded_answer, preview_markdown
+from .fake_sheets import make_rows, HEADER
+
+# ---------------------------------------------------------
+# 로컬 DB 추천(미리보기 카드/대체 답변) 지연: 모델 호출 없이 몇 ms 인지
+#   cold: 새 스냅샷이라 검색 색인이 아직 없을 때 (미리보기는 색인을 만들지 않고 직무/결과물 일치만 사용)
+#   실행: (Main 폴더에서) python -m benchmarks.bench_local_ranker
+# ---------------------------------------------------------
+SIZES = [1_000, 5_000, 20_000]
+QUESTIONS = [
+    "나의 직무는 **직무3**인데, **상황7** 업무 할 때 도움되는 AI 도구 좀 추천해 줘. (필요한 결과물: 보고서)",
+    "직무5 업무에서 보고서 초안 쓸 때 쓸만한 도구 있어?",
+    "초보 개발자를 위한 AI 도구를 추천해줘.",
+]
+REPEAT = 20
+PREVIEW_BUDGET = 0.05   # 미리보기 한 번의 허용 시간 (초)
+
+
+def run(n):
+    df = pd.DataFrame(make_rows(n), columns=HEADER)
+    job_names = FacetIndex().sync(df).job_names()
+    # 색인이 없는 새 스냅샷에서의 자유 질문 (색인 구성 비용을 미리보기가 떠안지 않아야 함)
+    start = time.perf_counter()
+    ai_manager.rank_local_tools(QUESTIONS[2], df, job_names)
+    cold = time.perf_counter() - start
+    # 검색 색인은 프롬프트를 만들 때(build_db_context) 스냅샷당 한 번 구성됨
+    ai_manager.get_retriever().sync(df)
+    timings = [cold]
+    for q in QUESTIONS:
+        start = time.perf_counter()
+        for _ in range(REPEAT): tools = ai_manager.rank_local_tools(q, df, job_names)
+        timings.append((time.perf_counter() - start) / REPEAT)
+        preview_markdown(tools)
+    return timings, ai_manager.rank_local_tools(QUESTIONS[0], df, job_names)
+
+
+if __name__ == "__main__":
+    print(f"{'rows':>7} | cold ms | " + " | ".join(f"q{i + 1} ms" for i in range(len(QUESTIONS))))
+    for n in SIZES:
+        timings, top = run(n)
+        print(f"{n:>7} | {timings[0] * 1000:>7.2f} | " + " | ".join(f"{t * 1000:>5.2f}" for t in timings[1:]))
+        assert max(timings) < PREVIEW_BUDGET, timings
+    best = top[0]
+    assert (best['직무'], best['상황']) == ("직무3", "상황7"), best
+    answer = degraded_answer(top, "❌ 재시도 횟수를 초과했습니다.")
+    names = [t['추천도구'] for t in parse_answer_tools(QUESTIONS[0], answer)]
+    assert names == [t['추천도구'] for t in top]
+    print(f"top for 직무3/상황7: {names} (degraded answer keeps feedback buttons) ✅")
@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import time
+from modules.metrics import Metrics, JsonlSink, metrics, new_trace, summarize
+from modules.sheets_backend import SheetsStorage
+from .fake_sheets import FakeWorksheet, FakeClient, make_rows
+
+# ---------------------------------------------------------
+# 계측 오버헤드: 꺼짐(no-op) / 메모리 집계 / 메모리 + JSONL 기록, 그리고 추적 ID 로 한 턴 묶기
+#   실행: (Main 폴더에서) python -m benchmarks.bench_metrics
+# ---------------------------------------------------------
+CALLS = 200_000
+
+
+def per_call(fn):
+    start = time.perf_counter()
+    for _ in range(CALLS): fn()
+    return (time.perf_counter() - start) / CALLS
+
+
+def overhead(registry):
+    def timed():
+        with registry.timer("storage.read", backend="sheets", op="load_tools"):
+            pass
+
+    def counted():
+        registry.count("answer_cache", result="hit")
+
+    @registry.timed("vote.submit")
+    def decorated():
+        pass
+
+    return per_call(timed), per_call(counted), per_call(decorated)
+
+
+def trace_demo(tmp):
+    # 모듈 공용 계측기를 잠시 켜고, 한 턴 동안의 시트 읽기/쓰기가 같은 trace 로 묶이는지 확인
+    path = os.path.join(tmp, "turn.jsonl")
+    sink = JsonlSink(path)
+    metrics.enabled, metrics.sink = True, sink
+    try:
+        storage = SheetsStorage(lambda: FakeClient(FakeWorksheet(make_rows(50))), "fake://sheet")
+        trace_id = new_trace()
+        storage.load_tools()
+        storage.vote("Tool-3", +1)
+        storage.vote("없는 도구", +1)
+        with metrics.timer("prompt.build"):
+            metrics.observe("prompt.tokens", 1800)
+        other = new_trace()
+        storage.load_tools()
+    finally:
+        metrics.enabled, metrics.sink = False, None
+        sink.close()
+
+    with open(path, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f]
+    turn = [ev for ev in events if ev["trace"] == trace_id]
+    assert len(turn) == 5 and sum(ev["trace"] == other for ev in events) == 1
+    assert {ev["name"] for ev in turn} == {"storage.read", "storage.write", "prompt.build", "prompt.tokens"}
+    text = metrics.render_prometheus()
+    assert 'jobfit_storage_write_seconds_count{backend="sheets",op="vote"} 2' in text
+    assert "# TYPE jobfit_prompt_tokens histogram" in text
+    print(f"trace {trace_id}: {len(turn)} events ({', '.join(sorted({ev['name'] for ev in turn}))}) ✅")
+    for name, kind, n, total, p50, p95, p99 in summarize(events):
+        print(f"  {name:<14} {kind:<8} n={n} p50={p50:.5f}")
+    metrics.reset()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = per_call(lambda: None)
+        sink = JsonlSink(os.path.join(tmp, "bench.jsonl"))
+        rows = [("disabled", Metrics(False)), ("memory", Metrics(True)), ("memory+jsonl", Metrics(True, sink))]
+        print(f"{'registry':>13} | {'timer ns':>8} | {'count ns':>8} | {'@timed ns':>9}  (empty call {baseline * 1e9:.0f} ns)")
+        for label, registry in rows:
+            t, c, d = overhead(registry)
+            print(f"{label:>13} | {t * 1e9:>8.0f} | {c * 1e9:>8.0f} | {d * 1e9:>9.0f}")
+        sink.close()
+        disabled = overhead(Metrics(False))[0]
+        # 시트 API 왕복(~80ms) 대비 꺼진 계측 비용
+        print(f"disabled timer = {disabled / 0.08 * 100:.6f}% of one 80 ms sheet call")
+        trace_demo(tmp)
@@ -0,0 +1,58 @@
+import threading
+import time
+from google.api_core import exceptions
+from modules.rate_limiter import RateLimiter, backoff_delay
+from .fake_gemini import FakeGenerativeModel, QuotaBackend
+
+# ---------------------------------------------------------
+# 할당량을 강제하는 가짜 백엔드에 동시 사용자 몰리기:
+#   기존(429 후 고정 대기 재시도) vs 공용 토큰 버킷 + 대기열
+#   시간 축은 1분 → WINDOW 초로 축소해 실행합니다.
+#   실행: (Main 폴더에서) python -m benchmarks.bench_rate_limit
+# ---------------------------------------------------------
+WINDOW = 1.0      # 할당량 기준 시간 (원래 60초)
+LIMIT = 15        # WINDOW 당 허용 요청 수 (GEMINI_RPM 과 같은 비율)
+SESSIONS = 40
+FIXED_WAIT = 0.5  # 기존 고정 대기 (30초를 축소)
+
+
+def run(mode):
+    quota = QuotaBackend(LIMIT, WINDOW)
+    model = FakeGenerativeModel(first_delay=0.01, interval=0.0, quota=quota)
+    limiter = RateLimiter(LIMIT, 10 ** 9, window=WINDOW)
+    latencies, failures = [], [0]
+    lock = threading.Lock()
+
+    def session():
+        start = time.perf_counter()
+        for attempt in range(3):
+            try:
+                if mode == "limited": limiter.acquire(timeout=30)
+                model.generate_content("질문")
+                with lock: latencies.append(time.perf_counter() - start)
+                return
+            except exceptions.ResourceExhausted:
+                if mode == "limited":
+                    delay = backoff_delay(attempt, base=WINDOW / 4)
+                    limiter.penalize(delay)
+                else:
+                    delay = FIXED_WAIT
+                time.sleep(delay)
+        with lock: failures[0] += 1
+
+    threads = [threading.Thread(target=session) for _ in range(SESSIONS)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    total = time.perf_counter() - start
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else float("nan")
+    return quota.rejected, failures[0], len(latencies), p95, total
+
+
+if __name__ == "__main__":
+    print(f"{SESSIONS} sessions, quota {LIMIT}/{WINDOW}s")
+    print(f"{'mode':>8} | {'429s':>5} | {'gave up':>7} | {'served':>6} | {'p95 s':>6} | {'total s':>7}")
+    for mode in ("naive", "limited"):
+        rejected, gave_up, served, p95, total = run(mode)
+        print(f"{mode:>8} | {rejected:>5} | {gave_up:>7} | {served:>6} | {p95:>6.2f} | {total:>7.2f}")
@@ -0,0 +1,62 @@
+import time
+import pandas as pd
+from modules.retriever import ToolRetriever
+from modules.config import RETRIEVAL_TOP_K
+from .fake_sheets import make_rows, HEADER
+
+# ---------------------------------------------------------
+# DB 크기별 프롬프트 크기 / 검색 지연: 전체 덤프 vs 상위 k개
+#   실행: (Main 폴더에서) python -m benchmarks.bench_retrieval
+# ---------------------------------------------------------
+SIZES = [100, 1_000, 5_000, 20_000]
+QUESTIONS = [
+    "나의 직무는 **직무3**인데, **상황7** 업무 할 때 도움되는 AI 도구 좀 추천해 줘.",
+    "보고서 초안을 빨리 쓰고 싶은데 어떤 도구가 좋아?",
+    "초보 개발자를 위한 AI 도구를 추천해줘.",
+]
+COLS = ['추천도구', '직무', '상황', '특징_및_팁', '추천수', '비추천수', '링크']
+
+
+def run(n):
+    df = pd.DataFrame(make_rows(n), columns=HEADER)
+    full_chars = len(df[COLS].to_string(index=False))
+
+    retriever = ToolRetriever()
+    start = time.perf_counter()
+    retriever.sync(df)
+    build = time.perf_counter() - start
+
+    # 한 행만 바뀐 새 스냅샷: 증분 재색인 비용
+    changed = df.copy()
+    changed.loc[0, '특징_및_팁'] = "새로 바뀐 설명"
+    start = time.perf_counter()
+    retriever.sync(changed)
+    resync = time.perf_counter() - start
+
+    # 투표 한 건(추천수 변경)으로 게시된 새 스냅샷: advance() 로 그 행만 반영
+    voted = changed.copy()
+    voted.iat[5, voted.columns.get_loc('추천수')] = 999
+    start = time.perf_counter()
+    retriever.advance(changed, voted, 'update', pos=5, row=voted.iloc[5].to_dict())
+    vote = time.perf_counter() - start
+    # advance() 결과가 전체 재색인과 같은 순위를 내는지 확인
+    fresh = ToolRetriever()
+    fresh.sync(voted)
+    for q in QUESTIONS:
+        assert retriever.query(q, RETRIEVAL_TOP_K) == fresh.query(q, RETRIEVAL_TOP_K), q
+
+    start = time.perf_counter()
+    for q in QUESTIONS:
+        rows = voted.iloc[retriever.query(q, RETRIEVAL_TOP_K)]
+    query = (time.perf_counter() - start) / len(QUESTIONS)
+    topk_chars = len(rows[COLS].to_string(index=False))
+    return full_chars, topk_chars, build, resync, vote, query
+
+
+if __name__ == "__main__":
+    print(f"{'rows':>7} | {'full chars':>10} | {'top-k chars':>11} | {'build ms':>9} | {'resync ms':>9} | "
+          f"{'vote ms':>7} | {'query ms':>8}")
+    for n in SIZES:
+        full, topk, build, resync, vote, query = run(n)
+        print(f"{n:>7} | {full:>10} | {topk:>11} | {build * 1000:>9.1f} | {resync * 1000:>9.1f} | "
+              f"{vote * 1000:>7.2f} | {query * 1000:>8.2f}")
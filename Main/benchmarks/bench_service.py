@@ -0,0 +1,158 @@
+import argparse
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+import streamlit as st
+import uvicorn
+from modules import db_manager, service
+from modules.service_client import ServiceClient, ServiceError
+from .bench_load import Recorder, fake_answers, percentile
+from .fake_service import use_fake_backends
+
+# ---------------------------------------------------------
+# 추천 API 서비스 동시 처리량: 가짜 시트/모델로 서비스를 띄우고 N 명이 동시에 (답변 스트리밍 + 👍 투표) 반복
+#   실행: (Main 폴더에서) python -m benchmarks.bench_service
+#         python -m benchmarks.bench_service --users 10 50 200 --turns 3 --model-latency 0.5 --concurrency 64
+# ---------------------------------------------------------
+# 비교 기준(스크립트 실행 모델): Streamlit 은 사용자 동작마다 세션 스레드에서 Main.py 전체를 다시 실행합니다.
+# 모델을 기다리는 시간을 뺀 한 턴의 스크립트 실행 시간(AppTest, 지연 0 모델)은 GIL 을 잡고 도는 CPU 시간이므로,
+# 프로세스 하나가 처리할 수 있는 턴 수의 상한은 약 1 / (턴당 스크립트 시간) 입니다.
+QUESTIONS = ["{job} 업무 중 {n}번째 고민: 보고서 자동화 도구 추천해줘",
+             "{job} 신입인데 {n}번 과제용 AI 도구 알려줘",
+             "{job} 팀 회의록 정리에 쓸 도구 ({n})"]
+
+
+def start_server(app, port=0):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True, name="bench-uvicorn")
+    thread.start()
+    while not server.started: time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def worker_threads():
+    return sum(t.name == "AnyIO worker thread" for t in threading.enumerate())
+
+
+def user(client, jobs, turns, recorder, rng):
+    for n in range(turns):
+        question = rng.choice(QUESTIONS).format(job=rng.choice(jobs), n=rng.randrange(10 ** 6))
+        messages = [{"role": "user", "content": question}]
+        started, first, done = time.perf_counter(), None, None
+        try:
+            for event in client.recommend_stream(messages):
+                if event["type"] == "chunk" and first is None:
+                    first = time.perf_counter()
+                    recorder.add("ttft", first - started)
+                elif event["type"] == "done":
+                    done = event
+        except ServiceError as e:
+            recorder.error("turn", type(e).__name__)
+            continue
+        recorder.add("turn", time.perf_counter() - started)
+        if done is None or done["overloaded"] or done["degraded"]:
+            recorder.bump("overloaded" if done and done["overloaded"] else "failed")
+            continue
+        recorder.bump("answers")
+        if done["tools"]:
+            with recorder.time("vote"):
+                ok, _ = client.vote("like", rng.choice(done["tools"]))
+            if ok: recorder.bump("votes")
+
+
+def run(base_url, users, turns, seed):
+    client = ServiceClient(base_url, pool_size=users)
+    jobs = client.facets().job_names() or ["기타"]
+    recorder, peak = Recorder(), [0]
+    stop = threading.Event()
+
+    def sample():
+        while not stop.is_set():
+            peak[0] = max(peak[0], worker_threads())
+            time.sleep(0.02)
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+
+    threads = [threading.Thread(target=user, args=(client, jobs, turns, recorder, random.Random(seed + i)))
+               for i in range(users)]
+    started = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+    return recorder, elapsed, peak[0], client.health()
+
+
+def script_turn_seconds(turns=5):
+    """Main.py 한 턴(질문 → 답변 rerun)의 스크립트 실행 시간 중앙값. 모델 지연 0 이므로 대부분 CPU 시간."""
+    from streamlit.testing.v1 import AppTest
+    samples = []
+    at = AppTest.from_file(os.path.join(os.path.dirname(__file__), "..", "Main.py"), default_timeout=120)
+    at.run()
+    for n in range(turns + 1):
+        at.chat_input[0].set_value(f"마케터 보고서 도구 추천 {n}")
+        started = time.perf_counter()
+        at.run()
+        if at.exception: raise RuntimeError(at.exception)
+        if n: samples.append(time.perf_counter() - started)   # 첫 턴은 import/색인 준비 비용이라 제외
+    return percentile(samples, 0.5)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="추천 API 서비스 동시 처리량 벤치마크")
+    parser.add_argument("--users", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--turns", type=int, default=2, help="사용자당 턴 수")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--model-latency", type=float, default=0.5, help="가짜 모델 첫 청크 지연(초)")
+    parser.add_argument("--concurrency", type=int, default=64, help="서비스 동시 답변 생성 수")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as tmp:
+        st.cache_resource.clear()
+        names = [f"Tool-{i}" for i in range(args.rows)]
+        _, _, model = use_fake_backends(args.rows, args.model_latency,
+                                        answer=fake_answers(names, args.seed), workdir=tmp)
+        app_service = service.RecommendService(max_concurrency=args.concurrency)
+        server, thread, base_url = start_server(service.create_app(app_service))
+
+        print(f"service: {base_url}, {args.rows} rows, model first chunk {args.model_latency}s, "
+              f"concurrency {args.concurrency}")
+        print(f"{'users':>5} | {'turns/s':>7} | {'turn p50':>8} | {'turn p95':>8} | {'ttft p50':>8} | "
+              f"{'vote p95':>8} | {'errors':>6} | {'503':>4} | worker threads")
+        best = 0.0
+        for users in args.users:
+            recorder, elapsed, peak, health = run(base_url, users, args.turns, args.seed)
+            report = recorder.report()
+            answers = recorder.counts["answers"]
+            errors = sum(sum(v.values()) for v in recorder.errors.values()) + recorder.counts["failed"]
+            best = max(best, answers / elapsed)
+            turn = report.get("turn", {})
+            ttft = percentile(recorder.samples.get("ttft", []), 0.5)
+            vote = percentile(recorder.samples.get("vote", []), 0.95)
+            print(f"{users:>5} | {answers / elapsed:>7.1f} | {turn.get('p50', 0):>8.3f} | {turn.get('p95', 0):>8.3f} | "
+                  f"{ttft or 0:>8.3f} | {vote or 0:>8.3f} | {errors:>6} | {recorder.counts['overloaded']:>4} | "
+                  f"peak {peak} (limit {app_service.threads})")
+            assert health["inflight"] == 0 and health["waiting"] == 0
+        server.should_exit = True
+        thread.join(timeout=10)
+
+        # 스크립트 실행 모델의 상한 (같은 가짜 백엔드, 모델 지연 0)
+        model.first_delay, model.interval = 0.0, 0.0
+        per_turn = script_turn_seconds()
+        # 임시 폴더가 지워지기 전에 투표/로그 기록기를 비움
+        db_manager.get_vote_aggregator().close()
+        db_manager.get_log_writer().close()
+        print(f"script-per-session: {per_turn * 1000:.0f} ms of script per turn → ceiling ≈ {1 / per_turn:.1f} turns/s "
+              f"per process; service peak {best:.1f} turns/s ({best * per_turn:.1f}x)")
+        print(f"model calls {model.calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import threading
+import time
+import pandas as pd
+from modules import ai_manager
+from modules.single_flight import SingleFlight
+from .fake_gemini import FakeGenerativeModel, install
+from .fake_sheets import make_rows, HEADER
+
+# ---------------------------------------------------------
+# 같은 질문 동시 요청 합치기: 느린 가짜 모델에 N 개 세션이 동시에 같은 질문
+#   실행: (Main 폴더에서) python -m benchmarks.bench_single_flight
+# ---------------------------------------------------------
+SESSIONS = 20
+
+
+def run(streaming):
+    fake = install(ai_manager, FakeGenerativeModel(first_delay=0.5, interval=0.01))
+    flights = SingleFlight()
+    ai_manager.get_single_flight = lambda: flights
+
+    df = pd.DataFrame(make_rows(200), columns=HEADER)
+    question = [{"role": "user", "content": f"회의록 요약 도구 추천해줘 {streaming}"}]
+    results = []
+    barrier = threading.Barrier(SESSIONS)
+
+    def session():
+        barrier.wait()
+        if streaming:
+            text = "".join(ai_manager.stream_ai_response(question, df))
+        else:
+            text = ai_manager.get_ai_response(question, df)
+        results.append(text)
+
+    threads = [threading.Thread(target=session) for _ in range(SESSIONS)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - start
+
+    assert len(set(results)) == 1 and len(results) == SESSIONS, "세션마다 답변이 다릅니다"
+    assert fake.calls == 1, f"모델이 {fake.calls}번 호출됨"
+    return fake.calls, flights.stats(), elapsed
+
+
+if __name__ == "__main__":
+    for streaming in (False, True):
+        calls, stats, elapsed = run(streaming)
+        mode = "stream" if streaming else "blocking"
+        print(f"{mode:>8}: {SESSIONS} sessions → {calls} model call, "
+              f"coalesced={stats['coalesced']}, elapsed {elapsed:.2f}s")
@@ -0,0 +1,49 @@
+import time
+import threading
+import pandas as pd
+from modules import ai_manager
+from .fake_gemini import FakeGenerativeModel, install
+from .fake_sheets import make_rows, HEADER
+
+# ---------------------------------------------------------
+# 첫 글자까지의 시간(TTFT): 일괄 응답 vs 스트리밍 / 중간 취소
+#   실행: (Main 폴더에서) python -m benchmarks.bench_stream
+# ---------------------------------------------------------
+FIRST_DELAY = 0.4
+INTERVAL = 0.03
+
+
+def use_fake_model():
+    return install(ai_manager, FakeGenerativeModel(first_delay=FIRST_DELAY, interval=INTERVAL))
+
+
+def main():
+    use_fake_model()
+    df = pd.DataFrame(make_rows(500), columns=HEADER)
+    messages = [{"role": "user", "content": f"보고서 작성용 AI 도구 추천해줘 ({time.time()})"}]
+
+    start = time.perf_counter()
+    blocking_text = ai_manager.get_ai_response(messages, df)
+    blocking = time.perf_counter() - start
+
+    stats = ai_manager.StreamStats()
+    streamed_text = "".join(ai_manager.stream_ai_response(messages, df, stats=stats))
+    assert streamed_text == blocking_text, "스트리밍 결과가 일괄 응답과 다릅니다"
+
+    print(f"blocking  : first text after {blocking * 1000:7.1f} ms")
+    print(f"streaming : first chunk after {stats.ttft * 1000:7.1f} ms "
+          f"(total {stats.total * 1000:.1f} ms, {stats.chunks} chunks)")
+
+    # 세 번째 청크 이후 취소 → 나머지 청크를 기다리지 않고 종료해야 함
+    cancel = threading.Event()
+    stats = ai_manager.StreamStats()
+    received = 0
+    for _ in ai_manager.stream_ai_response(messages, df, cancel_event=cancel, stats=stats):
+        received += 1
+        if received == 3: cancel.set()
+    assert stats.cancelled and stats.chunks == 3
+    print(f"cancel    : stopped after {stats.chunks} chunks in {stats.total * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
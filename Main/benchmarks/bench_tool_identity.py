@@ -0,0 +1,74 @@
+import time
+import pandas as pd
+from modules.sheets_backend import SheetsStorage
+from modules.sqlite_backend import SQLiteStorage
+from modules.tool_identity import ToolNameIndex, merge_duplicates, tool_key
+from .fake_sheets import FakeWorksheet, FakeClient, make_rows, HEADER
+
+# ---------------------------------------------------------
+# 도구 이름 조회: 열 전체 비교(기존) vs 정규화 이름 인덱스 / 이름 변형 투표 / 중복 병합
+#   실행: (Main 폴더에서) python -m benchmarks.bench_tool_identity
+# ---------------------------------------------------------
+SIZES = [1_000, 10_000, 50_000]
+LOOKUPS = 500
+VARIANTS = ["Tool-7", " tool-7 ", "ＴＯＯＬ－７", "TOOL-7", "Tool - 7", "Tool-7™"]
+
+
+def scan_lookup(df, target):
+    # 기존 update_db: 존재 확인 + 불리언 필터로 첫 행 위치
+    if target not in df['추천도구'].values: return None
+    return df[df['추천도구'] == target].index[0]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    for i in range(LOOKUPS): fn(*args, i)
+    return (time.perf_counter() - start) / LOOKUPS
+
+
+def run(n):
+    df = pd.DataFrame(make_rows(n), columns=HEADER)
+    targets = [f"Tool-{(i * 7919) % n}" for i in range(LOOKUPS)]
+    scan = timed(lambda d, i: scan_lookup(d, targets[i]), df)
+    index = ToolNameIndex()
+    start = time.perf_counter()
+    index.find(df, "Tool-0")
+    build = time.perf_counter() - start
+    indexed = timed(lambda d, i: index.find(d, targets[i]), df)
+    assert all(index.find(df, t) == scan_lookup(df, t) for t in targets[:50])
+    return scan, indexed, build
+
+
+def variant_votes():
+    rows = make_rows(20)
+    ws = FakeWorksheet(rows)
+    sheets = SheetsStorage(lambda: FakeClient(ws), "fake://sheet")
+    sqlite = SQLiteStorage(":memory:")
+    sqlite.replace_tools(pd.DataFrame(rows, columns=HEADER))
+    for storage in (sheets, sqlite):
+        for name in VARIANTS: storage.vote(name, +1)
+        assert not storage.insert_tool({'추천도구': "tool -7", '추천수': 1}), "변형 이름이 새 도구로 등록됨"
+    sheet_score = int(sheets.load_tools().set_index('추천도구').loc["Tool-7", '추천수'])
+    sqlite_score = int(sqlite.load_tools().set_index('추천도구').loc["Tool-7", '추천수'])
+    base = rows[7][-1]
+    assert sheet_score == sqlite_score == base + len(VARIANTS)
+    print(f"{len(VARIANTS)} name variants {[tool_key(v) for v in VARIANTS][:1]} → one row on sheets and sqlite ✅")
+
+
+def merge_demo():
+    df = pd.DataFrame(make_rows(1_000), columns=HEADER)
+    for i, variant in enumerate(VARIANTS[1:], start=1):
+        df.loc[100 * i, '추천도구'] = variant
+    merged, report = merge_duplicates(df)
+    kept = merged[merged['추천도구'].map(tool_key) == "tool-7"]
+    assert len(kept) == 1 and len(merged) == len(df) - (len(VARIANTS) - 1)
+    print(f"merge: {len(df)} → {len(merged)} rows, '{report[0][0]}' 추천수 {report[0][2]} ✅")
+
+
+if __name__ == "__main__":
+    print(f"{'rows':>7} | {'scan ms/lookup':>14} | {'index ms/lookup':>15} | {'build ms':>8}")
+    for n in SIZES:
+        scan, indexed, build = run(n)
+        print(f"{n:>7} | {scan * 1000:>14.3f} | {indexed * 1000:>15.4f} | {build * 1000:>8.1f}")
+    variant_votes()
+    merge_demo()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import time
+import pandas as pd
+from modules import db_manager
+from modules.sheets_backend import SheetsStorage
+from modules.sqlite_backend import SQLiteStorage
+from modules.snapshot import ToolSnapshotStore
+from .fake_sheets import FakeWorksheet, FakeClient, make_rows, HEADER
+
+# ---------------------------------------------------------
+# 투표 1회당 지연: 기존 전체 재작성 vs 셀 단위 갱신 vs 로컬 SQLite
+#   실행: (Main 폴더에서) python -m benchmarks.bench_vote
+# ---------------------------------------------------------
+SIZES = [100, 1_000, 10_000, 50_000]
+VOTES = 20
+
+
+def legacy_vote(ws, target):
+    # 기존 update_db 의 저장 방식: 전체 읽기 → 수정 → clear → 전체 쓰기
+    df = pd.DataFrame(ws.get_all_records())
+    for col in ['비추천수', '추천수']:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+    idx = df[df['추천도구'] == target].index[0]
+    df.loc[idx, '추천수'] += 1
+    out = df.astype(str)
+    ws.clear()
+    ws.update(range_name='A1', values=[out.columns.tolist()] + out.values.tolist())
+
+
+def run(n):
+    rows = make_rows(n)
+    df = pd.DataFrame(rows, columns=HEADER)
+    df['추천도구'] = df['추천도구'].astype(str)
+    targets = [f"Tool-{(i * 7919) % n}" for i in range(VOTES)]
+
+    ws = FakeWorksheet(rows)
+    start = time.perf_counter()
+    for t in targets: legacy_vote(ws, t)
+    legacy = ((time.perf_counter() - start) + ws.simulated_latency) / VOTES
+
+    ws = FakeWorksheet(rows)
+    store = ToolSnapshotStore(lambda: df)
+    store.publish(df)
+    db_manager.get_snapshot_store = lambda: store
+    storage = SheetsStorage(lambda: FakeClient(ws), "fake://sheet")
+    db_manager.get_storage = lambda: storage
+    _sync_cost = 0.0
+    start = time.perf_counter()
+    for i, t in enumerate(targets):
+        db_manager.update_db('like', {'추천도구': t}, df)
+        if i == 0: _sync_cost = ws.simulated_latency
+    delta = ((time.perf_counter() - start) + ws.simulated_latency - _sync_cost) / VOTES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(os.path.join(tmp, "tools.db"))
+        storage.replace_tools(df)
+        db_manager.get_storage = lambda: storage
+        start = time.perf_counter()
+        for t in targets: db_manager.update_db('like', {'추천도구': t}, df)
+        local = (time.perf_counter() - start) / VOTES
+        storage.close()
+    return legacy, delta, local, ws.calls
+
+
+if __name__ == "__main__":
+    print(f"{'rows':>8} | {'legacy ms/vote':>15} | {'delta ms/vote':>14} | {'sqlite ms/vote':>15} | sheet api calls")
+    for n in SIZES:
+        legacy, delta, local, calls = run(n)
+        print(f"{n:>8} | {legacy * 1000:>15.1f} | {delta * 1000:>14.1f} | {local * 1000:>15.2f} | {calls}")
@@ -0,0 +1,157 @@
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import pandas as pd
+from modules.sheets_backend import SheetsStorage
+from modules.sqlite_backend import SQLiteStorage
+from modules.vote_aggregator import VoteAggregator
+from .bench_vote import legacy_vote
+from .fake_sheets import FakeWorksheet, FakeClient, make_rows, HEADER
+
+# ---------------------------------------------------------
+# 동시 투표 스트레스 테스트: 최종 추천수가 정확히 맞는지 확인
+#   실행: (Main 폴더에서) python -m benchmarks.bench_vote_concurrency
+# ---------------------------------------------------------
+# - 투표자 VOTERS 명이 동시에 무작위 👍/👎 를 VOTES_EACH 번씩 누름 (기존 도구 TOOLS 개)
+# - 'Doomed' 도구(점수 0)는 👎 만 받아 삭제되어야 하고,
+#   'Brand-New' 도구(DB 에 없음)는 👍 만 받아 정확히 한 번, 받은 👍 수만큼의 점수로 등록되어야 함
+VOTERS = 300
+VOTES_EACH = 5
+TOOLS = 20
+BASE_SCORE = 50
+
+
+def make_plan(seed=7):
+    rng = random.Random(seed)
+    plans = []
+    for _ in range(VOTERS):
+        votes = []
+        for _ in range(VOTES_EACH):
+            r = rng.random()
+            if r < 0.05: votes.append(("Doomed", -1))
+            elif r < 0.10: votes.append(("Brand-New", +1))
+            else: votes.append((f"Tool-{rng.randrange(TOOLS)}", rng.choice((+1, -1))))
+        plans.append(votes)
+    return plans
+
+
+def expected_counts(plans):
+    expected = {f"Tool-{i}": BASE_SCORE for i in range(TOOLS)}
+    expected["Brand-New"] = 0
+    for votes in plans:
+        for name, delta in votes:
+            if name in expected: expected[name] += delta
+    return expected
+
+
+def seed_rows():
+    rows = make_rows(TOOLS)
+    for r in rows: r[8] = BASE_SCORE
+    rows.append(["직무0", "상황0", "보고서", "Doomed", "곧 삭제될 도구", "무료", "https://doomed.example.com", 0, 0])
+    return rows
+
+
+def run_voters(plans, vote):
+    start = threading.Barrier(len(plans))
+    def voter(votes):
+        start.wait()
+        for name, delta in votes: vote(name, delta)
+    threads = [threading.Thread(target=voter, args=(v,)) for v in plans]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+
+def check(df, expected):
+    counts = dict(zip(df['추천도구'].astype(str), pd.to_numeric(df['추천수']).astype(int)))
+    wrong = {n: (counts.get(n), e) for n, e in expected.items() if counts.get(n) != e}
+    return wrong, "Doomed" in counts, int((df['추천도구'] == "Brand-New").sum())
+
+
+def new_row():
+    return {"직무": "직무0", "상황": "상황0", "결과물": "보고서", "추천도구": "Brand-New",
+            "특징_및_팁": "새로 찾은 도구", "유료여부": "무료", "링크": "https://new.example.com"}
+
+
+def bench_legacy(plans):
+    # 기존 방식: 전체 읽기 → 수정 → 전체 재작성 (잠금 없음). 👍/👎 만 흉내 (등록/삭제 없음)
+    # clear 와 update 사이에 읽은 요청은 빈 시트를 보고 실패합니다.
+    ws = FakeWorksheet(seed_rows())
+    errors = []
+    def vote(name, delta):
+        if name in ("Doomed", "Brand-New"): return
+        try:
+            legacy_vote_delta(ws, name, delta)
+        except (IndexError, KeyError) as e:
+            errors.append(e)
+    run_voters(plans, vote)
+    return pd.DataFrame(ws.get_all_records()), len(errors)
+
+
+def legacy_vote_delta(ws, target, delta):
+    if delta > 0: return legacy_vote(ws, target)
+    df = pd.DataFrame(ws.get_all_records())
+    df['추천수'] = pd.to_numeric(df['추천수'], errors='coerce').fillna(0).astype(int)
+    df.loc[df[df['추천도구'] == target].index[0], '추천수'] -= 1
+    out = df.astype(str)
+    ws.clear()
+    ws.update(range_name='A1', values=[out.columns.tolist()] + out.values.tolist())
+
+
+def bench_aggregated(plans, storages, tmp):
+    # 프로세스마다 저널/기록기 하나 (storages 가 여러 개면 같은 저장소를 공유하는 여러 프로세스 흉내)
+    aggs = [VoteAggregator(s, os.path.join(tmp, f"journal-{i}.jsonl"), flush_interval=0.05)
+            for i, s in enumerate(storages)]
+    def vote(name, delta):
+        agg = aggs[hash(threading.current_thread().name) % len(aggs)]
+        agg.submit(name, delta, new_row() if name == "Brand-New" and delta > 0 else None)
+    start = time.perf_counter()
+    run_voters(plans, vote)
+    ack = time.perf_counter() - start
+    for agg in aggs: agg.wait_idle(60)
+    total = time.perf_counter() - start
+    stats = [agg.stats() for agg in aggs]
+    for agg in aggs: agg.close()
+    return ack, total, stats
+
+
+def report(label, df, expected, ack=None, total=None, stats=None):
+    wrong, doomed_left, new_rows = check(df, expected)
+    ok = not wrong and not doomed_left and new_rows == 1
+    line = f"{label:>20} | wrong counts {len(wrong):>3} | Doomed deleted {str(not doomed_left):>5} | Brand-New rows {new_rows}"
+    if ack is not None:
+        batches = sum(s['batches'] for s in stats)
+        conflicts = sum(s['conflicts'] for s in stats)
+        line += f" | ack {ack:.2f}s, applied {total:.2f}s, {batches} batches, {conflicts} conflicts"
+    print(line + ("  ✅" if ok else "  ❌"))
+    return ok
+
+
+if __name__ == "__main__":
+    plans = make_plan()
+    expected = expected_counts(plans)
+    print(f"{VOTERS} voters × {VOTES_EACH} votes")
+
+    df, errors = bench_legacy(plans)
+    legacy_expected = {n: e for n, e in expected.items() if n != "Brand-New"}
+    wrong, _, _ = check(df, legacy_expected)
+    lost = sum(abs(want - (got or 0)) for got, want in wrong.values())
+    print(f"{'legacy rewrite':>20} | wrong counts {len(wrong):>3} | off by {lost} votes in total, "
+          f"{errors} votes failed on a half-written sheet  ❌")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ws = FakeWorksheet(seed_rows())
+        sheets = SheetsStorage(lambda: FakeClient(ws), "fake://sheet")
+        ack, total, stats = bench_aggregated(plans, [sheets], os.path.join(tmp, "sheets"))
+        oks = [report("journal → sheets", sheets.load_tools(), expected, ack, total, stats)]
+
+        db = os.path.join(tmp, "tools.db")
+        SQLiteStorage(db).replace_tools(pd.DataFrame(seed_rows(), columns=HEADER))
+        # 같은 DB 파일을 쓰는 두 '프로세스' (각자 저널/기록기): 겹치는 쓰기는 낙관적 충돌 재시도로 처리
+        storages = [SQLiteStorage(db), SQLiteStorage(db)]
+        ack, total, stats = bench_aggregated(plans, storages, os.path.join(tmp, "sqlite"))
+        oks.append(report("journal → sqlite ×2", storages[0].load_tools(), expected, ack, total, stats))
+    # 저널 방식은 집계가 정확해야 함 (하나라도 틀리면 실패 종료)
+    sys.exit(0 if all(oks) else 1)
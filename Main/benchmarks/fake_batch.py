@@ -0,0 +1,39 @@
+import zlib
+import pandas as pd
+from modules import ai_manager
+from modules.batch import build_parser, parse_args, run_batch
+from .fake_gemini import FakeGenerativeModel, FaultInjector, install, make_answer
+from .fake_sheets import make_rows, HEADER
+
+# ---------------------------------------------------------
+# 일괄 추천 CLI 를 가짜 모델 + 합성 DB 로 실행 (네트워크 없음, 나머지 옵션은 modules.batch 와 같음)
+#   실행: (Main 폴더에서) python -m benchmarks.fake_batch --from-db --rows 500 --workers 16 --rpm 6000 --out catalog.jsonl
+# ---------------------------------------------------------
+
+
+def install_fake_model(df, latency=0.2, rate_429=0.0, rate_503=0.0):
+    """같은 질문이면 같은 답변(DB 도구 2개를 섹션 1 에)을 주는 가짜 모델을 끼웁니다."""
+    names = df['추천도구'].tolist()
+
+    def fake_answer(prompt):
+        h = zlib.crc32(prompt.encode("utf-8"))
+        return make_answer([names[h % len(names)], names[(h // 7) % len(names)]])
+    return install(ai_manager, FakeGenerativeModel(fake_answer, first_delay=latency, interval=0.0,
+                                                   faults=FaultInjector(rate_429, rate_503)))
+
+
+def main(argv=None):
+    parser = build_parser()
+    parser.description = "가짜 모델 + 합성 DB 로 일괄 추천"
+    parser.add_argument("--rows", type=int, default=500, help="합성 DB 행 수")
+    parser.add_argument("--fake-latency", type=float, default=0.2, help="가짜 모델 응답 지연(초)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="가짜 모델 429 주입 비율")
+    parser.add_argument("--rate-503", type=float, default=0.0, help="가짜 모델 503 주입 비율")
+    args = parse_args(parser, argv)
+    df = pd.DataFrame(make_rows(args.rows), columns=HEADER)
+    install_fake_model(df, args.fake_latency, args.rate_429, args.rate_503)
+    return run_batch(args, df, "fake-key")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,25 @@
+import pandas as pd
+from modules import ai_manager
+from modules.cache_warmer import build_parser, warm_all
+from .fake_gemini import FakeGenerativeModel, install
+from .fake_sheets import make_rows, HEADER
+
+# ---------------------------------------------------------
+# 빠른 추천 캐시 워밍을 가짜 모델 + 합성 DB 로 실행 (네트워크 없음)
+#   실행: (Main 폴더에서) python -m benchmarks.fake_cache_warmer --rows 2000 --workers 8 --rpm 6000
+#   나머지 옵션은 modules.cache_warmer 와 같음
+# ---------------------------------------------------------
+
+
+def main(argv=None):
+    parser = build_parser()
+    parser.description = "가짜 모델 + 합성 DB 로 빠른 추천 답변 캐시 워밍"
+    parser.add_argument("--rows", type=int, default=500, help="합성 DB 행 수")
+    parser.add_argument("--model-latency", type=float, default=0.2, help="가짜 모델 응답 지연(초)")
+    args = parser.parse_args(argv)
+    install(ai_manager, FakeGenerativeModel(first_delay=args.model_latency, interval=0.0))
+    warm_all(args, pd.DataFrame(make_rows(args.rows), columns=HEADER), "fake-key")
+
+
+if __name__ == "__main__":
+    main()
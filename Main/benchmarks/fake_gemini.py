@@ -0,0 +1,223 @@
+import random
+import threading
+import time
+from collections import deque
+
+from google.api_core import exceptions
+
+# ---------------------------------------------------------
+# google.generativeai.GenerativeModel 대역 (네트워크 없이 응답 흉내)
+# ---------------------------------------------------------
+CANNED_ANSWER = """> ### 📂 [DB 맞춤] Notion AI
+> * **이유:** 회의록과 보고서 초안을 한 곳에서 정리할 수 있습니다.
+> * **가격:** 부분 유료
+> * **링크:** https://www.notion.so/product/ai
+> * **💡 팁:** "이 회의록을 3줄 요약하고 액션 아이템을 표로 정리해줘"라고 입력하세요.
+
+> ### 🏆 [업계 표준] ChatGPT
+> * **이유:** 범용성이 가장 높고 문서 작성 품질이 안정적입니다.
+> * **가격:** 무료/유료
+> * **링크:** https://chat.openai.com
+> * **💡 팁:** "아래 자료로 보고서 목차를 5개 항목으로 짜줘"라고 입력하세요.
+
+> ### 🚀 [트렌드] Gamma
+> * **이유:** 텍스트만으로 발표 자료를 자동 생성합니다.
+> * **가격:** 무료/유료
+> * **링크:** https://gamma.app
+> * **💡 팁:** "이 보고서를 10장짜리 PPT로 만들어줘"라고 입력하세요.
+
+> ### ⚡ 레시피: 보고서 → 발표 자료
+> **🔄 흐름:** Perplexity → ChatGPT → Gamma
+> * **이유:** 조사, 초안, 시각화를 분업해 시간을 줄입니다.
+> * **Step 1 [Perplexity]:** 최신 자료를 출처와 함께 수집
+> * **Step 2 [ChatGPT]:** 수집 자료로 보고서 초안 작성
+> * **⚠️ 주의:** 수치와 출처는 반드시 원문으로 재확인하세요.
+"""
+
+
+def make_answer(db_tools, standard="ChatGPT", trend="Gamma"):
+    """
+    SYSTEM_PROMPT_TEMPLATE 양식(📂 DB 맞춤 / 🏆 업계 표준 / 🚀 트렌드 / ⚡ 레시피) 답변.
+    db_tools 의 이름이 섹션 1 도구가 되므로 answer_parser 가 그대로 추출합니다.
+    """
+    blocks = []
+    for name in db_tools:
+        blocks.append(f"""> ### 📂 [DB 맞춤] {name}
+> * **이유:** 등록된 도구 중 질문한 업무와 가장 잘 맞습니다.
+> * **가격:** 무료
+> * **링크:** https://{str(name).lower()}.example.com
+> * **💡 팁:** "이 자료를 3줄로 요약해줘"라고 입력하세요.""")
+    blocks.append(f"""> ### 🏆 [업계 표준] {standard}
+> * **이유:** 범용성이 가장 높고 문서 작성 품질이 안정적입니다.
+> * **가격:** 무료/유료
+> * **링크:** https://chat.openai.com
+> * **💡 팁:** "아래 자료로 보고서 목차를 5개 항목으로 짜줘"라고 입력하세요.""")
+    blocks.append(f"""> ### 🚀 [트렌드] {trend}
+> * **이유:** 텍스트만으로 발표 자료를 자동 생성합니다.
+> * **가격:** 무료/유료
+> * **링크:** https://gamma.app
+> * **💡 팁:** "이 보고서를 10장짜리 PPT로 만들어줘"라고 입력하세요.""")
+    blocks.append(f"""> ### ⚡ 레시피: 자료 조사 → 발표
+> **🔄 흐름:** {db_tools[0] if db_tools else standard} → {standard} → {trend}
+> * **이유:** 조사, 초안, 시각화를 분업해 시간을 줄입니다.
+> * **⚠️ 주의:** 수치와 출처는 반드시 원문으로 재확인하세요.""")
+    return "\n\n".join(blocks) + "\n"
+
+
+class QuotaBackend:
+    """
+    window 초 동안 limit 회를 넘는 호출에 429 를 던지는 할당량 흉내.
+    error: 던질 예외 종류 (기본은 Gemini 의 ResourceExhausted, 시트 대역은 자체 APIError)
+    """
+
+    def __init__(self, limit, window=60.0, error=exceptions.ResourceExhausted):
+        self.limit = limit
+        self.window = window
+        self.error = error
+        self.lock = threading.Lock()
+        self.calls = deque()
+        self.accepted = 0
+        self.rejected = 0
+
+    def check(self):
+        with self.lock:
+            now = time.monotonic()
+            while self.calls and now - self.calls[0] >= self.window:
+                self.calls.popleft()
+            if len(self.calls) >= self.limit:
+                self.rejected += 1
+                raise self.error("Quota exceeded (fake)")
+            self.calls.append(now)
+            self.accepted += 1
+
+
+class FaultInjector:
+    """호출마다 rate_429 / rate_503 확률로 429(ResourceExhausted) / 503(ServiceUnavailable) 을 던집니다."""
+
+    def __init__(self, rate_429=0.0, rate_503=0.0, seed=None):
+        self.rate_429 = rate_429
+        self.rate_503 = rate_503
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.injected_429 = 0
+        self.injected_503 = 0
+
+    def check(self):
+        with self.lock:
+            r = self.rng.random()
+            if r < self.rate_429:
+                self.injected_429 += 1
+                raise exceptions.ResourceExhausted("Resource has been exhausted (fake)")
+            if r < self.rate_429 + self.rate_503:
+                self.injected_503 += 1
+                raise exceptions.ServiceUnavailable("The model is overloaded (fake)")
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+        self.parts = [text] if text else []
+
+
+class FakeResponse:
+    """stream=True 이면 청크를 일정 간격으로 내보내는 이터레이터, 아니면 완성된 응답."""
+
+    def __init__(self, text, stream, first_delay, interval, chunk_size):
+        self._full = text
+        self._stream = stream
+        self.first_delay = first_delay
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.text = text
+        self.parts = [text] if text else []
+
+    def __iter__(self):
+        for i in range(0, len(self._full), self.chunk_size):
+            time.sleep(self.first_delay if i == 0 else self.interval)
+            yield FakeChunk(self._full[i:i + self.chunk_size])
+
+
+class FakeChat:
+    def __init__(self, model, history, system_instruction=None):
+        self.model = model
+        self.history = list(history or [])
+        self.system_instruction = system_instruction
+
+    def send_message(self, content, stream=False, **kwargs):
+        return self.model.generate_content(content, stream=stream)
+
+
+class FakeGenerativeModel:
+    """
+    first_delay: 첫 청크까지 지연(초), interval: 이후 청크 간격(초), chunk_size: 청크당 글자 수.
+    stream=False 호출은 전체 청크 시간을 합친 만큼 대기한 뒤 한 번에 돌려줍니다.
+    answer: 고정 답변 문자열 또는 answer(prompt) -> 답변 함수.
+    quota(QuotaBackend)를 주면 할당량을 넘는 호출은 429 로, faults(FaultInjector)를 주면 확률적으로 429/503 로 실패합니다.
+    """
+
+    def __init__(self, answer=CANNED_ANSWER, first_delay=0.5, interval=0.05, chunk_size=40,
+                 system_instruction=None, quota=None, faults=None):
+        self.answer = answer
+        self.first_delay = first_delay
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.system_instruction = system_instruction
+        self.quota = quota
+        self.faults = faults
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def total_latency(self, text=None):
+        text = self.answer if text is None else text
+        n_chunks = max(1, -(-len(text) // self.chunk_size))
+        return self.first_delay + self.interval * (n_chunks - 1)
+
+    def start_chat(self, history=None, system_instruction=None):
+        return FakeChat(self, history, system_instruction)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        if self.quota is not None: self.quota.check()
+        if self.faults is not None: self.faults.check()
+        with self.lock: self.calls += 1
+        text = self.answer(prompt) if callable(self.answer) else self.answer
+        response = FakeResponse(text, stream, self.first_delay, self.interval, self.chunk_size)
+        if not stream:
+            time.sleep(self.total_latency(text))
+        return response
+
+
+class InvalidKey:
+    """잘못된 API 키 흉내: 모든 호출이 400 InvalidArgument("API key not valid") 로 실패합니다. (faults 자리에 넣음)"""
+
+    def __init__(self):
+        self.rejected = 0
+
+    def check(self):
+        self.rejected += 1
+        raise exceptions.InvalidArgument("API key not valid. Please pass a valid API key. (fake)")
+
+
+def install(ai_manager, model, api_key="fake-key", shared=False):
+    """
+    ai_manager 가 시크릿/세션 없이 가짜 모델을 쓰도록 바꿔 끼웁니다.
+    shared=True 이면 가짜 키를 공용 키 풀의 유일한 키로 넣어 속도 제한 대기열도 거치게 합니다.
+    """
+    from modules.key_pool import KeyPool
+    from modules.config import GEMINI_RPM, GEMINI_TPM
+    pool = KeyPool([api_key] if shared else [], GEMINI_RPM, GEMINI_TPM)
+    ai_manager.get_api_key = lambda: api_key
+    ai_manager.get_shared_api_key = lambda: api_key if shared else None
+    ai_manager.get_key_pool = lambda: pool
+    ai_manager.configure_genai = lambda api_key=None, chat=False: model
+    return model
+
+
+def install_keys(ai_manager, models, pool):
+    """
+    공용 키 여러 개 흉내: models 는 {키: FakeGenerativeModel}, pool 은 같은 키들로 만든 KeyPool.
+    키마다 다른 모델(할당량 QuotaBackend, 잘못된 키 InvalidKey 등)을 주면 키 선택/차단 동작을 확인할 수 있습니다.
+    get_api_key/get_shared_api_key 는 그대로 두므로 호출마다 풀이 키를 고릅니다.
+    """
+    ai_manager.get_key_pool = lambda: pool
+    ai_manager.configure_genai = lambda api_key=None, chat=False: models.get(api_key or ai_manager.get_api_key())
+    return pool
@@ -0,0 +1,45 @@
+import argparse
+import os
+import tempfile
+from modules import ai_manager, db_manager, service
+from modules.sheets_backend import SheetsStorage
+from .fake_gemini import FakeGenerativeModel, FaultInjector, CANNED_ANSWER, install
+from .fake_sheets import FakeWorksheet, FakeClient, make_rows
+
+# ---------------------------------------------------------
+# 추천 API 서비스를 가짜 시트/모델로 띄우기 (네트워크 없음, 벤치마크/데모용)
+#   실행: (Main 폴더에서) python -m benchmarks.fake_service --rows 2000 [--port 8600 --concurrency 32]
+# ---------------------------------------------------------
+
+
+def use_fake_backends(rows=1000, model_latency=0.5, answer=None, workdir=None, rate_429=0.0, rate_503=0.0):
+    """
+    시크릿/네트워크 없이 가짜 시트와 가짜 모델로 실행하도록 바꿔 끼웁니다.
+    로그 스풀/투표 저널/별칭 파일은 workdir(없으면 임시 폴더)에 둡니다. 반환: (시트, 로그 시트, 모델)
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix="jobfit-service-")
+    db_manager.SNAPSHOT_CACHE_PATH = None
+    db_manager.LOG_SPOOL_PATH = os.path.join(workdir, "log.jsonl")
+    db_manager.VOTE_JOURNAL_PATH = os.path.join(workdir, "votes.jsonl")
+    db_manager.JOB_ALIAS_PATH = os.path.join(workdir, "aliases.json")
+
+    ws, log_ws = FakeWorksheet(make_rows(rows), rtt=0.05, sleep=True), FakeWorksheet([], rtt=0.05, sleep=True)
+    storage = SheetsStorage(lambda: FakeClient(ws, log_ws), "fake://sheet")
+    db_manager.get_storage = lambda: storage
+    model = FakeGenerativeModel(answer or CANNED_ANSWER, first_delay=model_latency, interval=0.01, chunk_size=200,
+                                faults=FaultInjector(rate_429, rate_503, seed=7))
+    install(ai_manager, model)
+    return ws, log_ws, model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 시트/모델로 추천 API 서비스 실행 (나머지 옵션은 modules.service 와 같음)")
+    parser.add_argument("--rows", type=int, default=1000, help="합성 DB 행 수")
+    parser.add_argument("--model-latency", type=float, default=0.5, help="가짜 모델 첫 청크 지연(초)")
+    args, rest = parser.parse_known_args(argv)
+    use_fake_backends(args.rows, args.model_latency)
+    service.main(rest)
+
+
+if __name__ == "__main__":
+    main()
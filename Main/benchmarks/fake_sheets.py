@@ -0,0 +1,149 @@
+import threading
+import time
+
+# ---------------------------------------------------------
+# gspread 워크시트 대역 (네트워크 없이 API 호출 비용만 흉내)
+# ---------------------------------------------------------
+HEADER = ['직무', '상황', '결과물', '추천도구', '특징_및_팁', '유료여부', '링크', '비추천수', '추천수']
+
+# Sheets API 기본 할당량: 프로젝트당 분당 읽기/쓰기 요청 각 300회, 사용자당 60회
+SHEETS_QUOTA_PER_MIN = 300
+
+
+class FakeAPIError(Exception):
+    """gspread.exceptions.APIError 대역 (할당량 초과 시 code=429)."""
+
+    def __init__(self, message, code=429):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeWorksheet:
+    """
+    gspread.Worksheet 에서 이 앱이 쓰는 메서드만 구현한 메모리 시트.
+    호출마다 '왕복 지연 + 전송 셀 수 × 셀당 비용' 만큼을 simulated_latency 에 누적하고,
+    sleep=True 이면 실제로도 그만큼 대기합니다.
+    quota(fake_gemini.QuotaBackend(..., error=FakeAPIError))를 주면 할당량을 넘는 호출은 429 로 실패합니다.
+    """
+
+    def __init__(self, rows=None, rtt=0.08, per_cell=0.000002, sleep=False, quota=None):
+        self.values = [list(HEADER)] + [list(map(str, r)) for r in (rows or [])]
+        self.rtt = rtt
+        self.per_cell = per_cell
+        self.sleep = sleep
+        self.quota = quota
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.cells = 0
+        self.simulated_latency = 0.0
+        self.modified = 0
+
+    def _cost(self, cells):
+        if self.quota is not None: self.quota.check()
+        delay = self.rtt + cells * self.per_cell
+        with self.lock:
+            self.calls += 1
+            self.cells += cells
+            self.simulated_latency += delay
+        if self.sleep: time.sleep(delay)
+
+    def reset_stats(self):
+        self.calls = self.cells = 0
+        self.simulated_latency = 0.0
+
+    # --- 읽기 ---
+    def get_all_records(self):
+        self._cost(sum(len(r) for r in self.values))
+        header = self.values[0]
+        return [dict(zip(header, r + [""] * (len(header) - len(r)))) for r in self.values[1:]]
+
+    def get_all_values(self):
+        self._cost(sum(len(r) for r in self.values))
+        return [list(r) for r in self.values]
+
+    def row_values(self, row):
+        self._cost(len(self.values[0]))
+        return list(self.values[row - 1]) if row - 1 < len(self.values) else []
+
+    def col_values(self, col):
+        self._cost(len(self.values))
+        return [r[col - 1] if len(r) >= col else "" for r in self.values]
+
+    # --- 쓰기 ---
+    def clear(self):
+        self._cost(0)
+        self.modified += 1
+        self.values = []
+
+    def update(self, range_name='A1', values=None, **kwargs):
+        self._cost(sum(len(r) for r in values or []))
+        self.modified += 1
+        self.values = [list(map(str, r)) for r in values or []]
+
+    def update_cell(self, row, col, value):
+        self._cost(1)
+        self.modified += 1
+        self.values[row - 1][col - 1] = str(value)
+
+    def batch_update(self, data, **kwargs):
+        # range 는 'A{행}:...' 형식만 (이 앱이 보내는 형식)
+        self._cost(sum(len(r) for d in data for r in d["values"]))
+        self.modified += 1
+        for d in data:
+            start = d["range"].split("!")[-1].split(":")[0]
+            row = int("".join(ch for ch in start if ch.isdigit()))
+            for i, values in enumerate(d["values"]):
+                self.values[row - 1 + i] = list(map(str, values))
+
+    def append_row(self, values, **kwargs):
+        self._cost(len(values))
+        self.modified += 1
+        self.values.append(list(map(str, values)))
+        n = len(self.values)
+        return {"updates": {"updatedRange": f"Sheet1!A{n}:I{n}"}}
+
+    def append_rows(self, values, **kwargs):
+        self._cost(sum(len(v) for v in values))
+        self.modified += 1
+        start = len(self.values) + 1
+        self.values.extend(list(map(str, v)) for v in values)
+        return {"updates": {"updatedRange": f"Sheet1!A{start}:I{len(self.values)}"}}
+
+    def delete_rows(self, start_index, end_index=None):
+        self._cost(1)
+        self.modified += 1
+        end_index = end_index or start_index
+        del self.values[start_index - 1:end_index]
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets):
+        self.worksheets = worksheets
+
+    def get_worksheet(self, i):
+        return self.worksheets[i]
+
+    def get_lastUpdateTime(self):
+        # 실제 API 는 RFC3339 시각 문자열. 여기서는 수정될 때마다 바뀌는 값이면 충분
+        self.worksheets[0]._cost(0)
+        return str(sum(ws.modified for ws in self.worksheets))
+
+
+class FakeClient:
+    def __init__(self, *worksheets):
+        self.spreadsheet = FakeSpreadsheet(list(worksheets))
+
+    def open_by_url(self, url):
+        return self.spreadsheet
+
+
+def make_rows(n, n_jobs=40, n_situations=12):
+    """벤치마크용 합성 도구 행 n개."""
+    rows = []
+    for i in range(n):
+        rows.append([
+            f"직무{i % n_jobs}", f"상황{i % n_situations}", "보고서",
+            f"Tool-{i}", f"도구 {i}번의 특징과 활용 팁입니다.", "무료",
+            f"https://tool{i}.example.com", 0, i % 7,
+        ])
+    return rows
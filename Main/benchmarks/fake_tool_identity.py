@@ -0,0 +1,25 @@
+import pandas as pd
+from modules.sqlite_backend import SQLiteStorage
+from modules.tool_identity import build_parser, merge_storage
+from .fake_sheets import make_rows, HEADER
+
+# ---------------------------------------------------------
+# 중복 도구 병합 CLI 를 합성 테이블(메모리 SQLite)로 실행 (네트워크 없음)
+#   실행: (Main 폴더에서) python -m benchmarks.fake_tool_identity [--apply]
+# ---------------------------------------------------------
+
+
+def main(argv=None):
+    parser = build_parser()
+    parser.description = "합성 테이블로 중복 도구 병합 미리보기/반영"
+    args = parser.parse_args(argv)
+    storage = SQLiteStorage(":memory:")
+    df = pd.DataFrame(make_rows(20), columns=HEADER)
+    # 대소문자/전각/공백만 다른 이름은 합치고, 괄호 설명이 붙은 이름은 다른 도구로 남김
+    df.loc[5, '추천도구'], df.loc[9, '추천도구'], df.loc[12, '추천도구'] = " tool-1 ", "ＴＯＯＬ－１", "Tool-1 (무료)"
+    storage.replace_tools(df)
+    merge_storage(storage, args.apply)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,201 @@
 import streamlit as st
-import google.generativeai as genai
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from google.api_core import exceptions
+import contextlib
+import contextvars
 import time
 import json
 import difflib
-from .config import SYSTEM_PROMPT_TEMPLATE, MODEL_NAME
+from .config import (
+    SYSTEM_PROMPT_TEMPLATE, MODEL_NAME, RETRIEVAL_TOP_K,
+    ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_BYTES, ANSWER_CACHE_SIMILARITY, QUICK_ASK_TEMPLATE, QUICK_ASK_OUTPUTS_TEMPLATE,
+    CACHE_WARM_ENABLED, CACHE_WARM_WORKERS, CACHE_WARM_RPM, CACHE_WARM_MIN_INTERVAL,
+    GEMINI_RPM, GEMINI_TPM, RATE_LIMIT_WAIT_TIMEOUT, RATE_LIMIT_BACKOFF_BASE,
+    KEY_FAILURE_THRESHOLD, KEY_COOLDOWN_BASE, KEY_COOLDOWN_MAX, KEY_SWITCH_DELAY,
+    HISTORY_TOKEN_BUDGET, HISTORY_KEEP_RECENT,
+    CONTEXT_FORMAT, CONTEXT_FIELD_CAPS, CONTEXT_DEDUPE_LINKS, JOB_MATCH_CUTOFF, LOCAL_RANK_TOP_K,
+)
+from .retriever import ToolRetriever
+from .answer_parser import parse_answer_tools, is_quick_question
+from .client_pool import ModelPool
+from .answer_cache import AnswerCache, answer_version, history_digest
+from .single_flight import SingleFlight, FlightAbandoned
+from .cache_warmer import CacheWarmer
+from .rate_limiter import estimate_tokens, backoff_delay
+from .key_pool import KeyPool, key_id
+from .history import compact_history
+from .context_format import ContextEncoder
+from .local_ranker import question_facets, rank_tools
+from .metrics import metrics
 
 # ---------------------------------------------------------
 # 1. 제미나이 설정 (공통 사용)
 # ---------------------------------------------------------
-def configure_genai():
+def get_shared_api_keys():
+    # 공용 키 목록: GOOGLE_API_KEYS(목록) + GOOGLE_API_KEY, 중복 제외
+    keys = []
     try:
-        api_key = None
+        if "GOOGLE_API_KEYS" in st.secrets: keys.extend(st.secrets["GOOGLE_API_KEYS"])
+        if "GOOGLE_API_KEY" in st.secrets: keys.append(st.secrets["GOOGLE_API_KEY"])
+    except Exception as e:
+        print(f"시크릿 로드 오류: {e}")
+    return list(dict.fromkeys(k.strip() for k in keys if k and k.strip()))
+
+# 공용 키 풀 (키별 할당량/상태, 프로세스 공용)
+@st.cache_resource
+def get_key_pool():
+    return KeyPool(get_shared_api_keys(), GEMINI_RPM, GEMINI_TPM,
+                   failure_threshold=KEY_FAILURE_THRESHOLD, cooldown=KEY_COOLDOWN_BASE,
+                   max_cooldown=KEY_COOLDOWN_MAX, on_quarantine=lambda key: get_model_pool().drop_key(key))
+
+def get_shared_api_key():
+    # 공용 키 중 지금 여유가 가장 많은 키 (세션과 무관하므로 백그라운드 스레드에서도 사용 가능)
+    return get_key_pool().select()
+
+# 추천 API 서비스 요청별 사용자 키 (Streamlit 세션 대신 요청 흐름에 묶임)
+_request_api_key = contextvars.ContextVar("request_api_key", default=None)
+
+@contextlib.contextmanager
+def use_api_key(api_key):
+    """이 블록(과 여기서 넘긴 작업 스레드)에서는 api_key 를 사용자 키로 씁니다. 비어 있으면 공용 키."""
+    token = _request_api_key.set((api_key or "").strip() or None)
+    try:
+        yield
+    finally:
+        _request_api_key.reset(token)
+
+def _personal_api_key():
+    # 요청/세션에 넣은 개인 키 (없으면 None)
+    request_key = _request_api_key.get()
+    if request_key: return request_key
+    if get_script_run_ctx() is not None:
         user_key_input = st.session_state.get("USER_API_KEY", "").strip()
         if user_key_input:
-            api_key = user_key_input
-        elif "GOOGLE_API_KEY" in st.secrets:
-            api_key = st.secrets["GOOGLE_API_KEY"]
-        
+            return user_key_input
+    return None
+
+def get_api_key():
+    return _personal_api_key() or get_shared_api_key()
+
+# 키별 모델 핸들 풀 (프로세스 공용, genai.configure 전역 설정을 쓰지 않음)
+@st.cache_resource
+def get_model_pool():
+    return ModelPool()
+
+def configure_genai(api_key=None, chat=False):
+    try:
+        api_key = api_key or get_api_key()
         if not api_key: return None
 
-        genai.configure(api_key=api_key)
-        return genai.GenerativeModel(MODEL_NAME, generation_config={"temperature": 0.7})
+        pool = get_model_pool()
+        if chat:
+            # 채팅용 모델 (시스템 프롬프트는 start_chat 때 요청마다 넘김)
+            return pool.get(api_key, MODEL_NAME)
+        return pool.get(api_key, MODEL_NAME, generation_config={"temperature": 0.7})
     except Exception as e:
         print(f"모델 설정 오류: {e}")
         return None
 
+# ---------------------------------------------------------
+# 🚦 공용 키 속도 제한 (공용 키 호출은 모두 그 키의 대기열을 통과)
+# ---------------------------------------------------------
+def admit(api_key, prompt_text, on_wait=None):
+    """
+    공용 키로 호출하기 전에 그 키의 할당량 차례를 기다립니다. (개인 키는 각자 할당량이므로 통과)
+    on_wait(순번, 예상 대기초) 로 대기 상황을 알려주며, 너무 오래 걸리면 429 로 처리합니다.
+    """
+    admitted = get_key_pool().acquire(api_key, estimate_tokens(prompt_text), on_wait=on_wait,
+                                      timeout=RATE_LIMIT_WAIT_TIMEOUT)
+    if admitted is False:
+        # 재시도하면 다른 공용 키를 고름
+        raise exceptions.ResourceExhausted("요청 대기열 대기 시간 초과 또는 키 일시 중지")
+
+@contextlib.contextmanager
+def key_outcome(api_key):
+    """이 블록의 모델 호출 결과(성공/429/503/잘못된 키)를 공용 키 풀에 알림. 개인 키는 무시됨."""
+    pool = get_key_pool()
+    done = False
+    try:
+        yield
+        done = True
+    except Exception as e:
+        pool.report(api_key, e)
+        raise
+    finally:
+        if done: pool.report(api_key)
+        else: pool.settle(api_key)
+
+def rate_limited_backoff(attempt):
+    """
+    429 를 받았을 때 기다릴 시간(지터 포함). 429 를 낸 공용 키는 풀에서 이미 쉬는 중이므로,
+    바로 쓸 수 있는 다른 공용 키가 있으면 짧게만 쉬고 그 키로 재시도합니다.
+    """
+    delay = backoff_delay(attempt, base=RATE_LIMIT_BACKOFF_BASE)
+    pool = get_key_pool()
+    if not _personal_api_key() and pool.available(): delay = min(delay, KEY_SWITCH_DELAY)
+    return delay
+
+def queue_label(position, eta):
+    return f"🚦 요청이 많아 순서를 기다리는 중... (대기 {position}번째, 약 {eta:.0f}초)"
+
+# ---------------------------------------------------------
+# 🔗 동일 요청 합치기 (같은 질문이 동시에 들어오면 모델 호출 1번)
+# ---------------------------------------------------------
+@st.cache_resource
+def get_single_flight():
+    return SingleFlight()
+
+def flight_key(kind, api_key, *parts):
+    # 키별 오류(잘못된 키 등)가 다른 사용자에게 전달되지 않도록 API 키 해시도 포함
+    # 공용 키 풀의 키는 모두 같은 사용자(익명)이므로 하나로 묶음
+    owner = "shared" if get_key_pool().owns(api_key) else key_id(api_key)
+    return (kind, owner) + parts
+
+def answer_flight_key(api_key, messages, db_version):
+    # 합치기는 질문 원문 + 이전 대화 원문 해시 기준
+    # (캐시용 정규화는 C++ / C# 처럼 다른 질문을 같게 볼 수 있어, 동시에 들어온 다른 질문이 한 답변을 받게 됨)
+    return flight_key("answer", api_key, db_version, history_digest(messages, normalize=str), messages[-1]["content"])
+
 # ---------------------------------------------------------
 # 🛠️ [503 오류 대응] 스마트 AI 호출 처리
 # ---------------------------------------------------------
-def call_ai_common(prompt, status_msg, output_type="text", fallback_value=None):
-    model = configure_genai()
-    if not model: return fallback_value
+def record_model_error(kind, error, retrying):
+    """모델 호출 오류를 종류별로 집계 (다시 시도한 것 / 포기한 것 구분)."""
+    metrics.count("model.retry" if retrying else "model.failure", kind=kind, error=error)
+
+class _QuietStatus:
+    """Streamlit 화면 밖(추천 API 서비스, 배치 작업)에서 쓰는 st.status 대역."""
+    def update(self, **kwargs): pass
+
+@contextlib.contextmanager
+def _status(label):
+    if get_script_run_ctx() is None:
+        yield _QuietStatus()
+        return
+    with st.status(label, expanded=False) as status:
+        yield status
 
+def call_ai_common(prompt, status_msg, output_type="text", fallback_value=None):
     max_retries = 1       # 최대 1번 재시도
     base_wait_time = 2    # 기본 대기 시간 2초
 
-    with st.status(status_msg, expanded=False) as status:
+    with _status(status_msg) as status:
         for attempt in range(max_retries + 1):
+            # 시도마다 키를 다시 고름 (공용 키가 429/503 으로 쉬는 중이면 다른 키로)
+            api_key = get_api_key()
+            model = configure_genai(api_key=api_key)
+            if not model: return fallback_value
             try:
                 # 시도 로그 출력 (터미널 확인용)
                 print(f"📡 [AI 연결 시도] {attempt+1}회차...")
-                
-                response = model.generate_content(prompt)
+
+                def call():
+                    admit(api_key, prompt, on_wait=lambda pos, eta: status.update(label=queue_label(pos, eta), state="running"))
+                    with key_outcome(api_key):
+                        return model.generate_content(prompt)
+                key = flight_key("common", api_key, output_type, prompt)
+                with metrics.timer("model.call", kind=output_type):
+                    response = get_single_flight().do(key, call)
                 
                 # 빈 응답 체크
                 if not response.parts:
@@ -71,6 +224,7 @@ def call_ai_common(prompt, status_msg, output_type="text", fallback_value=None):
 
             # 🚨 503 Service Unavailable (서버 과부하/점검) 처리
             except exceptions.ServiceUnavailable:
+                record_model_error(output_type, "ServiceUnavailable", attempt < max_retries)
                 if attempt < max_retries:
                     # 점진적으로 대기 시간 늘리기 (2초 -> 4초)
                     sleep_time = base_wait_time * (2 ** attempt)
@@ -85,23 +239,31 @@ def call_ai_common(prompt, status_msg, output_type="text", fallback_value=None):
 
             # 429 Resource Exhausted (사용량 초과)
             except exceptions.ResourceExhausted:
+                record_model_error(output_type, "ResourceExhausted", attempt < max_retries)
                 if attempt < max_retries:
                     msg = f"⏳ 사용량이 많아 대기 중... ({attempt+1}/{max_retries})"
                     status.update(label=msg, state="running")
-                    time.sleep(base_wait_time)
+                    time.sleep(rate_limited_backoff(attempt))
                 else:
                     status.update(label="❌ 사용량 초과 (재시도 실패)", state="error")
                     return fallback_value
             
             # 400 API Key 오류
             except exceptions.InvalidArgument:
+                # 공용 키는 풀에서 격리됐으므로 남은 공용 키로 다시 시도
+                retrying = get_key_pool().owns(api_key) and attempt < max_retries
+                record_model_error(output_type, "InvalidArgument", retrying)
+                if retrying: continue
                 status.update(label="⛔ API 키 오류", state="error")
-                if "USER_API_KEY" in st.session_state: del st.session_state["USER_API_KEY"]
+                if "USER_API_KEY" in st.session_state:
+                    get_model_pool().drop_key(st.session_state["USER_API_KEY"])
+                    del st.session_state["USER_API_KEY"]
                 return fallback_value
                 
             # 그 외 알 수 없는 오류
             except Exception as e:
                 print(f"💥 [기타 에러] {e}")
+                record_model_error(output_type, type(e).__name__, attempt < max_retries)
                 if attempt < max_retries:
                     time.sleep(1)
                 else:
@@ -113,34 +275,248 @@ def call_ai_common(prompt, status_msg, output_type="text", fallback_value=None):
 # ---------------------------------------------------------
 # 2. 메인 AI 답변 생성
 # ---------------------------------------------------------
-@st.cache_data(show_spinner=False, ttl=3600)
-def get_ai_response(messages, df_tools):
-    model = configure_genai()
-    if not model: return "⚠️ API Key 설정 오류"
-
-    csv_context = ""
-    if not df_tools.empty:
-        # 핵심 컬럼만 선별하여 토큰 절약
-        essential_cols = ['추천도구', '직무', '상황', '특징_및_팁', '추천수', '비추천수', '링크']
-        target_cols = [c for c in essential_cols if c in df_tools.columns]
-        csv_context = df_tools[target_cols].to_string(index=False)
-    
-    full_prompt = SYSTEM_PROMPT_TEMPLATE.format(csv_context=csv_context)
-    model = genai.GenerativeModel(MODEL_NAME, system_instruction=full_prompt)
+# DB 검색 인덱스 (프로세스 공용, 스냅샷이 바뀌면 달라진 행만 재색인)
+@st.cache_resource
+def get_retriever():
+    return ToolRetriever()
+
+# DB 컨텍스트 직렬화 (프로세스 공용, 스냅샷 단위로 직렬화 결과 캐시)
+@st.cache_resource
+def get_context_encoder():
+    return ContextEncoder(CONTEXT_FORMAT, caps=CONTEXT_FIELD_CAPS, dedupe_links=CONTEXT_DEDUPE_LINKS)
+
+def build_db_context(df_tools, question, top_k=RETRIEVAL_TOP_K):
+    """질문과 관련된 상위 top_k 개 도구만 골라 프롬프트용 텍스트로 만듭니다."""
+    if df_tools.empty: return ""
+
+    retriever = get_retriever()
+    retriever.sync(df_tools)
+    # 핵심 컬럼만, 패딩 없는 구분자 포맷으로 직렬화하여 토큰 절약
+    return get_context_encoder().encode(df_tools, retriever.query(question, top_k))
+
+def rank_local_tools(question, df_tools, job_names=(), top_k=LOCAL_RANK_TOP_K):
+    """모델 호출 없이 DB 에서 질문에 맞는 도구 top_k 개 (미리보기 카드/대체 답변용)."""
+    if df_tools.empty: return []
+    with metrics.timer("local_rank"):
+        job, situation, outputs = question_facets(question, job_names)
+        relevant = ()
+        retriever = get_retriever()
+        # 직무/상황을 알 수 없는 자유 질문만 검색 인덱스 관련도로 후보를 고름.
+        # 미리보기는 몇 ms 안에 나와야 하므로 이 스냅샷의 색인이 아직 없으면 만들지 않고
+        # (전체 색인은 행 수에 비례) 직무명/결과물 일치만으로 고름. 색인은 프롬프트를 만들 때 준비됨
+        if not job and not situation and retriever.ready(df_tools):
+            relevant = retriever.query(question, RETRIEVAL_TOP_K)
+        return rank_tools(df_tools, job, situation, outputs, relevant=relevant, top_k=top_k)
+
+def build_quick_question(job, sit, out):
+    """사이드바 빠른 추천 질문 문장 (캐시 워밍과 같은 문장을 써야 캐시가 맞음)."""
+    outs_msg = QUICK_ASK_OUTPUTS_TEMPLATE.format(outputs=", ".join(out)) if out else ""
+    return QUICK_ASK_TEMPLATE.format(job=job, sit=sit, outs_msg=outs_msg)
+
+def _start_chat(messages, df_tools, api_key=None, on_wait=None):
+    """
+    시스템 프롬프트(DB 컨텍스트 포함)와 이전 대화로 채팅 세션을 엽니다.
+    반환 직전에 속도 제한 대기열을 통과하므로, 바로 send_message 하면 됩니다.
+    """
+    # 최근 사용자 질문들을 검색어로 사용 (후속 질문에도 앞 맥락 반영)
+    question = " ".join(m["content"] for m in messages[-3:] if m["role"] == "user")
+    with metrics.timer("prompt.build"):
+        csv_context = build_db_context(df_tools, question)
+        full_prompt = SYSTEM_PROMPT_TEMPLATE.format(csv_context=csv_context)
+        # 이전 대화는 토큰 예산 안으로 압축 (최근 턴 원문 + 오래된 답변은 도구 목록으로)
+        history = compact_history(messages, budget=HISTORY_TOKEN_BUDGET, keep_recent=HISTORY_KEEP_RECENT)
+
+    api_key = api_key or get_api_key()
+    model = configure_genai(api_key=api_key, chat=True)
+    if not model: return None
+
+    prompt_text = full_prompt + "".join(p for h in history for p in h["parts"]) + messages[-1]["content"]
+    if metrics.enabled:
+        metrics.observe("prompt.chars", len(prompt_text))
+        metrics.observe("prompt.tokens", estimate_tokens(prompt_text))
+    with metrics.timer("rate_limit.wait"):
+        admit(api_key, prompt_text, on_wait=on_wait)
+    return model.start_chat(history=history, system_instruction=full_prompt)
+
+# 답변 캐시 (질문 정규화 + DB 스냅샷 버전 기준, 프로세스 공용)
+@st.cache_resource
+def get_answer_cache():
+    return AnswerCache(ttl=ANSWER_CACHE_TTL, max_bytes=ANSWER_CACHE_MAX_BYTES, similarity=ANSWER_CACHE_SIMILARITY)
+
+def _cacheable(text):
+    return bool(text) and not text.startswith(("❌", "⚠️"))
+
+def get_ai_response(messages, df_tools, db_version=None, on_wait=None):
+    # db_version 을 모르면 DB 가 바뀌어도 알 수 없으므로 캐시를 쓰지 않음
+    cache = get_answer_cache() if db_version is not None else None
+    if cache is not None:
+        cached = cache.get(messages, db_version)
+        metrics.count("answer_cache", result="miss" if cached is None else "hit")
+        if cached is not None: return cached
+
+    api_key = get_api_key()
+    if not api_key: return "⚠️ API Key 설정 오류"
 
-    history = [{"role": "user" if m["role"]=="user" else "model", "parts": [m["content"]]} for m in messages[:-1]]
-    
     try:
-        chat = model.start_chat(history=history)
-        response = chat.send_message(messages[-1]["content"])
-        return response.text
+        # 같은 질문이 이미 생성 중이면 그 결과를 함께 받음
+        key = answer_flight_key(api_key, messages, db_version)
+        text = get_single_flight().do(key, lambda: generate_answer(messages, df_tools, api_key=api_key, on_wait=on_wait))
+    except exceptions.ResourceExhausted:
+        # 429 는 호출자(get_ai_response_safe)가 재시도
+        raise
     except Exception as e:
         return f"❌ 오류 발생: {str(e)}"
 
+    if cache is not None and _cacheable(text): cache.put(messages, db_version, text)
+    return text
+
+def generate_answer(messages, df_tools, api_key=None, on_wait=None):
+    """캐시 처리 없이 답변 한 번 생성. 오류는 예외로 전달합니다. (백그라운드 작업에도 사용)"""
+    api_key = api_key or get_api_key()
+    chat = _start_chat(messages, df_tools, api_key=api_key, on_wait=on_wait)
+    if not chat: raise RuntimeError("API Key 설정 오류")
+    with metrics.timer("model.generate", mode="blocking"), key_outcome(api_key):
+        return chat.send_message(messages[-1]["content"]).text
+
+# 빠른 추천 답변 미리 만들기 (공용 키 사용, 프로세스 공용)
+@st.cache_resource
+def get_cache_warmer():
+    def answer(messages, df_tools):
+        return generate_answer(messages, df_tools, api_key=get_shared_api_key())
+    return CacheWarmer(answer, get_answer_cache(), build_quick_question,
+                       max_workers=CACHE_WARM_WORKERS, rate_per_min=CACHE_WARM_RPM,
+                       min_interval=CACHE_WARM_MIN_INTERVAL)
+
+def warm_quick_answers(df_tools, db_version, facets=None):
+    """
+    새 DB 스냅샷이면 모든 (직무, 상황) 빠른 추천 답변을 백그라운드에서 미리 생성.
+    facets(스냅샷의 FacetIndex)를 주면 answer_version 으로 저장하므로, 답변 요청도 같은 버전으로 찾아야 합니다.
+    """
+    if not CACHE_WARM_ENABLED or df_tools.empty or not get_key_pool(): return False
+    return get_cache_warmer().schedule(df_tools, db_version, facets)
+
+# ---------------------------------------------------------
+# 2-1. 스트리밍 답변 생성 (첫 글자까지의 대기 시간 단축)
+# ---------------------------------------------------------
+class StreamStats:
+    """스트리밍 1회의 시작/첫 청크/종료 시각 기록 (time.perf_counter 기준)."""
+
+    def __init__(self):
+        self.started = None
+        self.first_chunk = None
+        self.finished = None
+        self.chunks = 0
+        self.cancelled = False
+
+    @property
+    def ttft(self):
+        if self.started is None or self.first_chunk is None: return None
+        return self.first_chunk - self.started
+
+    @property
+    def total(self):
+        if self.started is None or self.finished is None: return None
+        return self.finished - self.started
+
+def stream_ai_response(messages, df_tools, cancel_event=None, stats=None, db_version=None, on_wait=None):
+    """
+    답변을 청크 단위로 yield 하는 제너레이터.
+    - cancel_event(threading.Event)가 설정되면 다음 청크에서 조용히 종료합니다.
+    - API 예외(429 등)는 그대로 호출자에게 전달되므로 재시도는 호출자가 판단합니다.
+    - db_version 이 주어지면 답변 캐시를 먼저 확인하고, 끝까지 받은 답변은 캐시에 저장합니다.
+    """
+    stats = stats if stats is not None else StreamStats()
+    stats.started = time.perf_counter()
+    cache = get_answer_cache() if db_version is not None else None
+    sent = None   # 모델에 보낸 시각 (캐시/합류로 끝나면 None)
+    try:
+        if cache is not None:
+            cached = cache.get(messages, db_version)
+            metrics.count("answer_cache", result="miss" if cached is None else "hit")
+            if cached is not None:
+                stats.first_chunk = time.perf_counter()
+                stats.chunks = 1
+                yield cached
+                return
+
+        api_key = get_api_key()
+        if not api_key:
+            yield "⚠️ API Key 설정 오류"
+            return
+
+        # 같은 질문이 이미 생성 중이면 완성본을 기다렸다가 한 번에 받음
+        flights = get_single_flight()
+        key = answer_flight_key(api_key, messages, db_version)
+        flight, leader = flights.begin(key)
+        if not leader:
+            metrics.count("single_flight", result="joined")
+            try:
+                shared = flight.wait()
+                stats.first_chunk = time.perf_counter()
+                stats.chunks = 1
+                yield shared
+                return
+            except FlightAbandoned:
+                pass  # 선행 요청이 취소됨 → 직접 생성
+
+        full_text, error = None, FlightAbandoned("스트리밍 취소")
+        try:
+            chat = _start_chat(messages, df_tools, api_key=api_key, on_wait=on_wait)
+            if not chat:
+                yield "⚠️ API Key 설정 오류"
+                return
+
+            with key_outcome(api_key):
+                sent = time.perf_counter()
+                response = chat.send_message(messages[-1]["content"], stream=True)
+                parts = []
+                for chunk in response:
+                    if cancel_event is not None and cancel_event.is_set():
+                        stats.cancelled = True
+                        return
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # 안전 필터 등으로 텍스트가 없는 청크
+                        continue
+                    if not text: continue
+                    if stats.first_chunk is None: stats.first_chunk = time.perf_counter()
+                    stats.chunks += 1
+                    parts.append(text)
+                    yield text
+
+            full_text = "".join(parts)
+            if cache is not None and _cacheable(full_text): cache.put(messages, db_version, full_text)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if leader:
+                if full_text is not None: flights.finish(key, flight, result=full_text)
+                else: flights.finish(key, flight, error=error)
+    finally:
+        stats.finished = time.perf_counter()
+        if sent is not None:
+            metrics.observe_seconds("model.ttft", stats.first_chunk - sent if stats.first_chunk else None)
+            metrics.observe_seconds("model.generate", stats.finished - sent, mode="stream",
+                                    cancelled=stats.cancelled)
+
 # ---------------------------------------------------------
 # 3. 도구 정보 추출
 # ---------------------------------------------------------
 def parse_tools(user_question, ai_answer):
+    # 1차: 빠른 추천 질문이면 답변 포맷(> ### [섹션] 도구명)을 로컬에서 바로 파싱 (AI 호출 없음)
+    # 자유 질문은 직무/상황을 질문에서 유추해야 하므로 AI 추출을 먼저 쓰고, 실패하면 로컬 결과('기타')로
+    tools = parse_answer_tools(user_question, ai_answer)
+    if tools and is_quick_question(user_question):
+        metrics.count("parse_tools", path="local")
+        return tools
+    metrics.count("parse_tools", path="ai")
+    with metrics.timer("parse_tools.ai"):
+        return parse_tools_ai(user_question, ai_answer) or tools
+
+def parse_tools_ai(user_question, ai_answer):
+    # 2차(fallback): 양식을 벗어난 답변은 AI로 추출
     # 답변 포맷(> ### [섹션] 도구명)에 맞춰 추출 프롬프트 최적화
     prompt = f"""
     [지시사항]
@@ -177,10 +553,12 @@ def parse_tools(user_question, ai_answer):
     )
 
 # ---------------------------------------------------------
-# 4. 직무 표준화 (difflib)
+# 4. 직무 표준화 (difflib / 글자 색인)
 # ---------------------------------------------------------
-def normalize_job_category(input_job, existing_jobs):
+def normalize_job_category(input_job, existing_jobs, index=None):
+    """입력 직무를 기존 직무 중 가장 비슷한 것(유사도 0.6 이상)으로 바꿉니다. index(JobTitleIndex)가 있으면 색인 사용."""
+    if index is not None: return index.sync(existing_jobs).normalize(input_job, JOB_MATCH_CUTOFF)
     input_job = input_job.strip()
     if input_job in existing_jobs: return input_job
-    matches = difflib.get_close_matches(input_job, existing_jobs, n=1, cutoff=0.6)
+    matches = difflib.get_close_matches(input_job, existing_jobs, n=1, cutoff=JOB_MATCH_CUTOFF)
     return matches[0] if matches else input_job
\ No newline at end of file
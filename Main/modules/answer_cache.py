@@ -0,0 +1,181 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
+from .answer_parser import parse_question
+
+# ---------------------------------------------------------
+# 질문 정규화 기반 답변 캐시 (LRU + TTL + 메모리 상한)
+# ---------------------------------------------------------
+# 키 = (DB 스냅샷 버전, 이전 대화 해시, 정규화된 질문)
+# 빠른 추천 첫 질문은 스냅샷 버전 대신 (직무, 상황) 도구 목록 해시를 버전으로 씁니다. (answer_version)
+# 빠른 추천 양식의 첫 질문(이전 대화 없음)만 토큰 유사도로 거의 같은 질문도 재사용하며,
+# 이때도 (직무, 상황, 결과물)이 같아야 합니다. 자유 질문은 단어 하나(엑셀/구글시트, 무료/유료)만
+# 달라도 유사도가 거의 그대로라 정확히 같은 키일 때만 재사용합니다.
+# 문장 부호는 지우되 C++ / C# / Node.js 처럼 이름의 일부인 + # . 는 남깁니다.
+_PUNCT_RE = re.compile(r"[^\w\s+#.]")
+_SPACE_RE = re.compile(r"\s+")
+
+# 유사도 비교에서 빼는 상투어 (빠른 추천 양식 문구 포함).
+# 이 단어들을 빼고 남은 '내용 토큰'이 거의 같아야 같은 질문으로 봅니다.
+_FILLER = {
+    "나의", "직무는", "인데", "업무", "할", "때", "도움되는", "ai", "도구", "좀", "추천해", "줘",
+    "추천", "추천해줘", "알려줘", "필요한", "결과물", "좋은", "어떤", "뭐", "써야", "해", "위한",
+}
+
+
+def normalize_question(text):
+    text = unicodedata.normalize("NFKC", str(text)).lower()
+    text = _PUNCT_RE.sub(" ", text.replace("**", ""))
+    # 문장 끝 마침표만 제거 (단어 안/앞의 . 은 유지: node.js, .net)
+    return " ".join(w for w in (w.rstrip(".") for w in _SPACE_RE.split(text)) if w)
+
+
+def content_tokens(normalized):
+    """상투어를 뺀 단어와 그 글자 2-gram 집합."""
+    tokens = set()
+    for word in normalized.split():
+        if word in _FILLER: continue
+        tokens.add(word)
+        tokens.update(word[i:i + 2] for i in range(len(word) - 1))
+    return frozenset(tokens)
+
+
+def question_facets(question):
+    """(직무, 상황, 결과물 집합). 결과물은 순서와 무관하게 비교합니다. 자유 질문이면 ('기타', '', ∅)."""
+    job, situation, output = parse_question(question)
+    return job, situation, frozenset(o.strip() for o in output.split(",") if o.strip())
+
+
+def history_digest(messages, normalize=normalize_question):
+    """마지막 질문을 제외한 이전 대화의 해시. 첫 질문이면 빈 문자열. (normalize=str 이면 원문 기준)"""
+    if len(messages) <= 1: return ""
+    h = hashlib.sha256()
+    for m in messages[:-1]:
+        h.update(m["role"].encode("utf-8"))
+        h.update(normalize(m["content"]).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def cache_key(messages, db_version):
+    """(DB 버전, 이전 대화 해시, 정규화된 마지막 질문). (동일 요청 합치기는 원문 기준: ai_manager.answer_flight_key)"""
+    return (db_version, history_digest(messages), normalize_question(messages[-1]["content"]))
+
+
+def answer_version(messages, facets, db_version):
+    """
+    답변 캐시에 쓸 버전. 빠른 추천 첫 질문이면 그 (직무, 상황)의 도구 목록 해시를 씁니다.
+    투표는 추천수만 바꾸므로, 스냅샷 버전이 올라가도 미리 만든 답변을 계속 찾을 수 있습니다.
+    그 외(자유 질문, 이어지는 대화, DB 에 없는 조합)는 스냅샷 버전 그대로.
+    """
+    if facets is None or len(messages) != 1: return db_version
+    job, situation, _ = question_facets(messages[-1]["content"])
+    digest = facets.pair_digest(job, situation) if situation else None
+    return ("facet", job, situation, digest) if digest else db_version
+
+
+class AnswerCache:
+    def __init__(self, ttl=3600, max_bytes=50 * 1024 * 1024, max_entries=5000, similarity=0.85):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()        # 키 -> (답변, 저장 시각, 토큰 집합, 크기, 질문 양식 값)
+        self.token_index = defaultdict(set) # (버전, 토큰) -> 첫 질문 키 집합 (유사 질문 후보)
+        self.bytes = 0
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, messages, db_version):
+        return cache_key(messages, db_version)
+
+    # --- 내부 정리 ---
+    def _drop(self, key):
+        answer, _, tokens, size, _ = self.entries.pop(key)
+        self.bytes -= size
+        if not key[1]:
+            for tok in tokens:
+                bucket = self.token_index.get((key[0], tok))
+                if bucket is None: continue
+                bucket.discard(key)
+                if not bucket: del self.token_index[(key[0], tok)]
+
+    def _expired(self, stored_at):
+        return (time.time() - stored_at) > self.ttl
+
+    def _near(self, key, tokens, facets):
+        """같은 DB 버전, 같은 (직무, 상황, 결과물)의 빠른 추천 첫 질문 중 Jaccard 유사도가 기준 이상인 가장 가까운 키."""
+        if not tokens or not facets[1]: return None
+        counts = defaultdict(int)
+        for tok in tokens:
+            for cand in self.token_index.get((key[0], tok), ()):
+                counts[cand] += 1
+        best, best_score = None, self.similarity
+        for cand, inter in counts.items():
+            _, _, cand_tokens, _, cand_facets = self.entries[cand]
+            # 결과물 등은 상투어 사이의 짧은 토큰이라 유사도만으로는 구분되지 않음
+            if cand_facets != facets: continue
+            score = inter / (len(tokens) + len(cand_tokens) - inter)
+            if score >= best_score: best, best_score = cand, score
+        return best
+
+    # --- 공개 API ---
+    def get(self, messages, db_version):
+        key = self._key(messages, db_version)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None and not key[1] and self.similarity < 1.0:
+                near = self._near(key, content_tokens(key[2]), question_facets(messages[-1]["content"]))
+                if near is not None:
+                    entry, key = self.entries[near], near
+                    if not self._expired(entry[1]): self.near_hits += 1
+            elif entry is not None and not self._expired(entry[1]):
+                self.hits += 1
+            if entry is None or self._expired(entry[1]):
+                if entry is not None: self._drop(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def peek(self, messages, db_version):
+        """통계에 남기지 않고 (정확히 같은 키의) 유효한 답변이 있는지만 확인합니다."""
+        key = self._key(messages, db_version)
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry is not None and not self._expired(entry[1])
+
+    def put(self, messages, db_version, answer):
+        key = self._key(messages, db_version)
+        facets = question_facets(messages[-1]["content"])
+        # 유사 질문 후보는 빠른 추천 첫 질문만 (자유 질문은 정확히 같은 키로만 찾음)
+        tokens = content_tokens(key[2]) if not key[1] and facets[1] else frozenset()
+        size = len(answer.encode("utf-8")) + len(key[2].encode("utf-8"))
+        if size > self.max_bytes: return
+        with self.lock:
+            if key in self.entries: self._drop(key)
+            self.entries[key] = (answer, time.time(), tokens, size, facets)
+            self.bytes += size
+            for tok in tokens:
+                self.token_index[(db_version, tok)].add(key)
+            while self.bytes > self.max_bytes or len(self.entries) > self.max_entries:
+                self._drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+            }
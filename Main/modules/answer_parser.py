@@ -0,0 +1,110 @@
+import re
+import string
+from .config import QUICK_ASK_TEMPLATE, QUICK_ASK_OUTPUTS_TEMPLATE
+
+# ---------------------------------------------------------
+# 답변 포맷(SYSTEM_PROMPT_TEMPLATE) 기반 로컬 도구 추출기
+# ---------------------------------------------------------
+# > ### [섹션명] 도구명
+# > * **가격:** ...   > * **링크:** ...   > * **💡 팁:** ...
+_HEADER_RE = re.compile(r"^#{1,6}\s*(.+?)\s*#*\s*$")
+_SECTION_RE = re.compile(r"\[([^\]]+)\]\s*(.*)$")
+_FIELD_RE = re.compile(r"^[*\-]?\s*\*\*(.+?)\*\*\s*(.*)$")
+_URL_RE = re.compile(r"https?://[^\s)\]>\"']+")
+_MD_LINK_RE = re.compile(r"\[([^\]]*)\]\(([^)]+)\)")
+
+_EMPTY_NAMES = {"없음", "해당 없음", "-", "N/A"}
+
+
+def _template_re(template, fields):
+    """양식 문자열의 {필드} 를 fields[필드] 정규식 그룹으로, 나머지 글자는 그대로 맞추는 정규식."""
+    parts = []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        parts.append(re.escape(literal))
+        if field is not None: parts.append(fields[field])
+    return re.compile("".join(parts))
+
+
+# 빠른 추천 양식은 config 의 문장에서 만들어, 양식 문구를 고쳐도 파서가 어긋나지 않도록 함
+_QUICK_RE = _template_re(QUICK_ASK_TEMPLATE, {"job": "(.+?)", "sit": "(.+?)", "outs_msg": ""})
+_OUTPUT_RE = _template_re(QUICK_ASK_OUTPUTS_TEMPLATE.strip(), {"outputs": "([^)]*)"})
+
+
+def _clean(text):
+    text = _MD_LINK_RE.sub(r"\1", text)
+    return text.replace("**", "").strip()
+
+
+def _field_key(label):
+    label = label.rstrip(":： ").strip()
+    if "가격" in label: return "유료여부"
+    if "링크" in label: return "링크"
+    if "팁" in label: return "팁"
+    if "이유" in label: return "이유"
+    return None
+
+
+def is_quick_question(user_question):
+    """사이드바 빠른 추천 양식의 질문인지 (아니면 직무/상황을 질문에서 알 수 없음)."""
+    return _QUICK_RE.search(user_question or "") is not None
+
+
+def parse_question(user_question):
+    """빠른 추천 질문 양식에서 직무/상황/결과물을 꺼냅니다. (자유 질문이면 기본값)"""
+    job, situation, output = "기타", "", ""
+    m = _QUICK_RE.search(user_question or "")
+    if m: job, situation = m.group(1).strip(), m.group(2).strip()
+    m = _OUTPUT_RE.search(user_question or "")
+    if m: output = m.group(1).strip()
+    return job, situation, output
+
+
+def parse_answer_tools(user_question, ai_answer):
+    """
+    답변 마크다운에서 섹션 1~3의 도구를 parse_tools 와 같은 형식의 dict 리스트로 추출합니다.
+    '⚡ 레시피' 섹션부터는 무시하며, 양식을 찾지 못하면 빈 리스트를 반환합니다.
+    """
+    job, situation, output = parse_question(user_question)
+    tools, current = [], None
+
+    for raw in (ai_answer or "").splitlines():
+        line = raw.strip()
+        while line.startswith(">"): line = line[1:].strip()
+        if not line: continue
+
+        header = _HEADER_RE.match(line)
+        if header:
+            title = header.group(1)
+            if "레시피" in title: break
+            section = _SECTION_RE.search(title)
+            name = _clean(section.group(2)) if section else ""
+            current = None
+            if name and name not in _EMPTY_NAMES:
+                current = {"추천도구": name, "이유": "", "팁": "", "유료여부": "", "링크": ""}
+                tools.append(current)
+            continue
+
+        if current is None: continue
+        field = _FIELD_RE.match(line)
+        if not field: continue
+        key = _field_key(field.group(1))
+        if key is None: continue
+        value = field.group(2)
+        if key == "링크":
+            url = _URL_RE.search(value)
+            current[key] = url.group(0) if url else _clean(value)
+        else:
+            current[key] = _clean(value)
+
+    result = []
+    for t in tools:
+        result.append({
+            "추천도구": t["추천도구"],
+            "직무": job,
+            "상황": situation,
+            "결과물": output,
+            "특징_및_팁": t["팁"] or t["이유"],
+            "유료여부": t["유료여부"],
+            "링크": t["링크"],
+        })
+    return result
@@ -0,0 +1,338 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from google.api_core import exceptions
+from .config import (SYSTEM_PROMPT_TEMPLATE, GEMINI_RPM, GEMINI_TPM, RATE_LIMIT_BACKOFF_BASE,
+                     BATCH_WORKERS, BATCH_MAX_RETRIES)
+from .rate_limiter import RateLimiter, estimate_tokens, backoff_delay
+from .tool_identity import tool_key
+from .metrics import metrics
+
+# ---------------------------------------------------------
+# 일괄 추천 (질문 파일 → 결과 JSONL)
+# ---------------------------------------------------------
+# 온보딩용 도구 카탈로그를 만들거나, SYSTEM_PROMPT_TEMPLATE 을 고친 뒤 같은 질문 묶음으로 답변을 비교할 때 씁니다.
+# - 답변은 채팅과 같은 경로(ai_manager.generate_answer: DB 컨텍스트 + 시스템 프롬프트)로 만들고, 답변 캐시는 쓰지 않음
+# - 동시 호출은 workers 개, 호출 시작은 분당 요청/토큰 한도(RateLimiter) 안에서만
+# - 429/503 은 지터 섞인 지수 백오프로 재시도 (429 면 한도 대기열 전체도 잠시 멈춤)
+# - 결과 JSONL 이 체크포인트: 끝난 질문마다 한 줄씩 바로 기록하고, 다시 실행하면 같은 프롬프트로
+#   이미 성공한 id 는 건너뜀 (중간에 멈춰도 이어서 실행)
+RETRYABLE = (exceptions.ResourceExhausted, exceptions.ServiceUnavailable, exceptions.DeadlineExceeded)
+FIELD_ALIASES = {"질문": "question", "직무": "job", "상황": "situation", "결과물": "outputs"}
+
+
+def prompt_version(template=SYSTEM_PROMPT_TEMPLATE):
+    """시스템 프롬프트 해시 (결과를 어떤 프롬프트로 만들었는지 구분)."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+
+
+def _normalize(raw, line_no, question_fn):
+    row = {FIELD_ALIASES.get(k.strip(), k.strip()): v for k, v in raw.items() if k}
+    outputs = row.get("outputs") or []
+    if isinstance(outputs, str): outputs = [o.strip() for o in outputs.split(",") if o.strip()]
+    job, situation = (row.get("job") or "").strip(), (row.get("situation") or "").strip()
+    question = (row.get("question") or "").strip()
+    if not question and job and situation and question_fn is not None:
+        question = question_fn(job, situation, outputs)
+    if not question: raise ValueError(f"{line_no}번째 줄: question 또는 job/situation 이 필요합니다.")
+    return {"id": str(row.get("id") or line_no), "question": question,
+            "job": job or None, "situation": situation or None, "outputs": outputs}
+
+
+def read_questions(path, question_fn=None):
+    """
+    CSV(헤더 필수) 또는 JSONL 질문 파일 → [{'id', 'question', 'job', 'situation', 'outputs'}, ...]
+    열: id(없으면 줄 번호), question, 또는 job + situation (+ outputs: 쉼표 구분) 으로 빠른 추천 질문 생성.
+    한글 열 이름(질문/직무/상황/결과물)도 받습니다.
+    """
+    items = []
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line_no, line in enumerate(f, 1):
+                if line.strip(): items.append(_normalize(json.loads(line), line_no, question_fn))
+        else:
+            for line_no, raw in enumerate(csv.DictReader(f), 1):
+                items.append(_normalize(raw, line_no, question_fn))
+    ids = [item["id"] for item in items]
+    if len(set(ids)) != len(ids): raise ValueError("질문 id 가 중복되었습니다.")
+    return items
+
+
+def questions_from_db(df, question_fn, with_outputs=False):
+    """DB 의 모든 (직무, 상황[, 결과물]) 조합을 빠른 추천 질문으로 (온보딩 카탈로그용)."""
+    from .cache_warmer import iter_pairs
+    items = []
+    for job, sit, outs in iter_pairs(df, with_outputs):
+        item_id = "/".join([job, sit] + outs)
+        items.append({"id": item_id, "question": question_fn(job, sit, outs),
+                      "job": job, "situation": sit, "outputs": outs})
+    return items
+
+
+def read_results(path):
+    """결과 JSONL 의 id 별 마지막 기록. 마지막 줄이 쓰다 만 줄이면 무시합니다."""
+    results = {}
+    if not os.path.exists(path): return results
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            results[record["id"]] = record
+    return results
+
+
+class ResultLog:
+    """
+    결과 JSONL 기록기 (= 체크포인트). 한 줄씩 바로 flush 하므로 중간에 멈춰도 끝난 결과는 남습니다.
+    done: 같은 프롬프트(prompt)로 이미 성공한 id 집합.
+    """
+
+    def __init__(self, path, prompt, restart=False):
+        self.path = path
+        self.lock = threading.Lock()
+        if restart and os.path.exists(path): os.remove(path)
+        self.done = {rid for rid, r in read_results(path).items()
+                     if r.get("status") == "ok" and r.get("prompt") == prompt}
+        directory = os.path.dirname(path)
+        if directory: os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "a+", encoding="utf-8")
+        # 이전 실행이 줄 중간에 끊겼으면 새 줄에서 이어 씀
+        if self.file.tell():
+            self.file.seek(self.file.tell() - 1)
+            if self.file.read(1) != "\n": self.file.write("\n")
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+
+    def close(self):
+        with self.lock: self.file.close()
+
+
+class BatchRunner:
+    """
+    answer_fn(messages) -> 답변, extract_fn(question, answer) -> 도구 목록 (None 이면 추출 안 함).
+    limiter(RateLimiter)가 있으면 호출마다 차례를 기다립니다. (공용 키는 ai_manager 대기열이 이미 제한하므로 None)
+    """
+
+    def __init__(self, answer_fn, extract_fn=None, limiter=None, max_workers=BATCH_WORKERS,
+                 max_retries=BATCH_MAX_RETRIES, backoff_base=RATE_LIMIT_BACKOFF_BASE, prompt=None):
+        self.answer_fn = answer_fn
+        self.extract_fn = extract_fn
+        self.limiter = limiter
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.prompt = prompt or prompt_version()
+        # 호출마다 DB 컨텍스트가 붙으므로 시스템 프롬프트 토큰을 질문 토큰에 더해 한도를 셈
+        self.base_tokens = estimate_tokens(SYSTEM_PROMPT_TEMPLATE)
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.progress = {"total": 0, "ok": 0, "failed": 0, "skipped": 0, "retries": 0, "tools": 0,
+                         "interrupted": False}
+
+    def _bump(self, field, n=1):
+        with self.lock: self.progress[field] += n
+
+    def _answer(self, question):
+        messages = [{"role": "user", "content": question}]
+        for attempt in range(self.max_retries):
+            if self.limiter is not None: self.limiter.acquire(self.base_tokens + estimate_tokens(question))
+            try:
+                return self.answer_fn(messages), attempt + 1
+            except RETRYABLE as e:
+                retrying = attempt < self.max_retries - 1
+                metrics.count("model.retry" if retrying else "model.failure", kind="batch", error=type(e).__name__)
+                if not retrying: raise
+                self._bump("retries")
+                delay = backoff_delay(attempt, base=self.backoff_base)
+                if isinstance(e, exceptions.ResourceExhausted) and self.limiter is not None:
+                    self.limiter.penalize(delay)
+                time.sleep(delay)
+
+    def _one(self, item):
+        record = {"id": item["id"], "question": item["question"], "job": item["job"],
+                  "situation": item["situation"], "prompt": self.prompt}
+        started = time.perf_counter()
+        try:
+            answer, attempts = self._answer(item["question"])
+            record.update(status="ok", answer=answer, attempts=attempts)
+        except Exception as e:
+            record.update(status="error", error=f"{type(e).__name__}: {e}")
+        record["seconds"] = round(time.perf_counter() - started, 3)
+
+        if record["status"] == "ok" and self.extract_fn is not None:
+            try:
+                record["tools"] = self.extract_fn(item["question"], record["answer"]) or []
+            except Exception as e:
+                record["tools"], record["extract_error"] = [], f"{type(e).__name__}: {e}"
+        return record
+
+    def _finish(self, future, log):
+        record = future.result()
+        log.write(record)
+        metrics.count("batch.result", status=record["status"])
+        with self.lock:
+            self.progress["ok" if record["status"] == "ok" else "failed"] += 1
+            self.progress["tools"] += len(record.get("tools", ()))
+            if record["status"] == "ok": self.latencies.append(record["seconds"])
+
+    def run(self, items, log):
+        """log.done 에 없는 질문만 실행하고 progress 를 반환합니다. Ctrl+C 면 진행 중인 것만 마치고 멈춤."""
+        pending = [item for item in items if item["id"] not in log.done]
+        with self.lock:
+            self.progress.update(total=len(items), skipped=len(items) - len(pending))
+        queue = iter(pending)
+        inflight = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as pool:
+            try:
+                while True:
+                    # 입력이 커도 작업 객체가 쌓이지 않도록 작업자 수의 2배까지만 미리 제출
+                    while len(inflight) < self.max_workers * 2:
+                        item = next(queue, None)
+                        if item is None: break
+                        inflight.add(pool.submit(self._one, item))
+                    if not inflight: break
+                    done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                    for future in done: self._finish(future, log)
+            except KeyboardInterrupt:
+                self.progress["interrupted"] = True
+                for future in inflight: future.cancel()
+                for future in wait(inflight)[0]:
+                    if not future.cancelled(): self._finish(future, log)
+        return self.status()
+
+    def status(self):
+        with self.lock: return dict(self.progress)
+
+
+def compare(old_path, new_path):
+    """두 결과 파일에서 같은 id 의 추천 도구가 얼마나 겹치는지 (프롬프트 변경 회귀 확인용)."""
+    old, new = read_results(old_path), read_results(new_path)
+    rows = []
+    for rid, record in new.items():
+        before = old.get(rid)
+        if not before or "tools" not in before or "tools" not in record: continue
+        a = {tool_key(t["추천도구"]) for t in before["tools"]}
+        b = {tool_key(t["추천도구"]) for t in record["tools"]}
+        rows.append((rid, len(a & b) / len(a | b) if a | b else 1.0))
+    return sorted(rows, key=lambda r: r[1])
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+# ---------------------------------------------------------
+# CLI
+#   (Main 폴더에서) python -m modules.batch questions.csv --out results.jsonl --extract
+#   python -m modules.batch questions.csv --out new.jsonl --compare old.jsonl   # 프롬프트 변경 전후 비교
+#   가짜 모델 + 합성 DB(네트워크 없음): python -m benchmarks.fake_batch --from-db --rows 500 --out catalog.jsonl
+# ---------------------------------------------------------
+def build_parser():
+    parser = argparse.ArgumentParser(description="질문 파일 일괄 추천 (결과 JSONL, 이어서 실행 가능)")
+    parser.add_argument("input", nargs="?", help="질문 CSV 또는 JSONL")
+    parser.add_argument("--from-db", action="store_true", help="DB 의 모든 직무/상황 조합을 질문으로 사용")
+    parser.add_argument("--outputs", action="store_true", help="--from-db 에 결과물 양식별 조합도 포함")
+    parser.add_argument("--out", help="결과 JSONL (= 체크포인트). 기본: 입력 파일명.results.jsonl")
+    parser.add_argument("--restart", action="store_true", help="기존 결과를 지우고 처음부터")
+    parser.add_argument("--extract", action="store_true", help="답변마다 도구 추출(parse_tools) 결과도 기록")
+    parser.add_argument("--compare", help="끝난 뒤 이 결과 파일과 추천 도구 겹침 비교")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--rpm", type=int, default=GEMINI_RPM, help="분당 최대 모델 호출 수 (개인 키)")
+    parser.add_argument("--tpm", type=int, default=GEMINI_TPM, help="분당 최대 입력 토큰 수 (추정치, 개인 키)")
+    parser.add_argument("--retries", type=int, default=BATCH_MAX_RETRIES)
+    parser.add_argument("--backoff", type=float, default=RATE_LIMIT_BACKOFF_BASE, help="429/503 재시도 대기 기준(초)")
+    return parser
+
+
+def parse_args(parser, argv=None):
+    args = parser.parse_args(argv)
+    if not args.input and not args.from_db: parser.error("질문 파일 또는 --from-db 가 필요합니다.")
+    if not args.out and not args.input: parser.error("--from-db 는 --out 이 필요합니다.")
+    return args
+
+
+def main(argv=None):
+    parser = build_parser()
+    parser.add_argument("--api-key", help="개인 API 키 (없으면 공용 키 풀)")
+    args = parse_args(parser, argv)
+
+    from . import ai_manager
+    from .db_manager import load_db
+    # --api-key 가 없으면 호출마다 공용 키 풀에서 여유가 가장 많은 키를 고름
+    if not args.api_key and not ai_manager.get_key_pool():
+        parser.error("GOOGLE_API_KEY(S) 시크릿이 없습니다. (--api-key 또는 python -m benchmarks.fake_batch)")
+    return run_batch(args, load_db(), args.api_key)
+
+
+def run_batch(args, df, api_key=None):
+    """args(build_parser 옵션)대로 df 기준 일괄 추천을 실행하고 종료 코드를 반환합니다."""
+    from . import ai_manager
+
+    if args.from_db: items = questions_from_db(df, ai_manager.build_quick_question, args.outputs)
+    else: items = read_questions(args.input, ai_manager.build_quick_question)
+    out = args.out or os.path.splitext(args.input)[0] + ".results.jsonl"
+
+    def answer(messages):
+        with ai_manager.use_api_key(api_key):
+            return ai_manager.generate_answer(messages, df, api_key)
+
+    def extract(question, text):
+        with ai_manager.use_api_key(api_key):
+            return ai_manager.parse_tools(question, text)
+
+    # 공용 키는 ai_manager 의 키별 대기열(키마다 GEMINI_RPM/TPM)이 이미 제한함
+    limiter = RateLimiter(args.rpm, args.tpm) if api_key else None
+    runner = BatchRunner(answer, extract if args.extract else None, limiter=limiter, max_workers=args.workers,
+                         max_retries=args.retries, backoff_base=args.backoff)
+    log = ResultLog(out, runner.prompt, restart=args.restart)
+    print(f"📋 질문 {len(items)}개 (이미 완료 {len(log.done & {i['id'] for i in items})}개), "
+          f"프롬프트 {runner.prompt}, 작업자 {args.workers}, → {out}")
+
+    done = threading.Event()
+    def report():
+        while not done.wait(1.0):
+            p = runner.status()
+            print(f"⏳ {p['ok'] + p['failed']}/{p['total'] - p['skipped']} (실패 {p['failed']}, 재시도 {p['retries']})")
+    threading.Thread(target=report, daemon=True).start()
+
+    start = time.perf_counter()
+    try:
+        result = runner.run(items, log)
+    finally:
+        done.set()
+        log.close()
+    elapsed = time.perf_counter() - start
+    finished = result["ok"] + result["failed"]
+    print(f"{'⏸️ 중단' if result['interrupted'] else '✅ 완료'}: {result['ok']}개 성공, {result['failed']}개 실패, "
+          f"{result['skipped']}개 건너뜀 (이전 실행), 재시도 {result['retries']}회 "
+          f"({elapsed:.1f}초, {finished / elapsed if elapsed else 0:.1f}개/초, "
+          f"지연 p50 {percentile(runner.latencies, 0.5):.2f}초 / p95 {percentile(runner.latencies, 0.95):.2f}초)")
+    if args.extract: print(f"🛠️ 추출된 도구 {result['tools']}개")
+
+    if args.compare:
+        rows = compare(args.compare, out)
+        if not rows:
+            print("비교할 항목이 없습니다. (두 파일 모두 --extract 로 만든 결과여야 함)")
+        else:
+            overlap = sum(r[1] for r in rows) / len(rows)
+            print(f"🔍 {len(rows)}개 질문 비교: 평균 도구 겹침 {overlap:.0%}, 완전히 바뀐 질문 {sum(r[1] == 0 for r in rows)}개")
+            for rid, score in rows[:5]:
+                if score < 1: print(f"  {score:.0%}  {rid}")
+    if result["interrupted"]: return 130
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
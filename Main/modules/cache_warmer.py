@@ -0,0 +1,190 @@
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .answer_cache import answer_version
+
+# ---------------------------------------------------------
+# 빠른 추천 답변 미리 만들기 (모든 직무 × 상황 조합)
+# ---------------------------------------------------------
+# 사이드바의 직무/상황 조합은 DB 에서 미리 알 수 있으므로,
+# DB 스냅샷이 바뀌면 백그라운드에서 답변을 만들어 답변 캐시에 채워 둡니다.
+# 패싯 인덱스를 넘기면 (직무, 상황) 도구 목록 해시로 저장하므로(answer_version),
+# 투표로 스냅샷 버전이 올라가도 도구 구성이 그대로인 조합은 다시 만들지 않습니다.
+OUTPUT_OPTIONS = ["보고서", "PPT", "이미지", "영상", "엑셀", "코드"]
+
+
+def iter_pairs(df, with_outputs=False):
+    """DB 의 (직무, 상황[, 결과물]) 조합. 결과물은 단일 선택만 포함합니다."""
+    if df.empty or '직무' not in df.columns or '상황' not in df.columns: return []
+    pairs = (
+        df[['직무', '상황']].astype(str)
+        .drop_duplicates()
+        .sort_values(['직무', '상황'])
+        .itertuples(index=False, name=None)
+    )
+    combos = []
+    for job, sit in pairs:
+        if job == "직접 입력" or not job or not sit: continue
+        combos.append((job, sit, []))
+        if with_outputs:
+            combos.extend((job, sit, [out]) for out in OUTPUT_OPTIONS)
+    return combos
+
+
+class IntervalLimiter:
+    """분당 rate 회 이하로 호출 시작 간격을 벌립니다."""
+
+    def __init__(self, rate_per_min):
+        self.interval = 60.0 / rate_per_min if rate_per_min else 0.0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_at)
+            self.next_at = start + self.interval
+        if start > now: time.sleep(start - now)
+
+
+class CacheWarmer:
+    """
+    answer_fn(messages, df) -> 답변 텍스트 로 모든 조합의 답변을 만들어 cache.put 합니다.
+    - 동시 호출은 max_workers 개, 호출 시작은 분당 rate_per_min 회로 제한
+    - 이미 캐시에 있는 조합은 건너뜀
+    - 새 스냅샷으로 다시 시작하면 이전 작업은 남은 조합을 포기하고 멈춤
+    """
+
+    def __init__(self, answer_fn, cache, question_fn, max_workers=2, rate_per_min=20,
+                 with_outputs=False, min_interval=0):
+        self.answer_fn = answer_fn
+        self.cache = cache
+        self.question_fn = question_fn
+        self.max_workers = max_workers
+        self.limiter = IntervalLimiter(rate_per_min)
+        self.with_outputs = with_outputs
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.version = None
+        self.started_at = 0.0
+        self._cancel = threading.Event()
+        self.thread = None
+        self.progress = {"version": None, "total": 0, "done": 0, "skipped": 0, "failed": 0, "running": False}
+
+    def _one(self, df, job, sit, outs, db_version, facets, cancel):
+        if cancel.is_set(): return
+        messages = [{"role": "user", "content": self.question_fn(job, sit, outs)}]
+        version = answer_version(messages, facets, db_version)
+        if self.cache.peek(messages, version):
+            self._bump("skipped")
+            return
+        self.limiter.wait()
+        if cancel.is_set(): return
+        try:
+            self.cache.put(messages, version, self.answer_fn(messages, df))
+            self._bump("done")
+        except Exception as e:
+            print(f"💥 [캐시 워밍 실패] {job}/{sit}: {e}")
+            self._bump("failed")
+
+    def _bump(self, field):
+        with self.lock: self.progress[field] += 1
+
+    def run(self, df, db_version, cancel=None, facets=None):
+        """모든 조합을 (블로킹으로) 처리하고 progress 를 반환합니다. facets: df 기준 FacetIndex"""
+        cancel = cancel or threading.Event()
+        combos = iter_pairs(df, self.with_outputs)
+        with self.lock:
+            self.progress = {"version": db_version, "total": len(combos), "done": 0,
+                             "skipped": 0, "failed": 0, "running": True}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cache-warm") as pool:
+            for job, sit, outs in combos:
+                pool.submit(self._one, df, job, sit, outs, db_version, facets, cancel)
+        with self.lock:
+            self.progress["running"] = False
+            return dict(self.progress)
+
+    def schedule(self, df, db_version, facets=None):
+        """
+        스냅샷 버전이 바뀌었으면 백그라운드 워밍을 (다시) 시작합니다.
+        투표마다 버전이 바뀌므로 min_interval 초 안에는 다시 시작하지 않습니다.
+        (facets 를 주면 도구 구성이 그대로인 조합은 캐시에 남아 있어 건너뜀)
+        """
+        with self.lock:
+            if db_version == self.version: return False
+            if self.version is not None and time.time() - self.started_at < self.min_interval: return False
+            self._cancel.set()
+            self._cancel = cancel = threading.Event()
+            self.version, self.started_at = db_version, time.time()
+        self.thread = threading.Thread(target=self.run, args=(df, db_version, cancel, facets),
+                                       name="cache-warmer", daemon=True)
+        self.thread.start()
+        return True
+
+    def status(self):
+        with self.lock: return dict(self.progress)
+
+
+# ---------------------------------------------------------
+# CLI: 실제 DB + 공용 키 풀로 실행
+#   (Main 폴더에서) python -m modules.cache_warmer --workers 2 --rpm 20 --out answers.jsonl
+#   가짜 모델/합성 DB(네트워크 없음)로 돌리려면 python -m benchmarks.fake_cache_warmer --rows 2000
+# ---------------------------------------------------------
+def build_parser():
+    parser = argparse.ArgumentParser(description="빠른 추천 답변 캐시 워밍")
+    parser.add_argument("--outputs", action="store_true", help="결과물 양식별 조합도 포함")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rpm", type=int, default=20, help="분당 최대 모델 호출 수")
+    parser.add_argument("--out", help="만든 답변을 JSONL 로 저장할 경로")
+    return parser
+
+
+def warm_all(args, df, api_key=None):
+    """df 의 모든 조합을 워밍하고 결과를 출력합니다. api_key 가 없으면 호출마다 공용 키 풀에서 고름."""
+    from . import ai_manager
+    from .answer_cache import AnswerCache
+    from .facets import FacetIndex
+
+    cache = AnswerCache(ttl=float("inf"), max_entries=10 ** 6)
+    warmer = CacheWarmer(
+        lambda messages, df_tools: ai_manager.generate_answer(messages, df_tools, api_key),
+        cache, ai_manager.build_quick_question,
+        max_workers=args.workers, rate_per_min=args.rpm, with_outputs=args.outputs,
+    )
+
+    done = threading.Event()
+    def report():
+        while not done.wait(1.0):
+            p = warmer.status()
+            print(f"⏳ {p['done'] + p['skipped'] + p['failed']}/{p['total']} (실패 {p['failed']})")
+    threading.Thread(target=report, daemon=True).start()
+
+    start = time.perf_counter()
+    result = warmer.run(df, db_version=0, facets=FacetIndex().sync(df))
+    done.set()
+    elapsed = time.perf_counter() - start
+    print(f"✅ 완료: {result['done']}개 생성, {result['skipped']}개 건너뜀, {result['failed']}개 실패 ({elapsed:.1f}초)")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for (version, _, question), (answer, *_rest) in cache.entries.items():
+                f.write(json.dumps({"normalized_question": question, "answer": answer}, ensure_ascii=False) + "\n")
+    return result
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    from . import ai_manager
+    from .db_manager import load_db
+    # 키를 고정하지 않고 호출마다 공용 키 풀에서 고름
+    if not ai_manager.get_key_pool():
+        parser.error("GOOGLE_API_KEY(S) 시크릿이 없습니다. (python -m benchmarks.fake_cache_warmer 로 오프라인 실행 가능)")
+    warm_all(args, load_db())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import google.generativeai as genai
+from google.ai import generativelanguage as glm
+
+# ---------------------------------------------------------
+# API 키별 Gemini 모델 핸들 캐시 (LRU)
+# ---------------------------------------------------------
+# genai.configure() 는 프로세스 전역 설정이라, 세션마다 다른 키를 쓰면 서로 덮어씁니다.
+# 여기서는 키마다 별도 GenerativeServiceClient 를 만들고, 요청(protos)도 직접 만들어 보냅니다.
+# 시스템 프롬프트(턴마다 바뀌는 DB 컨텍스트)는 모델이 아니라 요청마다 넘기므로 모델 핸들은 계속 재사용됩니다.
+
+
+def _digest(value):
+    if value is None: return None
+    if not isinstance(value, str): value = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:16]
+
+
+def _new_service_client(api_key):
+    return glm.GenerativeServiceClient(client_options={"api_key": api_key})
+
+
+def _to_contents(contents):
+    """문자열(사용자 메시지 하나) 또는 [{"role", "parts": [text, ...]}, ...] → protos.Content 목록"""
+    if isinstance(contents, str): contents = [{"role": "user", "parts": [contents]}]
+    return [glm.Content(role=c["role"], parts=[glm.Part(text=p) for p in c["parts"]]) for c in contents]
+
+
+class KeyedModel:
+    """
+    키 전용 서비스 클라이언트로 호출하는 모델. GenerativeModel 중 이 앱이 쓰는 부분만
+    (generate_content, start_chat().send_message) 공개 API 로 구현합니다.
+    응답은 GenerateContentResponse 로 감싸므로 .text / 스트리밍 청크 사용법은 같습니다.
+    """
+
+    def __init__(self, client, model_name, generation_config=None):
+        self.client = client
+        self.model_name = model_name if model_name.startswith("models/") else f"models/{model_name}"
+        self.generation_config = glm.GenerationConfig(**(generation_config or {}))
+
+    def generate_content(self, contents, stream=False, system_instruction=None):
+        request = glm.GenerateContentRequest(
+            model=self.model_name,
+            contents=_to_contents(contents),
+            generation_config=self.generation_config,
+            system_instruction=glm.Content(parts=[glm.Part(text=system_instruction)]) if system_instruction else None,
+        )
+        if stream:
+            return genai.types.GenerateContentResponse.from_iterator(self.client.stream_generate_content(request))
+        return genai.types.GenerateContentResponse.from_response(self.client.generate_content(request))
+
+    def start_chat(self, history=None, system_instruction=None):
+        return KeyedChat(self, history, system_instruction)
+
+
+class KeyedChat:
+    """이전 대화(history) + 시스템 프롬프트를 묶어 두고 마지막 질문만 보내는 채팅 세션."""
+
+    def __init__(self, model, history=None, system_instruction=None):
+        self.model = model
+        self.history = list(history or [])
+        self.system_instruction = system_instruction
+
+    def send_message(self, content, stream=False):
+        contents = self.history + [{"role": "user", "parts": [content]}]
+        return self.model.generate_content(contents, stream=stream, system_instruction=self.system_instruction)
+
+
+def _new_model(client, model_name, generation_config):
+    return KeyedModel(client, model_name, generation_config)
+
+
+class ModelPool:
+    """
+    (API 키, 모델명, 생성 설정) 별로 만든 모델을 재사용합니다. (시스템 프롬프트는 요청마다 넘김)
+    - 키별 서비스 클라이언트(gRPC 채널)는 max_clients 개까지, 모델은 max_models 개까지 LRU 보관
+    - 키 원문은 딕셔너리 키로 쓰지 않고 해시만 사용합니다.
+    """
+
+    def __init__(self, max_models=64, max_clients=16,
+                 client_factory=_new_service_client, model_factory=_new_model):
+        self.max_models = max_models
+        self.max_clients = max_clients
+        self.client_factory = client_factory
+        self.model_factory = model_factory
+        self.lock = threading.Lock()
+        self.clients = OrderedDict()
+        self.models = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _client(self, api_key):
+        key = _digest(api_key)
+        client = self.clients.get(key)
+        if client is not None:
+            self.clients.move_to_end(key)
+            return client
+        client = self.client_factory(api_key)
+        self.clients[key] = client
+        if len(self.clients) > self.max_clients:
+            evicted, _ = self.clients.popitem(last=False)
+            # 밀려난 키의 모델도 함께 정리
+            for k in [k for k in self.models if k[0] == evicted]:
+                del self.models[k]
+        return client
+
+    def get(self, api_key, model_name, generation_config=None):
+        key = (_digest(api_key), model_name, _digest(generation_config))
+        with self.lock:
+            model = self.models.get(key)
+            if model is not None:
+                self.models.move_to_end(key)
+                self.hits += 1
+                return model
+            self.misses += 1
+            client = self._client(api_key)
+            model = self.model_factory(client, model_name, generation_config)
+            self.models[key] = model
+            if len(self.models) > self.max_models:
+                self.models.popitem(last=False)
+            return model
+
+    def drop_key(self, api_key):
+        """무효 키로 판명되면 해당 키의 클라이언트/모델을 버립니다."""
+        key = _digest(api_key)
+        with self.lock:
+            self.clients.pop(key, None)
+            for k in [k for k in self.models if k[0] == key]:
+                del self.models[k]
@@ -1,11 +1,117 @@
 # modules/config.py
+import os
 
 # 구글 시트 URL
 SHEET_URL = "https://docs.google.com/spreadsheets/d/176EoAIiDYnDiD9hORKABr_juIgRZZss5ApTqdaRCx5E/edit?gid=0#gid=0"
 
+# 로컬 데이터 폴더 (Main/.cache)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+
+# 시트에 아직 못 올린 대화 로그를 보관하는 로컬 spool 파일
+LOG_SPOOL_PATH = os.path.join(CACHE_DIR, "log_spool.jsonl")
+
 # 사용 모델명
 MODEL_NAME = "gemini-3-flash-preview" 
 
+# 공용 도구 DB 스냅샷 갱신 주기 (초). 만료되면 원본 수정 시각을 확인해 바뀐 경우에만 다시 읽음
+DB_SNAPSHOT_TTL = 300
+
+# 마지막으로 읽은 도구 DB 사본 (시작 시 시트를 기다리지 않고 바로 표시, None 이면 사용 안 함)
+SNAPSHOT_CACHE_PATH = os.path.join(CACHE_DIR, "tools_snapshot.arrow")
+
+# 도구 DB 저장소: "sheets" (구글 시트 직접 사용) / "sqlite" (로컬 SQLite, 시트는 선택적 미러)
+STORAGE_BACKEND = "sheets"
+SQLITE_PATH = os.path.join(CACHE_DIR, "tools.db")
+SHEET_SYNC_INTERVAL = 60   # sqlite 사용 시 시트와 동기화 주기 (초, 0 이면 동기화 안 함)
+
+# 👍/👎 투표 저널 (단일 기록기가 묶어서 저장소에 반영)
+VOTE_JOURNAL_PATH = os.path.join(CACHE_DIR, "vote_journal.jsonl")
+VOTE_FLUSH_INTERVAL = 1.0  # 투표를 모아 반영하는 최대 대기 시간 (초)
+VOTE_DELETE_AT = -3        # 추천수가 이 값 이하가 되면 도구 삭제
+
+# 신규 도구 직무 표준화: 기존 직무로 바꿀 최소 유사도, 확인된 (입력 → 표준 직무) 별칭 저장 위치
+JOB_MATCH_CUTOFF = 0.6
+JOB_ALIAS_PATH = os.path.join(CACHE_DIR, "job_aliases.json")
+
+# 시스템 프롬프트에 넣을 DB 도구 수 (질문 관련도 + 추천수 기준 상위 k개)
+RETRIEVAL_TOP_K = 30
+
+# 답변 생성 중 보여 줄 로컬 DB 추천 수 (모델 호출 실패 시 대체 답변에도 사용)
+LOCAL_PREVIEW_ENABLED = True
+LOCAL_RANK_TOP_K = 3
+
+# DB 도구 목록 직렬화 포맷: "pipe" / "tsv" / "kv" / "table"(기존 to_string)
+# 컬럼별 최대 글자 수, 여러 행에 반복되는 링크는 한 번만 적기
+CONTEXT_FORMAT = "pipe"
+CONTEXT_FIELD_CAPS = {'추천도구': 40, '직무': 30, '상황': 40, '특징_및_팁': 120, '링크': 100}
+
+# 같은 도구로 볼 이름 별칭 (왼쪽 → 오른쪽). 괄호 설명/도메인은 자동으로 지우지 않으므로 여기에만 등록
+# ("Copilot (GitHub)" 와 "Copilot (Microsoft)" 처럼 괄호가 다른 제품을 가리키는 경우가 있음)
+TOOL_NAME_ALIASES = {
+    "chat.openai.com": "ChatGPT",
+    "chatgpt.com": "ChatGPT",
+    "Google Bard": "Gemini",
+    "Bard": "Gemini",
+}
+CONTEXT_DEDUPE_LINKS = True
+
+# 이전 대화 압축: 모델에 다시 보내는 대화 기록의 토큰 예산, 원문 그대로 둘 최근 메시지 수
+HISTORY_TOKEN_BUDGET = 2000
+HISTORY_KEEP_RECENT = 4
+
+# 답변 캐시: 유지 시간(초), 메모리 상한(바이트), 빠른 추천 질문을 유사 질문으로 볼 내용 토큰 유사도(1.0 이면 완전 일치만, 자유 질문은 항상 완전 일치)
+ANSWER_CACHE_TTL = 3600
+ANSWER_CACHE_MAX_BYTES = 50 * 1024 * 1024
+ANSWER_CACHE_SIMILARITY = 0.85
+
+# 빠른 추천 답변 미리 만들기 (공용 키 사용량이 늘어나므로 기본은 꺼 둠)
+CACHE_WARM_ENABLED = False
+CACHE_WARM_WORKERS = 2          # 동시 모델 호출 수
+CACHE_WARM_RPM = 20             # 분당 최대 모델 호출 수
+CACHE_WARM_MIN_INTERVAL = 1800  # 투표로 DB 버전이 바뀌어도 이 시간(초) 안에는 다시 돌지 않음
+
+# 공용 키 속도 제한 (Gemini 할당량에 맞춰 조정)
+GEMINI_RPM = 15                  # 분당 요청 수
+GEMINI_TPM = 250_000             # 분당 입력 토큰 수 (로컬 추정치 기준)
+RATE_LIMIT_WAIT_TIMEOUT = 120    # 대기열에서 이보다 오래 기다리면 429 로 처리 (초)
+RATE_LIMIT_BACKOFF_BASE = 10     # 429 재시도 대기 기준 (초, 지터 포함 지수 증가)
+
+# 공용 키 풀: secrets 의 GOOGLE_API_KEYS(목록) + GOOGLE_API_KEY. 위 RPM/TPM 은 키 하나당 한도
+KEY_FAILURE_THRESHOLD = 3        # 503 이 연속 이만큼이면 키를 잠시 쉬게 함 (429 는 바로)
+KEY_COOLDOWN_BASE = 10           # 키를 쉬게 하는 시간 (초, 연속으로 쉴 때마다 2배)
+KEY_COOLDOWN_MAX = 300           # 쉬는 시간 상한 (초)
+KEY_SWITCH_DELAY = 1.0           # 429 뒤 바로 쓸 수 있는 다른 공용 키가 있으면 이만큼만 쉬고 재시도 (초)
+
+# 단계별 지연/토큰 계측 (끄면 계측 호출이 바로 반환됨)
+# JSONL: 이벤트마다 한 줄 기록 (None 이면 안 씀), PROMETHEUS_PORT: /metrics 텍스트 엔드포인트 (0 이면 안 띄움)
+# PROMETHEUS_HOST: 엔드포인트를 열 주소 (기본은 이 컴퓨터에서만. 외부 수집기가 읽어야 하면 "0.0.0.0")
+METRICS_ENABLED = False
+METRICS_JSONL_PATH = os.path.join(CACHE_DIR, "metrics.jsonl")
+METRICS_PROMETHEUS_PORT = 0
+METRICS_PROMETHEUS_HOST = "127.0.0.1"
+
+# 추천 API 서비스 (python -m modules.service). SERVICE_URL 을 주면 Streamlit 화면은 이 서비스의 얇은 클라이언트로 동작
+SERVICE_URL = None               # 예: "http://127.0.0.1:8600" (None 이면 화면 프로세스에서 직접 처리)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8600
+SERVICE_MAX_CONCURRENCY = 32     # 동시에 진행하는 답변 생성 수 (나머지는 이벤트 루프에서 대기)
+SERVICE_QUEUE_TIMEOUT = 30       # 답변 생성 차례를 이보다 오래 기다리면 503 (초)
+SERVICE_THREADS = 64             # 저장소/모델 호출을 돌리는 작업 스레드 상한
+SERVICE_MAX_RETRIES = 3          # 429 재시도 횟수 (대기는 스레드를 잡지 않는 비동기 sleep)
+SERVICE_CLIENT_POOL = 16         # 얇은 클라이언트의 HTTP 연결 풀 크기
+SERVICE_CLIENT_TIMEOUT = 180     # 얇은 클라이언트의 응답 대기 시간 (초)
+
+# 일괄 추천 CLI (python -m modules.batch). 분당 호출/토큰 한도 기본값은 GEMINI_RPM / GEMINI_TPM
+BATCH_WORKERS = 4                # 동시 모델 호출 수
+BATCH_MAX_RETRIES = 3            # 질문당 429/503 재시도 횟수
+
+# 답변을 생성되는 대로 조금씩 표시 (False 이면 완성 후 한 번에 표시)
+STREAM_RESPONSES = True
+
+# 사이드바 빠른 추천 질문 양식 (answer_parser 가 이 두 양식에서 만든 정규식으로 직무/상황/결과물을 다시 읽음)
+QUICK_ASK_TEMPLATE = "나의 직무는 **{job}**인데, **{sit}** 업무 할 때 도움되는 AI 도구 좀 추천해 줘.{outs_msg}"
+QUICK_ASK_OUTPUTS_TEMPLATE = " (필요한 결과물: {outputs})"
+
 # 3단계 추천 전략 프롬프트
 SYSTEM_PROMPT_TEMPLATE = """
 역할: 'Job-Fit AI 도구 큐레이터'
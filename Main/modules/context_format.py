@@ -0,0 +1,120 @@
+import threading
+from collections import Counter, OrderedDict
+
+# ---------------------------------------------------------
+# 시스템 프롬프트용 DB 도구 목록 직렬화 (토큰 절약 포맷)
+# ---------------------------------------------------------
+# DataFrame.to_string 은 열 너비를 공백으로 맞추므로 긴 '특징_및_팁' 이 있으면
+# 프롬프트 대부분이 패딩이 됩니다. 아래 포맷은 패딩 없이 구분자만 씁니다.
+#   table : 기존 to_string (비교용, 길이 제한/링크 중복 제거 없음)
+#   tsv   : 머리글 1줄 + 탭 구분 행
+#   pipe  : 머리글 1줄 + '|' 구분 행
+#   kv    : 키 범례 1줄 + 'n=도구;j=직무;…' 행 (빈 값/0 은 생략)
+CONTEXT_COLUMNS = ['추천도구', '직무', '상황', '특징_및_팁', '추천수', '비추천수', '링크']
+FORMATS = ("table", "tsv", "pipe", "kv")
+KV_KEYS = {'추천도구': 'n', '직무': 'j', '상황': 's', '특징_및_팁': 't', '추천수': 'u', '비추천수': 'd', '링크': 'l'}
+LINK_COLUMN = '링크'
+ROW_CACHE_MAX = 64   # (행 위치 조합 → 완성된 텍스트) 보관 개수
+
+_SEPARATORS = {"tsv": "\t", "pipe": "|", "kv": ";"}
+
+
+def clean_cell(value, cap=None, sep="|"):
+    """셀 하나를 한 줄로: 공백/줄바꿈 정리, 구분자 치환, cap 글자 초과분은 '…' 로 자름."""
+    if value is None: return ""
+    text = " ".join(str(value).split())
+    if text.lower() in ("nan", "none"): return ""
+    if sep in text: text = text.replace(sep, " " if sep == "\t" else "/")
+    if cap and len(text) > cap: text = text[:cap].rstrip() + "…"
+    return text
+
+
+class ContextEncoder:
+    """
+    도구 테이블의 행들을 fmt 포맷 텍스트로 만듭니다.
+    - caps: {컬럼: 최대 글자 수} (없는 컬럼은 자르지 않음)
+    - dedupe_links: 두 행 이상에 나오는 링크는 L1, L2… 로 바꾸고 끝에 한 번만 적음
+    행별 정리 결과와 완성된 텍스트는 df(스냅샷) 단위로 캐시합니다.
+    스냅샷은 버전마다 새 df 객체이므로 df 가 바뀌면 캐시를 비웁니다. (retriever.sync 와 같은 방식)
+    """
+
+    def __init__(self, fmt="pipe", caps=None, dedupe_links=True):
+        if fmt not in FORMATS: raise ValueError(f"알 수 없는 DB 컨텍스트 포맷: {fmt}")
+        self.fmt = fmt
+        self.caps = dict(caps or {})
+        self.dedupe_links = dedupe_links
+        self.lock = threading.Lock()
+        self._df = None
+        self._columns = []
+        self._rows = {}                  # 행 위치 -> 정리된 셀 목록
+        self._texts = OrderedDict()      # 행 위치 튜플 -> 완성된 텍스트
+        self.hits = 0
+        self.misses = 0
+
+    def _sync(self, df):
+        if df is self._df: return
+        self._df = df
+        self._columns = [c for c in CONTEXT_COLUMNS if c in df.columns]
+        self._rows.clear()
+        self._texts.clear()
+
+    def _cells(self, pos):
+        cells = self._rows.get(pos)
+        if cells is None:
+            sep = _SEPARATORS[self.fmt]
+            values = self._df.iloc[pos]
+            cells = [clean_cell(values[c], self.caps.get(c), sep) for c in self._columns]
+            self._rows[pos] = cells
+        return cells
+
+    def encode(self, df, positions=None):
+        """df.iloc[positions] 행들(없으면 전체)을 텍스트로. 같은 스냅샷/같은 행이면 캐시된 결과."""
+        if df.empty: return ""
+        if positions is None: positions = range(len(df))
+        positions = tuple(int(p) for p in positions)
+
+        with self.lock:
+            self._sync(df)
+            text = self._texts.get(positions)
+            if text is not None:
+                self.hits += 1
+                self._texts.move_to_end(positions)
+                return text
+            self.misses += 1
+            if self.fmt == "table":
+                text = df.iloc[list(positions)][self._columns].to_string(index=False)
+            else:
+                text = self._render([self._cells(p) for p in positions])
+            self._texts[positions] = text
+            while len(self._texts) > ROW_CACHE_MAX:
+                self._texts.popitem(last=False)
+            return text
+
+    def _render(self, rows):
+        columns = self._columns
+        links = {}
+        if self.dedupe_links and LINK_COLUMN in columns:
+            li = columns.index(LINK_COLUMN)
+            counts = Counter(r[li] for r in rows if r[li])
+            for link in counts:
+                if counts[link] > 1: links[link] = f"L{len(links) + 1}"
+            if links:
+                rows = [r[:li] + [links.get(r[li], r[li])] + r[li + 1:] for r in rows]
+
+        if self.fmt == "kv":
+            keys = [KV_KEYS.get(c, c) for c in columns]
+            lines = ["키: " + ", ".join(f"{k}={c}" for k, c in zip(keys, columns))]
+            for r in rows:
+                lines.append(";".join(f"{k}={v}" for k, v in zip(keys, r) if v not in ("", "0")))
+        else:
+            sep = _SEPARATORS[self.fmt]
+            lines = [sep.join(columns)] + [sep.join(r) for r in rows]
+
+        if links:
+            lines.append("링크: " + " ".join(f"{ref}={link}" for link, ref in links.items()))
+        return "\n".join(lines)
+
+    def stats(self):
+        with self.lock:
+            return {"format": self.fmt, "rows_cached": len(self._rows), "texts_cached": len(self._texts),
+                    "hits": self.hits, "misses": self.misses}
@@ -3,8 +3,21 @@ import pandas as pd
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import datetime
-from .config import SHEET_URL
-from .ai_manager import normalize_job_category
+from .config import (SHEET_URL, DB_SNAPSHOT_TTL, SNAPSHOT_CACHE_PATH, LOG_SPOOL_PATH,
+                     STORAGE_BACKEND, SQLITE_PATH, SHEET_SYNC_INTERVAL,
+                     VOTE_JOURNAL_PATH, VOTE_FLUSH_INTERVAL, VOTE_DELETE_AT, JOB_ALIAS_PATH)
+from .ai_manager import normalize_job_category, get_retriever
+from .snapshot import ToolSnapshotStore
+from .disk_snapshot import DiskSnapshotCache
+from .log_writer import LogWriter
+from .sheets_backend import SheetsStorage
+from .sqlite_backend import SQLiteStorage
+from .sheet_sync import SheetSync
+from .vote_aggregator import VoteAggregator
+from .facets import FacetIndex
+from .job_index import JobTitleIndex
+from .tool_identity import ToolNameIndex
+from .metrics import metrics
 
 # 구글 시트 연결
 @st.cache_resource
@@ -19,127 +32,256 @@ def connect_to_client():
         st.error(f"구글 시트 연결 오류: {e}")
         return None
 
+# 저장소 선택 (config.STORAGE_BACKEND)
+@st.cache_resource
+def get_storage():
+    sheets = SheetsStorage(connect_to_client, SHEET_URL)
+    if STORAGE_BACKEND != "sqlite": return sheets
+    local = SQLiteStorage(SQLITE_PATH)
+    if SHEET_SYNC_INTERVAL:
+        # 시트를 미러로 유지 (처음 실행 시 SQLite 가 비어 있으면 시트에서 가져옴)
+        sync = SheetSync(local, sheets, SHEET_SYNC_INTERVAL,
+                         on_pull=lambda: get_snapshot_store().invalidate())
+        try:
+            sync.sync_once()
+        except Exception as e:
+            print(f"💥 [시트 동기화 실패] {e}")
+        sync.start()
+    return local
+
 # 데이터 로드
 def load_db():
-    client = connect_to_client()
-    if not client: return pd.DataFrame()
-
     try:
-        ws = client.open_by_url(SHEET_URL).get_worksheet(0)
-        data = ws.get_all_records()
-        
-        if data:
-            df = pd.DataFrame(data)
-        else:
-            df = pd.DataFrame(columns=['직무','상황','결과물','추천도구','특징_및_팁','유료여부','링크','비추천수','추천수'])
-        
-        for col in ['비추천수', '추천수']:
-            if col not in df.columns: df[col] = 0
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-        
-        return df
+        return get_storage().load_tools()
+    except ConnectionError:
+        metrics.count("storage.load_failure", error="ConnectionError")
+        return pd.DataFrame()  # 연결 오류는 connect_to_client 에서 이미 표시
     except Exception as e:
+        metrics.count("storage.load_failure", error=type(e).__name__)
         st.error(f"데이터 로드 실패: {e}")
         return pd.DataFrame()
 
-# 로그 저장
+def _storage_revision():
+    return get_storage().revision()
+
+# 공용 스냅샷 (모든 세션이 같은 DataFrame 을 공유, 디스크 사본으로 즉시 시작 + 백그라운드 검증)
+@st.cache_resource
+def get_snapshot_store():
+    disk = DiskSnapshotCache(SNAPSHOT_CACHE_PATH) if SNAPSHOT_CACHE_PATH else None
+    return ToolSnapshotStore(load_db, ttl=DB_SNAPSHOT_TTL, stamp_fn=_storage_revision, disk=disk)
+
+def get_tools_snapshot():
+    """현재 도구 DB 스냅샷(version, df, loaded_at). 세션에는 version 만 저장하세요."""
+    return get_snapshot_store().get()
+
+# 도구 이름(정규화) → 스냅샷 행 위치 (투표/조회 경로 공용)
+@st.cache_resource
+def get_name_index():
+    return ToolNameIndex()
+
+# 사이드바 직무/상황 패싯 (스냅샷 단위, 로컬 변경은 증분 반영)
+@st.cache_resource
+def get_facet_index():
+    return FacetIndex()
+
+# 신규 도구 직무 표준화용 색인 (확인된 별칭은 디스크에 보관)
+@st.cache_resource
+def get_job_index():
+    return JobTitleIndex(JOB_ALIAS_PATH)
+
+def get_facets(snapshot=None):
+    """현재 스냅샷 기준 패싯 인덱스. 스냅샷이 원본에서 새로 읽힌 경우에만 재구성합니다."""
+    snapshot = snapshot or get_tools_snapshot()
+    return get_facet_index().sync(snapshot.df)
+
+# 로그 저장 (백그라운드 기록기, 프로세스 공용)
+def _open_log_table():
+    return get_storage().open_log_table()
+
+@st.cache_resource
+def get_log_writer():
+    return LogWriter(_open_log_table, LOG_SPOOL_PATH)
+
 def save_log(job, situation, question, answer):
-    try:
-        client = connect_to_client()
-        ws = client.open_by_url(SHEET_URL).get_worksheet(1)
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        ws.append_row([now, job, situation, question, answer])
-    except:
-        pass 
-
-# DB 업데이트
-def update_db(action_type, tool_data, current_df):
+    # 큐에 넣고 바로 반환 (저장소 기록은 워커가 묶어서 처리)
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return get_log_writer().submit([now, job, situation, question, answer])
+
+def _local_change(current_df, target, action, score=None, new_row=None):
+    """
+    저장소에 반영한 변경을 로컬 DataFrame에도 동일하게 적용합니다. (재조회 없음)
+    반환: (새 df, 빠진 행 목록, 더해진 행 목록) - 패싯 인덱스 증분 반영용
+    """
+    names, retriever = get_name_index(), get_retriever()
+    if action == 'append':
+        df = pd.concat([current_df, pd.DataFrame([new_row])], ignore_index=True)
+        names.advance(current_df, df, 'append', name=target)
+        retriever.advance(current_df, df, 'append', row=new_row)
+        return df, [], [new_row]
+    if current_df.empty or '추천도구' not in current_df.columns: return current_df, [], []
+    # 정규화 이름 인덱스로 행 위치를 바로 찾음 (열 전체 비교 X)
+    pos = names.find(current_df, target)
+    if pos is None: return current_df, [], []
+    old_row = current_df.iloc[pos].to_dict()
+    if action == 'delete':
+        df = current_df.drop(current_df.index[pos]).reset_index(drop=True)
+        names.advance(current_df, df, 'delete', pos=pos, name=target)
+        retriever.advance(current_df, df, 'delete', pos=pos)
+        return df, [old_row], []
+    df = current_df.copy()
+    df.iat[pos, df.columns.get_loc('추천수')] = score
+    new_row = dict(old_row, 추천수=score)
+    names.advance(current_df, df, 'update')
+    # 검색 색인도 바뀐 행만 반영 (새 스냅샷마다 전체 재색인 X)
+    retriever.advance(current_df, df, 'update', pos=pos, row=new_row)
+    return df, [old_row], [new_row]
+
+def _publish_changes(changes):
+    """changes: [(target, action, kwargs), ...] 를 한 번에 적용해 새 스냅샷 버전으로 게시 (패싯도 증분 반영)."""
+    def apply(current_df):
+        df, removed, added = current_df, [], []
+        for target, action, kwargs in changes:
+            df, r, a = _local_change(df, target, action, **kwargs)
+            removed += r
+            added += a
+        get_facet_index().advance(current_df, df, removed, added)
+        return df
+    snap = get_snapshot_store().update(apply)
+    for target, action, _ in changes:
+        if action == 'append': get_job_index().confirm(target)
+    return snap
+
+def _publish_local(target, action, **kwargs):
+    # 저장소 재조회 없이 공용 스냅샷에 같은 변경을 적용해 새 버전으로 게시
+    return _publish_changes([(target, action, kwargs)]).df
+
+def _prepare_new_tool(tool_data):
+    # 신규 도구의 직무를 기존 직무 목록 기준으로 표준화
+    # (직무 목록은 패싯 인덱스, 유사 직무 탐색은 글자 색인 사용 - df 를 훑지 않음)
+    input_job = tool_data.get('직무', '기타')
+    index = get_job_index()
+    tool_data['직무'] = normalize_job_category(input_job, get_facets().job_names(), index=index)
+    # 실제로 등록되면(_publish_changes) 입력 → 표준 직무를 별칭으로 학습
+    index.propose(tool_data.get('추천도구'), input_job, tool_data['직무'])
+    return tool_data
+
+# DB 업데이트 (변경된 셀/행만 즉시 기록, 동기 방식)
+@metrics.timed("vote.write", mode="sync")
+def update_db(action_type, tool_data, current_df=None):
+    # 성공 시 세 번째 반환값은 새로 게시된 공용 스냅샷의 df
     target = tool_data.get('추천도구')
     if not target: return False, "오류", current_df
 
+    storage = get_storage()
     try:
-        client = connect_to_client()
-        ws = client.open_by_url(SHEET_URL).get_worksheet(0)
-        
-        # 1. 최신 데이터 가져오기 (동시성 문제 최소화)
-        data = ws.get_all_records()
-        df = pd.DataFrame(data) if data else current_df.copy()
-        
-        # 2. 숫자형 컬럼 안전 처리 (빈 값은 0으로)
-        for col in ['비추천수', '추천수']:
-            if col not in df.columns: df[col] = 0
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-
-        msg = ""
-        updated = False
-
         # --- [좋아요 👍] 로직 ---
         if action_type == 'like':
-            if target in df['추천도구'].values:
-                # 이미 있으면 점수 +1
-                idx = df[df['추천도구'] == target].index[0]
-                df.loc[idx, '추천수'] += 1
-                msg = f"✨ '{target}' 추천수 증가! (현재: {df.loc[idx, '추천수']})"
-            else:
+            # 이미 있으면 점수 +1 (추천수 하나만 갱신)
+            voted = storage.vote(target, +1)
+            if voted is None:
                 # 없으면 신규 등록 (기본 점수 1점)
-                input_job = tool_data.get('직무', '기타')
-                existing_jobs = [j for j in df['직무'].unique() if j != "직접 입력"]
-                
-                # 직무 표준화
-                standardized_job = normalize_job_category(input_job, existing_jobs)
-                tool_data['직무'] = standardized_job
-
+                _prepare_new_tool(tool_data)
                 tool_data['비추천수'] = 0
                 tool_data['추천수'] = 1  # 시작 점수
-                
-                df = pd.concat([df, pd.DataFrame([tool_data])], ignore_index=True)
-                msg = f"🎉 '{target}' 등록 완료! (직무: {standardized_job})"
-            updated = True
-        
+
+                if storage.insert_tool(tool_data):
+                    msg = f"🎉 '{target}' 등록 완료! (직무: {tool_data['직무']})"
+                    return True, msg, _publish_local(target, 'append', new_row=tool_data)
+                # 그 사이 다른 사용자가 먼저 등록했으면 추천수만 올림
+                voted = storage.vote(target, +1)
+                if voted is None: return False, "오류", current_df
+
+            score, _ = voted
+            msg = f"✨ '{target}' 추천수 증가! (현재: {score})"
+            return True, msg, _publish_local(target, 'update', score=score)
+
         # --- [싫어요 👎] 로직 ---
         elif action_type == 'dislike':
-            if target in df['추천도구'].values:
-                idx = df[df['추천도구'] == target].index[0]
-                
-                # 1. 추천수(점수) 1 감소
-                current_score = int(df.loc[idx, '추천수']) - 1
-                
-                # 2. 점수가 -3 이하이면 삭제
-                if current_score <= -3:
-                    df = df.drop(idx).reset_index(drop=True)
-                    msg = f"🗑️ 평가 점수 미달(-3)로 '{target}' 도구가 삭제되었습니다."
-                else:
-                    # 삭제 기준이 아니라면 점수만 업데이트
-                    df.loc[idx, '추천수'] = current_score
-                    msg = f"📉 추천 점수가 차감되었습니다. (현재: {current_score})"
-                
-                updated = True
-            else:
+            # 추천수(점수) 1 감소, 점수가 -3 이하이면 해당 도구 삭제
+            voted = storage.vote(target, -1, delete_at=VOTE_DELETE_AT)
+            if voted is None:
                 # DB에 없는 도구(AI가 방금 찾은 도구)에 비추천을 누른 경우
                 # 아직 저장되지 않았으므로 아무 일도 일어나지 않음 (혹은 사용자에게 알림)
                 return False, "SILENT", current_df
 
-        # --- [데이터 저장] ---
-        if updated:
-            df = df.fillna("") 
-            df_for_upload = df.astype(str) # 모든 값을 문자열로 변환
-            
-            payload = [df_for_upload.columns.values.tolist()] + df_for_upload.values.tolist()
-            
-            ws.clear()
-            ws.update(range_name='A1', values=payload)
-            
-            return True, msg, df
-        
-        return True, msg, df
+            current_score, deleted = voted
+            if deleted:
+                msg = f"🗑️ 평가 점수 미달({VOTE_DELETE_AT})로 '{target}' 도구가 삭제되었습니다."
+                return True, msg, _publish_local(target, 'delete')
+
+            msg = f"📉 추천 점수가 차감되었습니다. (현재: {current_score})"
+            return True, msg, _publish_local(target, 'update', score=current_score)
+
+        return True, "", current_df
 
     except Exception as e:
+        # 실패 시 다음 호출에서 저장소 인덱스와 스냅샷을 재동기화
+        storage.invalidate()
+        get_snapshot_store().invalidate()
+        metrics.count("vote.write_failure", error=type(e).__name__)
         print(f"Update DB Error: {e}") 
         return False, f"오류 발생: {e}", current_df
 
+# 투표 저널 (Main.py 👍/👎 버튼용: 즉시 응답, 저장소 반영은 백그라운드 단일 기록기)
+def _vote_changes(results):
+    changes = []
+    for target, (kind, value) in results.items():
+        if kind == 'insert': changes.append((target, 'append', {"new_row": value}))
+        elif kind == 'delete': changes.append((target, 'delete', {}))
+        else: changes.append((target, 'update', {"score": value}))
+    return changes
+
+def _publish_votes(results):
+    # 묶음 하나를 반영할 때마다 스냅샷도 한 번만 새 버전으로 게시
+    _publish_changes(_vote_changes(results))
+
+@st.cache_resource
+def get_vote_aggregator():
+    return VoteAggregator(get_storage(), VOTE_JOURNAL_PATH, prepare_new=_prepare_new_tool,
+                          on_applied=_publish_votes, delete_at=VOTE_DELETE_AT,
+                          flush_interval=VOTE_FLUSH_INTERVAL)
+
+def _snapshot_score(target):
+    df = get_tools_snapshot().df
+    if df.empty or '추천수' not in df.columns: return None
+    pos = get_name_index().find(df, target)
+    return int(df['추천수'].iloc[pos]) if pos is not None else None
+
+@metrics.timed("vote.submit")
+def submit_vote(action_type, tool_data):
+    """
+    투표를 저널에 넣고 바로 (성공 여부, 메시지) 를 돌려줍니다.
+    메시지의 점수는 현재 스냅샷 + 아직 반영 중인 투표로 계산한 예상값입니다.
+    """
+    target = tool_data.get('추천도구')
+    if not target: return False, "오류"
+
+    aggregator = get_vote_aggregator()
+    score = _snapshot_score(target)
+    pending, pending_new = aggregator.pending(target)
+    known = score is not None or pending_new
+
+    if action_type == 'like':
+        # 처음 보는 도구면 등록 정보를 함께 저널에 남김 (직무 표준화는 기록기가 처리)
+        row = None if known else dict(tool_data)
+        if not aggregator.submit(target, +1, row): return False, "⚠️ 투표가 몰려 잠시 후 다시 시도해 주세요."
+        if not known: return True, f"🎉 '{target}' 등록 완료!"
+        return True, f"✨ '{target}' 추천수 증가! (현재: {(score or 0) + pending + 1})"
+
+    if action_type == 'dislike':
+        # DB에 없는 도구(AI가 방금 찾은 도구)에 비추천을 누른 경우: 아무 일도 일어나지 않음
+        if not known: return False, "SILENT"
+        if not aggregator.submit(target, -1): return False, "⚠️ 투표가 몰려 잠시 후 다시 시도해 주세요."
+        expected = (score or 0) + pending - 1
+        if expected <= VOTE_DELETE_AT:
+            return True, f"🗑️ 평가 점수 미달({VOTE_DELETE_AT})로 '{target}' 도구가 삭제되었습니다."
+        return True, f"📉 추천 점수가 차감되었습니다. (현재: {expected})"
+
+    return False, "오류"
+
 # 직무 리스트 반환 (Main.py 사이드바용)
 def clean_job_titles():
-    df = load_db()
+    df = get_tools_snapshot().df
     if df.empty: return []
     jobs = sorted(df['직무'].astype(str).str.strip().unique().tolist())
     return [j for j in jobs if j != "직접 입력"]
\ No newline at end of file
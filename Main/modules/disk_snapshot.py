@@ -0,0 +1,46 @@
+import json
+import os
+import time
+import pyarrow as pa
+from pyarrow import feather
+
+# ---------------------------------------------------------
+# 도구 DB 스냅샷 디스크 캐시 (Arrow IPC / Feather v2)
+# ---------------------------------------------------------
+# 마지막으로 읽어 온 도구 테이블을 원본 리비전(시트 수정 시각 등)과 함께 저장해 두고,
+# 프로세스 시작 시 시트 응답을 기다리지 않고 바로 읽어 씁니다. (검증은 ToolSnapshotStore 가 백그라운드로)
+FORMAT_VERSION = 1
+_META_KEY = b"jobfit.snapshot"
+
+
+class DiskSnapshotCache:
+    def __init__(self, path, compression="zstd"):
+        self.path = path
+        self.compression = compression
+
+    def save(self, df, stamp):
+        """df 와 그 원본 리비전 stamp(JSON 으로 저장 가능한 값)를 원자적으로 기록합니다."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        meta = dict(table.schema.metadata or {})
+        meta[_META_KEY] = json.dumps({"version": FORMAT_VERSION, "stamp": stamp, "saved_at": time.time()})
+        table = table.replace_schema_metadata(meta)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        feather.write_feather(table, tmp, compression=self.compression)
+        os.replace(tmp, self.path)  # 읽는 쪽이 반쯤 쓴 파일을 보지 않도록
+
+    def load(self):
+        """(df, stamp, 저장 시각). 파일이 없거나 형식이 다르면 None."""
+        try:
+            table = feather.read_table(self.path)
+            info = json.loads((table.schema.metadata or {})[_META_KEY])
+        except (OSError, KeyError, ValueError, pa.ArrowException):
+            return None
+        if info.get("version") != FORMAT_VERSION: return None
+        return table.to_pandas(), info.get("stamp"), info.get("saved_at", 0.0)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
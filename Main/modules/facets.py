@@ -0,0 +1,201 @@
+import hashlib
+import heapq
+import threading
+from collections import Counter
+
+# ---------------------------------------------------------
+# 사이드바 직무/상황 선택용 패싯 인덱스 (스냅샷 단위)
+# ---------------------------------------------------------
+# 매 rerun 마다 df 전체에 unique()/불리언 필터를 돌리지 않도록
+# 직무 → 상황별 행 수, 직무/상황별 도구 점수를 미리 모아 둡니다.
+# 읽기 비용은 테이블 크기와 무관하고(정렬된 목록은 캐시), 투표/도구 추가·삭제는
+# 바뀐 행만 반영합니다. df 가 예상과 다르면(재조회 등) 처음부터 다시 만듭니다.
+MANUAL_OPTION = "직접 입력"
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+class _Facet:
+    """직무 하나(또는 직무+상황 하나)의 행 수와 도구별 (행 수, 점수)."""
+    __slots__ = ("count", "tools")
+
+    def __init__(self):
+        self.count = 0
+        self.tools = {}
+
+    def add(self, name, score):
+        self.count += 1
+        rows, _ = self.tools.get(name, (0, 0))
+        self.tools[name] = (rows + 1, score)
+
+    def remove(self, name):
+        self.count -= 1
+        rows, score = self.tools.get(name, (1, 0))
+        if rows <= 1: self.tools.pop(name, None)
+        else: self.tools[name] = (rows - 1, score)
+
+    def top(self, n):
+        best = heapq.nlargest(n, self.tools.items(), key=lambda kv: kv[1][1])
+        return [(name, score) for name, (_, score) in best]
+
+
+class FacetIndex:
+    """
+    직무/상황 패싯. sync(df) 로 스냅샷에 맞추고, advance(old_df, new_df, removed, added) 로
+    로컬 변경(투표/추가/삭제)을 증분 반영합니다. (removed/added: 행 dict 목록)
+    df 는 스냅샷마다 새 객체이므로 객체 동일성으로 버전을 구분합니다. (retriever.sync 와 같은 방식)
+    """
+
+    def __init__(self, top_n=5):
+        self.top_n = top_n
+        self.lock = threading.RLock()
+        self._df = None
+        self.jobs = {}        # 직무 -> _Facet
+        self.pairs = {}       # (직무, 상황) -> _Facet
+        self.situations = {}  # 직무 -> Counter(상황 -> 행 수)
+        self._sorted = {}     # 정렬된 목록 캐시 (None 키: 직무 목록)
+        self.rebuilds = 0
+        self.increments = 0
+
+    # --- 구성 ---
+    def _reset(self):
+        self.jobs, self.pairs, self.situations = {}, {}, {}
+        self._sorted = {}
+
+    def _add(self, job, sit, name, score):
+        if job not in self.jobs:
+            self.jobs[job] = _Facet()
+            self.situations[job] = Counter()
+            self._sorted.pop(None, None)
+        self.jobs[job].add(name, score)
+        if self.situations[job][sit] == 0: self._sorted.pop(job, None)
+        self.situations[job][sit] += 1
+        self.pairs.setdefault((job, sit), _Facet()).add(name, score)
+
+    def _remove(self, job, sit, name):
+        facet = self.jobs.get(job)
+        if facet is None: return
+        facet.remove(name)
+        sits = self.situations[job]
+        sits[sit] -= 1
+        if sits[sit] <= 0:
+            del sits[sit]
+            self._sorted.pop(job, None)
+        pair = self.pairs.get((job, sit))
+        if pair is not None:
+            pair.remove(name)
+            if pair.count <= 0: del self.pairs[(job, sit)]
+        if facet.count <= 0:
+            del self.jobs[job], self.situations[job]
+            self._sorted.pop(None, None)
+            self._sorted.pop(job, None)
+
+    def _bulk(self, jobs, sits, names, scores):
+        # 전체 재구성: 행마다 _add 를 부르는 대신 Counter 로 한 번에 집계
+        pair_keys = list(zip(jobs, sits))
+        for job, count in Counter(jobs).items():
+            self.jobs[job] = facet = _Facet()
+            facet.count = count
+            self.situations[job] = Counter()
+        for (job, sit), count in Counter(pair_keys).items():
+            self.situations[job][sit] = count
+            self.pairs[(job, sit)] = facet = _Facet()
+            facet.count = count
+        job_tools = list(zip(jobs, names))
+        latest = dict(zip(job_tools, scores))   # 같은 이름이 여러 행이면 마지막 행 점수
+        for (job, name), rows in Counter(job_tools).items():
+            self.jobs[job].tools[name] = (rows, latest[(job, name)])
+        pair_tools = list(zip(pair_keys, names))
+        latest = dict(zip(pair_tools, scores))
+        for (pair, name), rows in Counter(pair_tools).items():
+            self.pairs[pair].tools[name] = (rows, latest[(pair, name)])
+
+    @staticmethod
+    def _key(row):
+        return (str(row.get('직무', "")), str(row.get('상황', "")),
+                str(row.get('추천도구', "")), _to_int(row.get('추천수', 0)))
+
+    def sync(self, df):
+        """df(스냅샷)가 이 인덱스의 기준과 다르면 처음부터 다시 만듭니다."""
+        with self.lock:
+            if df is self._df: return self
+            self._reset()
+            if not df.empty and '직무' in df.columns:
+                n = len(df)
+                col = lambda c: df[c].astype(str).tolist() if c in df.columns else [""] * n
+                scores = ([_to_int(v) for v in df['추천수'].tolist()] if '추천수' in df.columns else [0] * n)
+                self._bulk(col('직무'), col('상황'), col('추천도구'), scores)
+            self._df = df
+            self.rebuilds += 1
+            return self
+
+    def advance(self, old_df, new_df, removed=(), added=()):
+        """old_df → new_df 변경분만 반영. 인덱스가 old_df 기준이 아니면 다음 sync 때 재구성."""
+        with self.lock:
+            if old_df is not self._df: return False
+            for row in removed:
+                job, sit, name, _ = self._key(row)
+                self._remove(job, sit, name)
+            for row in added:
+                self._add(*self._key(row))
+            self._df = new_df
+            self.increments += 1
+            return True
+
+    # --- 읽기 (사이드바) ---
+    def _job_lists(self):
+        cached = self._sorted.get(None)
+        if cached is None:
+            names = sorted(j for j in self.jobs if j != MANUAL_OPTION)
+            cached = self._sorted[None] = (names, [MANUAL_OPTION] + names)
+        return cached
+
+    def job_names(self):
+        """정렬된 직무 목록 ('직접 입력' 제외). 직무가 바뀌기 전까지 같은 리스트 객체."""
+        with self.lock:
+            return self._job_lists()[0]
+
+    def job_options(self):
+        """'직접 입력' 을 맨 앞에 둔 정렬된 직무 목록."""
+        with self.lock:
+            return self._job_lists()[1]
+
+    def situation_options(self, job):
+        """선택한 직무의 정렬된 상황 목록."""
+        with self.lock:
+            cached = self._sorted.get(job)
+            if cached is None:
+                cached = sorted(self.situations.get(job, ()))
+                self._sorted[job] = cached
+            return cached
+
+    def count(self, job, sit=None):
+        with self.lock:
+            facet = self.jobs.get(job) if sit is None else self.pairs.get((job, sit))
+            return facet.count if facet else 0
+
+    def top_tools(self, job, sit=None, n=None):
+        """직무(또는 직무+상황)에서 추천수 상위 도구 [(이름, 추천수), ...]."""
+        with self.lock:
+            facet = self.jobs.get(job) if sit is None else self.pairs.get((job, sit))
+            return facet.top(n or self.top_n) if facet else []
+
+    def pair_digest(self, job, sit):
+        """(직무, 상황)의 도구 이름 목록 해시. 추천수만 바뀌는 투표로는 달라지지 않습니다. 없는 조합이면 None."""
+        with self.lock:
+            facet = self.pairs.get((job, sit))
+            if not facet: return None
+            h = hashlib.sha256()
+            for name in sorted(facet.tools):
+                h.update(name.encode("utf-8") + b"\0")
+            return h.hexdigest()[:16]
+
+    def stats(self):
+        with self.lock:
+            return {"jobs": len(self.jobs), "pairs": len(self.pairs),
+                    "rebuilds": self.rebuilds, "increments": self.increments}
@@ -0,0 +1,100 @@
+from .answer_parser import parse_answer_tools
+from .rate_limiter import estimate_tokens
+
+# ---------------------------------------------------------
+# 토큰 예산 기반 대화 기록 압축 (start_chat history 용)
+# ---------------------------------------------------------
+# 1. 최근 keep_recent 개 메시지는 원문 그대로 (자르지도 빼지도 않음)
+# 2. 그보다 오래된 AI 답변은 추천 도구 목록 한 줄로 축약 (answer_parser 로 로컬 추출)
+# 3. 그래도 예산을 넘으면 가장 오래된 질문/답변 쌍부터 빼고, 뺀 질문들은 요약 한 줄로 남김
+# 토큰 수는 rate_limiter.estimate_tokens 로 로컬 추정합니다.
+ANSWER_PREVIEW_CHARS = 120   # 도구를 못 찾은 답변을 축약할 때 남길 길이
+DROPPED_QUESTIONS = 5        # 요약 줄에 남길 (가장 최근에 뺀) 질문 수
+QUESTION_PREVIEW_CHARS = 40
+
+
+def _clip(text, chars):
+    text = " ".join(str(text).split())
+    return text if len(text) <= chars else text[:chars] + "…"
+
+
+def _clip_tokens(text, budget):
+    """대략 budget 토큰 안으로 자릅니다. (한 메시지가 예산 대부분을 차지하지 않도록)"""
+    if estimate_tokens(text) <= budget: return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) + 2 <= budget: lo = mid
+        else: hi = mid - 1
+    return text[:lo] + " …(생략)"
+
+
+def summarize_answer(question, answer):
+    """AI 답변 → '[이전 답변 요약] 추천 도구: A, B, C' (도구가 없으면 앞부분만)."""
+    names = [t["추천도구"] for t in parse_answer_tools(question, answer)]
+    if names: return f"[이전 답변 요약] 추천 도구: {', '.join(names)}"
+    return f"[이전 답변 요약] {_clip(answer, ANSWER_PREVIEW_CHARS)}"
+
+
+def _dropped_note(past, end):
+    """past[:end] 를 뺐다는 요약 줄. 뺀 것 중 가장 최근 질문 몇 개만 남깁니다."""
+    recent = []
+    for i in range(end - 1, -1, -1):
+        if past[i]["role"] != "user": continue
+        recent.append(_clip(past[i]["content"], QUESTION_PREVIEW_CHARS))
+        if len(recent) == DROPPED_QUESTIONS: break
+    return f"[앞선 대화 {end}개 메시지 생략] 이전 질문: " + " / ".join(reversed(recent))
+
+
+def compact_history(messages, budget=2000, keep_recent=4):
+    """
+    messages[:-1](이전 대화)을 Gemini history 형식으로 바꾸되, 추정 토큰 합이 budget 이하가 되도록 줄입니다.
+    최신 메시지부터 거꾸로 채우므로 빠지는 오래된 답변은 파싱하지 않습니다. (대화 길이와 무관한 비용)
+    최근 keep_recent 개 메시지는 예산과 관계없이 원문 그대로 넣고, 남은 예산을 오래된 대화에 씁니다.
+    반환: [{"role": "user"|"model", "parts": [text]}, ...]
+    """
+    past = messages[:-1]
+    recent_from = max(0, len(past) - keep_recent)
+    per_message = max(budget // 3, 1)   # 오래된 메시지 하나가 남은 예산을 다 차지하지 않도록
+
+    def render(i):
+        m = past[i]
+        text = m["content"]
+        if m["role"] == "assistant" and i < recent_from:
+            question = past[i - 1]["content"] if i > 0 and past[i - 1]["role"] == "user" else ""
+            text = summarize_answer(question, text)
+        if i < recent_from: text = _clip_tokens(text, per_message)
+        return ("user" if m["role"] == "user" else "model"), text, estimate_tokens(text)
+
+    # 역할이 번갈아 이어지도록 질문/답변 쌍 단위로 채움
+    groups, total, end = [], 0, len(past)
+    while end > 0:
+        start = end - 2 if end >= 2 and past[end - 1]["role"] == "assistant" and past[end - 2]["role"] == "user" else end - 1
+        group = [render(i) for i in range(start, end)]
+        cost = sum(t for _, _, t in group)
+        if end <= recent_from and total + cost > budget: break
+        groups.append((start, group))
+        total += cost
+        end = start
+
+    # 뺀 메시지가 있으면 요약 줄이 들어갈 자리까지 확보
+    while end > 0 and groups:
+        note = _dropped_note(past, end)
+        if total + estimate_tokens(note) <= budget: break
+        if groups[-1][0] + len(groups[-1][1]) > recent_from: break   # 최근 메시지는 빼지 않음
+        start, group = groups.pop()
+        total -= sum(t for _, _, t in group)
+        end = start + len(group)
+
+    history = [{"role": role, "parts": [text]} for _, group in reversed(groups) for role, text, _ in group]
+    if end > 0:
+        note = _dropped_note(past, end)
+        if history and history[0]["role"] == "user":
+            history[0]["parts"] = [note + "\n\n" + history[0]["parts"][0]]
+        else:
+            history.insert(0, {"role": "user", "parts": [note]})
+    return history
+
+
+def history_tokens(history):
+    return sum(estimate_tokens(p) for h in history for p in h["parts"])
@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+# ---------------------------------------------------------
+# 직무명 표준화용 후보 색인 (difflib.get_close_matches 선형 탐색 대체)
+# ---------------------------------------------------------
+# get_close_matches 는 모든 직무와 SequenceMatcher 를 돌립니다.
+# 여기서는 글자 → {직무: 등장 횟수} 역색인으로 입력과 겹치는 글자 수(quick_ratio 의 분자)를
+# 직무별로 한 번에 세고, 그 상한이 cutoff 미만인 직무는 정밀 비교 없이 버립니다.
+# ratio() <= quick_ratio() 이므로 버린 직무는 어차피 cutoff 를 넘을 수 없어 결과가 같습니다.
+# 흔한 글자는 후보를 만드는 데 쓰지 않고(prefix filtering), 후보의 겹침 계산에만 더합니다.
+# (difflib 은 한글을 음절 단위로 비교하므로, 같은 결과를 보장하려고 색인도 음절 단위로 둡니다)
+#
+# 별칭: 실제로 등록까지 끝난 (입력 직무 → 표준 직무) 쌍을 기억해 두고,
+# 표준 직무가 아직 목록에 있으면 유사도 계산 없이 바로 씁니다.
+
+
+class JobTitleIndex:
+    def __init__(self, alias_path=None, max_pending=1000):
+        self.lock = threading.RLock()
+        self.postings = defaultdict(dict)   # 글자 -> {직무: 등장 횟수}
+        self.jobs = set()
+        self._synced = None
+        self.alias_path = alias_path
+        self.aliases = self._load_aliases()
+        self._pending = {}                  # 도구명 -> (입력 직무, 표준 직무), 등록 확인 전
+        self.max_pending = max_pending
+        self.scored = 0                     # 정밀 비교(SequenceMatcher) 횟수
+
+    # --- 직무 목록 ---
+    def add(self, job):
+        with self.lock:
+            if job in self.jobs: return
+            self.jobs.add(job)
+            for ch, n in Counter(job).items():
+                self.postings[ch][job] = n
+
+    def remove(self, job):
+        with self.lock:
+            if job not in self.jobs: return
+            self.jobs.discard(job)
+            for ch in set(job):
+                bucket = self.postings.get(ch)
+                if bucket is None: continue
+                bucket.pop(job, None)
+                if not bucket: del self.postings[ch]
+
+    def sync(self, jobs):
+        """현재 직무 목록에 맞춰 달라진 직무만 추가/제거. (같은 목록 객체면 바로 반환)"""
+        with self.lock:
+            if jobs is self._synced: return self
+            current = set(jobs)
+            for job in self.jobs - current: self.remove(job)
+            for job in current - self.jobs: self.add(job)
+            self._synced = jobs
+            return self
+
+    # --- 검색 ---
+    def close_match(self, word, cutoff=0.6):
+        """difflib.get_close_matches(word, jobs, n=1, cutoff) 와 같은 결과 (없으면 None, cutoff > 0)."""
+        with self.lock:
+            # 겹침이 need 미만이면 어떤 길이의 직무도 cutoff 에 못 미침 (겹침 <= 직무 길이).
+            # 흔한 글자(공백 등)는 합쳐도 need 에 못 미치는 만큼만 골라 후보 생성에서 빼고,
+            # 드문 글자를 하나라도 공유하는 직무만 후보로 삼은 뒤 흔한 글자 겹침을 더합니다.
+            need = cutoff * len(word) / (2.0 - cutoff)
+            chars = sorted(Counter(word).items(), key=lambda kv: -len(self.postings.get(kv[0], ())))
+            common, budget = [], 0
+            for ch, n in chars:
+                if budget + n >= need - 1e-9: break
+                common.append((ch, n))
+                budget += n
+            overlap = defaultdict(int)
+            for ch, n in chars[len(common):]:
+                for job, m in self.postings.get(ch, {}).items():
+                    overlap[job] += m if m < n else n
+            best = None
+            matcher = SequenceMatcher()
+            matcher.set_seq2(word)
+            for job, shared in overlap.items():
+                total = len(job) + len(word)
+                if 2.0 * (shared + budget) / total < cutoff: continue   # 흔한 글자가 다 겹쳐도 미달
+                for ch, n in common:
+                    m = self.postings[ch].get(job, 0) if ch in self.postings else 0
+                    shared += m if m < n else n
+                # quick_ratio 상한으로 후보 축소 (difflib 과 같은 식)
+                if 2.0 * shared / total < cutoff: continue
+                matcher.set_seq1(job)
+                self.scored += 1
+                score = matcher.ratio()
+                if score >= cutoff and (best is None or (score, job) > best):
+                    best = (score, job)
+            return best[1] if best else None
+
+    def normalize(self, input_job, cutoff=0.6):
+        """목록에 있으면 그대로 → 확인된 별칭 → 유사 직무(cutoff 이상) → 입력 그대로."""
+        input_job = input_job.strip()
+        with self.lock:
+            if input_job in self.jobs: return input_job
+            alias = self.aliases.get(input_job)
+            if alias in self.jobs: return alias
+            return self.close_match(input_job, cutoff) or input_job
+
+    # --- 별칭 학습 ---
+    def propose(self, tool_name, input_job, job):
+        """표준화 결과를 기억해 두고, 그 도구가 실제로 등록되면 confirm() 으로 별칭에 올립니다."""
+        input_job = str(input_job).strip()
+        if not tool_name or input_job == job: return
+        with self.lock:
+            if len(self._pending) >= self.max_pending: self._pending.pop(next(iter(self._pending)))
+            self._pending[tool_name] = (input_job, job)
+
+    def confirm(self, tool_name):
+        with self.lock:
+            mapping = self._pending.pop(tool_name, None)
+            if mapping is None or self.aliases.get(mapping[0]) == mapping[1]: return False
+            self.aliases[mapping[0]] = mapping[1]
+            self._save_aliases()
+            return True
+
+    def _load_aliases(self):
+        if not self.alias_path: return {}
+        try:
+            with open(self.alias_path, encoding="utf-8") as f:
+                data = json.load(f)
+            return {str(k): str(v) for k, v in data.items()} if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_aliases(self):
+        if not self.alias_path: return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.alias_path)), exist_ok=True)
+            tmp = f"{self.alias_path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.aliases, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.alias_path)
+        except OSError as e:
+            print(f"💥 [직무 별칭 저장 실패] {e}")
+
+    def stats(self):
+        with self.lock:
+            return {"jobs": len(self.jobs), "chars": len(self.postings), "aliases": len(self.aliases),
+                    "pending": len(self._pending), "scored": self.scored}
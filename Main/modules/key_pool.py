@@ -0,0 +1,192 @@
+import hashlib
+import threading
+import time
+from google.api_core import exceptions
+from .rate_limiter import RateLimiter
+from .metrics import metrics
+
+# ---------------------------------------------------------
+# 공용 API 키 풀 (키마다 할당량 계산 + 상태에 따른 키 선택)
+# ---------------------------------------------------------
+# 공용 키가 하나면 바쁜 시간에 모든 익명 사용자가 같은 할당량에 막힙니다.
+# 키마다 RateLimiter(요청/분 + 토큰/분)를 따로 두고, 새 호출은 남은 여유가 가장 많은 키로 보냅니다.
+# 키 상태(회로 차단기):
+#   closed      정상
+#   open        429 는 바로, 503 은 failure_threshold 번 연속이면 cooldown 초 동안 쉼
+#               (연속으로 열릴 때마다 2배, 최대 max_cooldown)
+#   half_open   쉬는 시간이 끝나면 시험 호출 1건만 보냄. 성공하면 closed, 실패하면 다시 open
+#   quarantined 잘못된 키(400 API key not valid / 403). 다시 시작하거나 release() 전까지 쓰지 않음
+# 키 원문은 통계/계측에 남기지 않고 해시(key_id)만 씁니다.
+CLOSED, OPEN, HALF_OPEN, QUARANTINED = "closed", "open", "half_open", "quarantined"
+INVALID_KEY_ERRORS = (exceptions.PermissionDenied, exceptions.Unauthenticated)
+UNAVAILABLE_ERRORS = (exceptions.ServiceUnavailable, exceptions.DeadlineExceeded)
+
+
+def key_id(api_key):
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:12]
+
+
+def classify(error):
+    """예외 → 'rate_limited' / 'unavailable' / 'invalid' / None(키와 무관한 오류)."""
+    if isinstance(error, exceptions.ResourceExhausted): return "rate_limited"
+    if isinstance(error, UNAVAILABLE_ERRORS): return "unavailable"
+    if isinstance(error, INVALID_KEY_ERRORS): return "invalid"
+    # 400 은 요청 자체의 오류일 수도 있으므로 키 문제라고 밝힌 경우만
+    if isinstance(error, exceptions.InvalidArgument) and "key" in str(error).lower(): return "invalid"
+    return None
+
+
+class _Key:
+    def __init__(self, api_key, limiter):
+        self.api_key = api_key
+        self.id = key_id(api_key)
+        self.limiter = limiter
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.failures = 0     # 연속 503 수
+        self.trips = 0        # 연속으로 열린 횟수 (쉬는 시간 배수)
+        self.generation = 0   # 열리거나 격리될 때마다 증가 (그 전부터 기다리던 호출은 다른 키로)
+        self.probing = 0.0    # half_open 시험 호출을 내보낸 시각 (0 이면 없음)
+        self.last_used = 0.0
+        self.counts = {"admitted": 0, "ok": 0, "rate_limited": 0, "unavailable": 0, "invalid": 0}
+
+
+class KeyPool:
+    """
+    keys: 공용 API 키 목록, rpm/tpm: 키 하나의 분당 요청/토큰 한도.
+    on_quarantine(api_key): 키를 격리할 때 호출 (모델 핸들 캐시 정리 등).
+    """
+
+    def __init__(self, keys, rpm, tpm, failure_threshold=3, cooldown=10.0, max_cooldown=300.0,
+                 window=60.0, on_quarantine=None):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.on_quarantine = on_quarantine
+        self.lock = threading.Lock()
+        self.keys = {}
+        for api_key in dict.fromkeys(k for k in keys if k):
+            entry = _Key(api_key, RateLimiter(rpm, tpm, window=window))
+            self.keys[entry.id] = entry
+
+    def __len__(self):
+        """격리되지 않은 키 수."""
+        with self.lock: return sum(k.state != QUARANTINED for k in self.keys.values())
+
+    def owns(self, api_key):
+        return bool(api_key) and key_id(api_key) in self.keys
+
+    def _set_state(self, entry, state):
+        if entry.state == state: return
+        entry.state = state
+        metrics.count("key.circuit", key=entry.id, state=state)
+
+    def _usable(self, entry, now):
+        if entry.state == OPEN and now >= entry.open_until: self._set_state(entry, HALF_OPEN)
+        if entry.state == CLOSED: return True
+        # 시험 호출이 결과 없이 사라졌으면(cooldown 초 경과) 다시 시험
+        return entry.state == HALF_OPEN and (not entry.probing or now - entry.probing > self.cooldown)
+
+    # --- 선택 ---
+    def select(self):
+        """
+        지금 보낼 키. 쓸 수 있는 키 중 남은 여유가 가장 많은 키 (같으면 가장 오래 안 쓴 키).
+        모두 쉬는 중이면 가장 먼저 풀리는 키 (그 키의 대기열에서 기다리게 됨). 쓸 키가 없으면 None.
+        """
+        with self.lock:
+            now = time.monotonic()
+            usable = [k for k in self.keys.values() if self._usable(k, now)]
+            if usable:
+                best = max(usable, key=lambda k: (k.limiter.headroom(), -k.last_used))
+            else:
+                waiting = [k for k in self.keys.values() if k.state != QUARANTINED]
+                if not waiting: return None
+                best = min(waiting, key=lambda k: k.open_until)
+            best.last_used = now
+            if best.state == HALF_OPEN: best.probing = now
+            return best.api_key
+
+    def available(self):
+        """지금 바로 보낼 수 있는 키 수 (쉬는 중/시험 호출 중/여유 없음 제외)."""
+        with self.lock:
+            now = time.monotonic()
+            return sum(self._usable(k, now) and k.limiter.headroom() > 0 for k in self.keys.values())
+
+    def acquire(self, api_key, tokens=0, on_wait=None, timeout=None):
+        """
+        api_key 의 할당량 차례를 기다립니다. 풀에 없는 키(개인 키)는 None,
+        통과하면 True, timeout 안에 통과하지 못하거나 기다리는 동안 키가 쉬기 시작/격리되면 False.
+        """
+        entry = self.keys.get(key_id(api_key)) if api_key else None
+        if entry is None: return None
+        generation = entry.generation
+        if not entry.limiter.acquire(tokens, on_wait=on_wait, timeout=timeout,
+                                     abandon=lambda: entry.generation != generation):
+            return False
+        with self.lock: entry.counts["admitted"] += 1
+        metrics.count("key.admitted", key=entry.id)
+        return True
+
+    # --- 결과 보고 ---
+    def report(self, api_key, error=None):
+        """호출 결과를 알림. error=None 이면 성공. 키와 무관한 오류는 상태를 바꾸지 않습니다."""
+        entry = self.keys.get(key_id(api_key)) if api_key else None
+        if entry is None: return
+        kind = "ok" if error is None else classify(error)
+        quarantined = False
+        with self.lock:
+            entry.probing = 0.0
+            if kind is None: return
+            entry.counts[kind] += 1
+            if kind == "ok":
+                entry.failures = entry.trips = 0
+                if entry.state != QUARANTINED: self._set_state(entry, CLOSED)
+            elif kind == "invalid":
+                quarantined = entry.state != QUARANTINED
+                entry.generation += 1
+                self._set_state(entry, QUARANTINED)
+                # 이 키를 기다리던 호출을 깨워 다른 키로
+                entry.limiter.wake()
+            else:
+                entry.failures += 1
+                if kind == "rate_limited" or entry.failures >= self.failure_threshold or entry.state == HALF_OPEN:
+                    self._open(entry)
+        metrics.count("key.outcome", key=entry.id, result=kind)
+        if quarantined:
+            print(f"⛔ [키 격리] {entry.id}: {error}")
+            if self.on_quarantine is not None: self.on_quarantine(api_key)
+
+    def _open(self, entry):
+        if entry.state == QUARANTINED: return
+        delay = min(self.max_cooldown, self.cooldown * (2 ** entry.trips))
+        entry.trips += 1
+        entry.failures = 0
+        entry.open_until = time.monotonic() + delay
+        entry.generation += 1
+        # 이 키를 기다리는 호출도 쉬는 시간 동안 멈춤 (일제 재시도 방지)
+        entry.limiter.penalize(delay)
+        self._set_state(entry, OPEN)
+
+    def settle(self, api_key):
+        """결과 없이 끝난 호출(취소 등): 시험 호출 자리만 반납."""
+        entry = self.keys.get(key_id(api_key)) if api_key else None
+        if entry is None: return
+        with self.lock: entry.probing = 0.0
+
+    def release(self, api_key):
+        """격리/쉬는 중인 키를 다시 정상으로 (키를 고친 뒤 등)."""
+        entry = self.keys.get(key_id(api_key)) if api_key else None
+        if entry is None: return
+        with self.lock:
+            entry.failures = entry.trips = 0
+            entry.open_until = 0.0
+            self._set_state(entry, CLOSED)
+
+    def stats(self):
+        """키별 상태/여유/결과 수 (키 원문 없이 key_id 로)."""
+        with self.lock:
+            now = time.monotonic()
+            return [{"key": k.id, "state": k.state, "headroom": round(k.limiter.headroom(), 3),
+                     "cooldown_left": round(max(0.0, k.open_until - now), 1) if k.state == OPEN else 0.0,
+                     "queued": k.limiter.stats()["queued"], **k.counts}
+                    for k in self.keys.values()]
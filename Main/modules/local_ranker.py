@@ -0,0 +1,111 @@
+import re
+import numpy as np
+from .answer_parser import parse_question
+from .tool_identity import tool_key
+
+# ---------------------------------------------------------
+# 로컬 DB 추천 (모델 호출 없이 수 ms)
+# ---------------------------------------------------------
+# 시스템 프롬프트 섹션 1 "📂 [DB 맞춤]" 과 같은 기준을 로컬에서 계산합니다.
+#   점수 = 직무 일치 + 상황 일치 + 결과물 일치 + 질문 관련도(BM25 순위) + 순추천수(추천수 - 비추천수) 가중치
+# 답변을 기다리는 동안 미리보기 카드로, 모델 호출이 끝내 실패하면 대체 답변으로 씁니다.
+W_JOB = 3.0
+W_SITUATION = 2.0
+W_OUTPUT = 1.0
+W_RELEVANCE = 1.5   # 검색 순위 1위 = 1.5, 뒤로 갈수록 선형 감소
+W_VOTES = 0.5       # sign(순추천수) * log(1 + |순추천수|) 에 곱함
+TIP_CHARS = 80
+
+
+def question_facets(question, job_names=()):
+    """질문에서 (직무, 상황, 결과물 목록). 빠른 추천 양식이 아니면 질문에 나온 가장 긴 직무명."""
+    job, situation, output = parse_question(question)
+    outputs = [o.strip() for o in output.split(",") if o.strip()]
+    if job == "기타":
+        found = [j for j in job_names if len(j) >= 2 and j in (question or "")]
+        job = max(found, key=len) if found else None
+    return job, situation or None, outputs
+
+
+def rank_tools(df, job=None, situation=None, outputs=(), relevant=(), top_k=3):
+    """
+    df 행을 점수 순으로 골라 [{'추천도구', '직무', '상황', '특징_및_팁', '유료여부', '링크', '순추천수', '점수'}, ...].
+    relevant: 질문 관련도 순 행 위치(iloc) 목록 (retriever.query 결과). 아무 기준에도 맞지 않는 행은 제외.
+    같은 도구가 여러 행이면 점수가 가장 높은 행 하나만.
+    """
+    if df.empty or '추천도구' not in df.columns: return []
+    n = len(df)
+    score = np.zeros(n)
+    matched = np.zeros(n, dtype=bool)
+
+    def add(mask, weight):
+        mask = np.asarray(mask, dtype=bool)
+        score[mask] += weight
+        matched[mask] = True
+
+    if job and '직무' in df.columns: add(df['직무'] == job, W_JOB)
+    if situation and '상황' in df.columns: add(df['상황'] == situation, W_SITUATION)
+    if outputs and '결과물' in df.columns:
+        pattern = "|".join(re.escape(o) for o in outputs)
+        add(df['결과물'].astype(str).str.contains(pattern, regex=True), W_OUTPUT)
+    relevant = np.asarray(list(relevant), dtype=int)
+    if len(relevant):
+        score[relevant] += W_RELEVANCE * (1 - np.arange(len(relevant)) / len(relevant))
+        matched[relevant] = True
+    if not matched.any(): return []
+
+    up = df['추천수'].to_numpy(dtype=float) if '추천수' in df.columns else np.zeros(n)
+    down = df['비추천수'].to_numpy(dtype=float) if '비추천수' in df.columns else np.zeros(n)
+    net = up - down
+    total = np.where(matched, score + W_VOTES * np.sign(net) * np.log1p(np.abs(net)), -np.inf)
+
+    # 점수 순으로 보면서 같은 도구(tool_key)는 처음 나온 행만
+    names = df['추천도구']
+    rows, seen = [], set()
+    for i in np.argsort(-total, kind="stable"):
+        if not matched[i] or len(rows) == top_k: break
+        key = tool_key(names.iat[i])
+        if key in seen: continue
+        seen.add(key)
+        row = df.iloc[i]
+        rows.append({
+            "추천도구": str(row.get('추천도구', "")), "직무": str(row.get('직무', "")),
+            "상황": str(row.get('상황', "")), "특징_및_팁": str(row.get('특징_및_팁', "")),
+            "유료여부": str(row.get('유료여부', "")), "링크": str(row.get('링크', "")),
+            "순추천수": int(net[i]), "점수": round(float(total[i]), 2),
+        })
+    return rows
+
+
+def _clip(text, chars=TIP_CHARS):
+    text = " ".join(str(text).split())
+    return text if len(text) <= chars else text[:chars] + "…"
+
+
+def preview_markdown(tools):
+    """답변 생성 중 보여 줄 미리보기 카드 본문."""
+    lines = ["**📂 DB 추천 미리보기** (AI 답변을 준비하는 동안 DB에서 먼저 찾은 도구)"]
+    for t in tools:
+        link = f" · [링크]({t['링크']})" if t["링크"].startswith("http") else ""
+        lines.append(f"- **{t['추천도구']}** · {t['직무']}/{t['상황']} · 👍 {t['순추천수']}{link}")
+        if t["특징_및_팁"]: lines.append(f"  - {_clip(t['특징_및_팁'])}")
+    return "\n".join(lines)
+
+
+def degraded_answer(tools, reason):
+    """
+    모델 답변을 받지 못했을 때의 대체 답변. 답변 양식(섹션 1)을 따르므로
+    answer_parser 가 도구를 추출해 👍/👎 버튼도 그대로 표시됩니다.
+    """
+    reason = _clip(str(reason).lstrip("❌⚠️ \ufe0f"), 60)
+    blocks = [f"⚠️ AI 답변을 받지 못해 DB에 등록된 도구로 먼저 안내해 드립니다. ({reason})"]
+    for t in tools:
+        blocks.append("\n".join([
+            f"> ### 📂 [DB 맞춤] {t['추천도구']}",
+            f"> * **이유:** '{t['직무']}' 직무의 '{t['상황']}' 업무에 등록된 도구입니다. (순추천 {t['순추천수']})",
+            f"> * **가격:** {t['유료여부'] or '확인 필요'}",
+            f"> * **링크:** {t['링크'] or '-'}",
+            f"> * **💡 팁:** {_clip(t['특징_및_팁']) or '-'}",
+        ]))
+    blocks.append("잠시 후 다시 질문하시면 AI 추천(업계 표준/트렌드/워크플로우)도 받아보실 수 있습니다.")
+    return "\n\n".join(blocks)
@@ -0,0 +1,179 @@
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from .metrics import metrics, current_trace, use_trace
+
+# ---------------------------------------------------------
+# 백그라운드 대화 로그 기록기 (요청 처리 경로에서 시트 API 대기 제거)
+# ---------------------------------------------------------
+# - submit() 은 로컬 spool 파일에 한 줄 추가 + 메모리 큐에 넣고 바로 반환
+# - 워커 스레드가 batch_size 개가 모이거나 flush_interval 초가 지나면 append_rows 로 한 번에 기록
+# - 실패하면 지수 백오프로 재시도하고, 끝내 실패한 묶음은 다음 주기에 다시 시도
+# - spool 의 어디까지 시트에 기록됐는지는 '.offset' 파일에 남겨, 재시작 시 미기록분을 다시 올림
+# - 미기록분이 큐보다 많으면 재생 위치(_replay_at)를 기억해 두고 큐가 비는 대로 이어서 재생.
+#   재생이 끝나기 전의 새 로그는 spool 에만 추가하고(재생 때 순서대로 큐에 들어감), spool 도 비우지 않음
+# - 큐 항목에는 submit() 한 요청의 추적 ID 를 함께 넣어, 워커의 계측 기록도 그 요청으로 묶음
+#   (spool 에서 재생한 이전 실행분은 추적 ID 없음)
+
+
+class LogWriter:
+    def __init__(self, open_worksheet, spool_path, max_queue=1000, batch_size=20,
+                 flush_interval=5.0, max_retries=4, base_backoff=1.0, name="log"):
+        self.open_worksheet = open_worksheet
+        self.name = name        # 계측 레이블
+        self.spool_path = spool_path
+        self.offset_path = spool_path + ".offset"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.spool_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failures = 0
+        self._inflight = []     # 기록 중이거나 재시도를 기다리는 묶음
+        self._replay_at = None  # 아직 큐에 넣지 못한 spool 위치 (None: 재생 완료)
+        self._ws = None
+        self._stop = threading.Event()
+
+        os.makedirs(os.path.dirname(os.path.abspath(spool_path)), exist_ok=True)
+        if os.path.exists(spool_path): self._replay_at = self._read_offset()
+        self._replay_spool()
+        self.thread = threading.Thread(target=self._run, name=f"{name}-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    # --- spool ---
+    def _read_offset(self):
+        try:
+            with open(self.offset_path, encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _replay_spool(self):
+        """이전 실행에서 시트에 못 올린 로그를 큐가 찰 때까지 다시 넣고, 못 넣은 위치를 기억합니다."""
+        with self.spool_lock:
+            if self._replay_at is None: return
+            with open(self.spool_path, "rb") as f:
+                f.seek(self._replay_at)
+                while not self.queue.full():
+                    line = f.readline()
+                    if not line:
+                        self._replay_at = None
+                        return
+                    self._replay_at = f.tell()
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.queue.put_nowait((row, self._replay_at, None))
+
+    def _commit(self, end_offset):
+        """end_offset 까지 기록 완료. 재생이 끝났고 모두 기록됐으면 spool 을 비웁니다."""
+        with self.spool_lock:
+            size = os.path.getsize(self.spool_path) if os.path.exists(self.spool_path) else 0
+            if end_offset >= size and self._replay_at is None:
+                open(self.spool_path, "wb").close()
+                end_offset = 0
+            with open(self.offset_path, "w", encoding="utf-8") as f:
+                f.write(str(end_offset))
+
+    # --- 요청 경로 (논블로킹) ---
+    def submit(self, row):
+        with self.spool_lock:
+            if self.queue.full():
+                with self.stats_lock: self.dropped += 1
+                metrics.count("writer.dropped", writer=self.name)
+                return False
+            line = (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+            with open(self.spool_path, "ab") as f:
+                f.write(line)
+                end = f.tell()
+            # 재생 중이면 앞선 미기록분 뒤에 순서대로 재생되도록 spool 에만 남김
+            if self._replay_at is None: self.queue.put_nowait((row, end, current_trace()))
+        with self.stats_lock: self.submitted += 1
+        return True
+
+    def stats(self):
+        with self.stats_lock:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failures": self.failures,
+                "pending": self.queue.qsize() + len(self._inflight),
+            }
+
+    # --- 워커 ---
+    def _collect(self):
+        batch = self._inflight
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or self._stop.is_set(): break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        self._inflight = batch
+        return batch
+
+    def _write(self, batch):
+        rows = [row for row, _, _ in batch]
+        # 묶음 단위 기록(지연/실패)은 첫 항목의 추적 ID 로, 행 수는 요청(추적 ID)별로
+        with use_trace(batch[0][2]):
+            for attempt in range(self.max_retries + 1):
+                try:
+                    if self._ws is None: self._ws = self.open_worksheet()
+                    with metrics.timer("writer.flush", writer=self.name):
+                        self._ws.append_rows(rows)
+                    for trace_id, n in Counter(trace for _, _, trace in batch).items():
+                        with use_trace(trace_id): metrics.count("writer.rows", n, writer=self.name)
+                    return True
+                except Exception as e:
+                    self._ws = None
+                    with self.stats_lock: self.failures += 1
+                    metrics.count("writer.failure", writer=self.name, error=type(e).__name__)
+                    print(f"💥 [로그 기록 실패] {attempt + 1}회차: {e}")
+                    if attempt < self.max_retries and not self._stop.is_set():
+                        # 지수 백오프 + 지터 (동시에 재시도가 몰리지 않도록)
+                        time.sleep(self.base_backoff * (2 ** attempt) * (0.5 + random.random()))
+        return False
+
+    def flush(self, batch):
+        if not batch: return True
+        if self._write(batch):
+            self._commit(batch[-1][1])
+            with self.stats_lock: self.written += len(batch)
+            self._inflight = []
+            return True
+        # 실패한 묶음은 _inflight 에 남겨 다음 주기에 다시 시도 (spool 에도 남아 있음)
+        return False
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.flush(self._collect())
+            self._replay_spool()
+
+    def close(self, timeout=10.0):
+        """남은 로그를 한 번 더 기록 시도하고 워커를 멈춥니다."""
+        self._stop.set()
+        self.thread.join(timeout)
+        batch = self._inflight
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        self._inflight = batch
+        self.flush(batch)
@@ -0,0 +1,355 @@
+import argparse
+import bisect
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .config import METRICS_ENABLED, METRICS_JSONL_PATH, METRICS_PROMETHEUS_HOST
+
+# ---------------------------------------------------------
+# 단계별 지연/카운터 계측 + 요청 추적 ID
+# ---------------------------------------------------------
+# 시트 읽기/쓰기, 프롬프트 크기, 모델 호출(오류 종류별 재시도), 답변 캐시 적중, 투표 기록 등을
+# 같은 이름 체계("단계.세부")로 모읍니다.
+#   metrics.timer("storage.read", backend="sheets", op="load")   # with 블록 지연 (예외면 error=예외명)
+#   metrics.count("answer_cache", result="hit")                   # 카운터
+#   metrics.observe("prompt.tokens", n)                           # 크기 분포
+# 집계는 메모리에 두고 Prometheus 텍스트(/metrics)로 내보내며, sink 가 있으면 이벤트를 한 줄씩 넘깁니다.
+# 꺼져 있으면(enabled=False) 모든 호출이 조건 검사 한 번으로 끝납니다. (timer 는 공유 no-op 객체 반환)
+#
+# 추적 ID: 사용자 한 턴(Streamlit 실행 1회)마다 new_trace() 로 발급하면
+# 그 턴에서 기록한 모든 이벤트에 같은 trace 가 붙습니다. (contextvars, 스레드별)
+# 백그라운드 워커(로그/투표 기록기)로 넘기는 일은 current_trace() 를 항목과 함께 큐에 넣고,
+# 워커가 use_trace() 로 되살려 기록합니다. (스레드에는 contextvar 가 이어지지 않음)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (100, 500, 1_000, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000)
+PREFIX = "jobfit_"
+
+_trace = contextvars.ContextVar("metrics_trace", default=None)
+
+
+def new_trace():
+    """새 추적 ID 를 발급해 현재 실행 흐름에 설정하고 반환합니다."""
+    trace_id = uuid.uuid4().hex[:12]
+    _trace.set(trace_id)
+    return trace_id
+
+
+def current_trace():
+    return _trace.get()
+
+
+@contextlib.contextmanager
+def use_trace(trace_id):
+    """with 블록 동안 trace_id 를 현재 추적 ID 로 둡니다. (워커 스레드에서 요청의 ID 되살리기)"""
+    token = _trace.set(trace_id)
+    try:
+        yield trace_id
+    finally:
+        _trace.reset(token)
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self): return self
+
+    def __exit__(self, *exc): return False
+
+
+_NOOP = _NoopTimer()
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "started")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics, self.name, self.labels = metrics, name, labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        labels = self.labels if exc_type is None else dict(self.labels, error=exc_type.__name__)
+        self.metrics.observe_seconds(self.name, time.perf_counter() - self.started, **labels)
+        return False
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def add(self, value):
+        i = bisect.bisect_left(self.buckets, value)   # 첫 번째 value <= 경계
+        if i < len(self.buckets): self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """버킷 경계 기준 근사 분위수 (상한 초과 구간이면 inf)."""
+        if not self.count: return None
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target: return bound
+        return float("inf")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label(value):
+    return str(value).lower() if isinstance(value, bool) else str(value)
+
+
+def _series(labels):
+    return tuple(sorted((k, _label(v)) for k, v in labels.items()))
+
+
+class Metrics:
+    def __init__(self, enabled=False, sink=None):
+        self.enabled = enabled
+        self.sink = sink
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)   # (이름, 레이블) -> 값
+        self.histograms = {}                 # (이름, 레이블) -> _Histogram
+        self.units = {}                      # 이름 -> "seconds" / ""
+
+    # --- 기록 ---
+    def count(self, name, value=1, **labels):
+        if not self.enabled: return
+        with self.lock:
+            self.counters[(name, _series(labels))] += value
+        self._emit("count", name, value, labels)
+
+    def observe(self, name, value, **labels):
+        """크기 분포 (글자 수, 토큰 수 등)."""
+        if not self.enabled: return
+        self._record(name, value, labels, SIZE_BUCKETS, "")
+
+    def observe_seconds(self, name, seconds, **labels):
+        if not self.enabled or seconds is None: return
+        self._record(name, seconds, labels, LATENCY_BUCKETS, "seconds")
+
+    def timer(self, name, **labels):
+        """with 블록 실행 시간을 name 지연 분포에 기록. 꺼져 있으면 공유 no-op."""
+        if not self.enabled: return _NOOP
+        return _Timer(self, name, labels)
+
+    def timed(self, name, **labels):
+        """함수 실행 시간을 기록하는 데코레이터 (켜고 끄는 것은 호출 시점에 판단)."""
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                if not self.enabled: return fn(*args, **kwargs)
+                with _Timer(self, name, labels):
+                    return fn(*args, **kwargs)
+            return inner
+        return wrap
+
+    def _record(self, name, value, labels, buckets, unit):
+        key = (name, _series(labels))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = _Histogram(buckets)
+                self.units.setdefault(name, unit)
+            hist.add(value)
+        self._emit("seconds" if unit else "observe", name, value, labels)
+
+    def _emit(self, kind, name, value, labels):
+        if self.sink is None: return
+        try:
+            self.sink.write({"ts": round(time.time(), 3), "trace": _trace.get(), "type": kind,
+                             "name": name, "value": round(value, 6), "labels": labels})
+        except Exception as e:
+            print(f"💥 [계측 기록 실패] {e}")
+
+    # --- 조회/내보내기 ---
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.units.clear()
+
+    def stats(self):
+        """{이름: {"count", "sum", "p50", "p95"}} (지연은 초, 레이블 합산)."""
+        merged = {}
+        with self.lock:
+            for (name, _), value in self.counters.items():
+                entry = merged.setdefault(name, {"count": 0, "sum": 0.0})
+                entry["count"] += value
+                entry["sum"] += value
+            for (name, _), hist in self.histograms.items():
+                entry = merged.setdefault(name, {"count": 0, "sum": 0.0})
+                total = entry.setdefault("_hist", _Histogram(hist.buckets))
+                total.counts = [a + b for a, b in zip(total.counts, hist.counts)]
+                total.count += hist.count
+                entry["count"] += hist.count
+                entry["sum"] += hist.sum
+        for entry in merged.values():
+            hist = entry.pop("_hist", None)
+            if hist is not None: entry.update(p50=hist.quantile(0.5), p95=hist.quantile(0.95))
+        return merged
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 형식 (카운터는 _total, 지연 분포는 _seconds 히스토그램)."""
+        def metric_name(name, suffix):
+            return PREFIX + name.replace(".", "_").replace("-", "_") + suffix
+
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items: return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+        lines = []
+        with self.lock:
+            by_name = defaultdict(list)
+            for (name, labels), value in sorted(self.counters.items()):
+                by_name[metric_name(name, "_total")].append((labels, value))
+            for metric, series in by_name.items():
+                lines.append(f"# TYPE {metric} counter")
+                lines += [f"{metric}{fmt(labels)} {value:g}" for labels, value in series]
+
+            by_name = defaultdict(list)
+            for (name, labels), hist in sorted(self.histograms.items(), key=lambda kv: kv[0]):
+                suffix = "_seconds" if self.units.get(name) else ""
+                by_name[metric_name(name, suffix)].append((labels, hist))
+            for metric, series in by_name.items():
+                lines.append(f"# TYPE {metric} histogram")
+                for labels, hist in series:
+                    seen = 0
+                    for bound, n in zip(hist.buckets, hist.counts):
+                        seen += n
+                        lines.append(f"{metric}_bucket{fmt(labels, [('le', f'{bound:g}')])} {seen}")
+                    lines.append(f"{metric}_bucket{fmt(labels, [('le', '+Inf')])} {hist.count}")
+                    lines.append(f"{metric}_sum{fmt(labels)} {hist.sum:g}")
+                    lines.append(f"{metric}_count{fmt(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------
+# 내보내기: JSONL 파일 sink / Prometheus 텍스트 엔드포인트
+# ---------------------------------------------------------
+class JsonlSink:
+    """이벤트를 JSON 한 줄씩 파일에 덧붙입니다. (sink 는 write(event) 만 있으면 무엇이든 가능)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8", buffering=1)
+
+    def write(self, event):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.file.write(line)
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+_server_lock = threading.Lock()
+_server = None
+
+
+def serve_prometheus(port, host=METRICS_PROMETHEUS_HOST, registry=None):
+    """
+    /metrics 를 내보내는 HTTP 서버를 백그라운드로 띄웁니다. (프로세스당 한 번, port 0 이면 안 띄움)
+    기본은 로컬에서만 접속 가능(127.0.0.1). 다른 호스트의 수집기가 읽어야 하면 host 를 명시하세요.
+    """
+    global _server
+    registry = registry or metrics
+    if not port or not registry.enabled: return None
+    with _server_lock:
+        if _server is not None: return _server
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            _server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"💥 [계측 엔드포인트 시작 실패] {e}")
+            return None
+        threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        return _server
+
+
+# 프로세스 공용 계측기 (모든 모듈이 이 객체에 기록)
+metrics = Metrics(METRICS_ENABLED, JsonlSink(METRICS_JSONL_PATH) if METRICS_ENABLED and METRICS_JSONL_PATH else None)
+
+
+# ---------------------------------------------------------
+# CLI: JSONL 기록 요약
+#   (Main 폴더에서) python -m modules.metrics                 # 단계별 횟수/p50/p95/p99
+#   (Main 폴더에서) python -m modules.metrics --trace <ID>    # 한 턴의 단계별 기록
+# ---------------------------------------------------------
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(events):
+    """{(이름, 종류): [값, ...]} -> [(이름, 종류, 횟수, 합계, p50, p95, p99), ...]"""
+    groups = defaultdict(list)
+    for ev in events:
+        groups[(ev["name"], ev["type"])].append(ev["value"])
+    return [(name, kind, len(vals), sum(vals), _percentile(vals, 0.5), _percentile(vals, 0.95), _percentile(vals, 0.99))
+            for (name, kind), vals in sorted(groups.items())]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="계측 JSONL 기록을 단계별로 요약")
+    parser.add_argument("path", nargs="?", default=METRICS_JSONL_PATH, help="JSONL 파일 (기본: config.METRICS_JSONL_PATH)")
+    parser.add_argument("--trace", help="이 추적 ID 의 이벤트만 시간순으로 출력")
+    args = parser.parse_args(argv)
+
+    events = []
+    with open(args.path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+
+    if args.trace:
+        for ev in (e for e in events if e.get("trace") == args.trace):
+            labels = " ".join(f"{k}={v}" for k, v in ev.get("labels", {}).items())
+            unit = "s" if ev["type"] == "seconds" else ""
+            print(f"{ev['ts']:.3f} {ev['name']:<20} {ev['value']:g}{unit} {labels}")
+        return
+
+    print(f"{'name':<22} {'type':<8} {'n':>6} {'sum':>10} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, kind, n, total, p50, p95, p99 in summarize(events):
+        print(f"{name:<22} {kind:<8} {n:>6} {total:>10.3f} {p50:>9.4f} {p95:>9.4f} {p99:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import random
+import threading
+import time
+from collections import deque
+
+# ---------------------------------------------------------
+# Gemini 호출 공용 속도 제한기 (요청/분 + 토큰/분) + 선착순 대기열
+# ---------------------------------------------------------
+# 429 를 맞고 나서 쉬는 대신, 호출 전에 할당량 안에서만 내보냅니다.
+# 대기열은 먼저 온 요청부터 통과시키며(FIFO), 대기 순번과 예상 대기 시간을 알려줍니다.
+
+
+def estimate_tokens(text):
+    """로컬 토큰 추정치. 한글은 글자당 약 1토큰, 그 외는 4글자당 약 1토큰."""
+    text = str(text)
+    hangul = sum(1 for ch in text if "가" <= ch <= "힣")
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+def backoff_delay(attempt, base=2.0, cap=60.0):
+    """지터를 섞은 지수 백오프(equal jitter): [d/2, d] 범위, d = min(cap, base * 2^attempt)."""
+    d = min(cap, base * (2 ** attempt))
+    return d / 2 + random.uniform(0, d / 2)
+
+
+class TokenBucket:
+    def __init__(self, capacity, refill_per_sec):
+        self.capacity = capacity
+        self.rate = refill_per_sec
+        self.tokens = capacity
+        self.last = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def time_until(self, n, now):
+        self._refill(now)
+        if self.tokens >= n: return 0.0
+        return (n - self.tokens) / self.rate
+
+    def take(self, n, now):
+        self._refill(now)
+        self.tokens -= n
+
+
+class RateLimiter:
+    """
+    rpm: 분당 요청 수, tpm: 분당 토큰 수, window: 할당량 기준 시간(초, 테스트용으로 줄일 수 있음)
+    acquire() 는 차례가 와서 두 버킷 모두 여유가 생길 때까지 블로킹합니다.
+
+    버킷 용량(순간 허용량)을 할당량의 burst 비율로 두고 나머지를 window 동안 채우므로,
+    어느 window 구간을 잘라 봐도 할당량을 넘지 않습니다. (서버 쪽 슬라이딩 윈도우와 호환)
+    """
+
+    def __init__(self, rpm, tpm, window=60.0, burst=0.2):
+        self.rpm = rpm
+        self.window = window
+        req_burst = max(1, int(rpm * burst))
+        tok_burst = max(1, int(tpm * burst))
+        self.requests = TokenBucket(req_burst, max(rpm - req_burst, 1) / window)
+        self.tokens = TokenBucket(tok_burst, max(tpm - tok_burst, 1) / window)
+        self.cond = threading.Condition()
+        self.waiting = deque()
+        self.paused_until = 0.0
+        self.admitted = 0
+        self.waited = 0
+        self.penalties = 0
+
+    def _head_wait(self, tokens, now):
+        return max(
+            self.paused_until - now,
+            self.requests.time_until(1, now),
+            self.tokens.time_until(tokens, now),
+            0.0,
+        )
+
+    def acquire(self, tokens=0, on_wait=None, timeout=None, abandon=None):
+        """
+        차례가 오면 True. timeout 초 안에 통과하지 못하거나 abandon() 이 참이 되면 False.
+        on_wait(순번, 예상 대기초) 는 기다리는 동안 약 1초마다 호출됩니다.
+        """
+        tokens = min(tokens, self.tokens.capacity)
+        ticket = object()
+        start = time.monotonic()
+        waited = False
+        with self.cond:
+            self.waiting.append(ticket)
+        try:
+            while True:
+                with self.cond:
+                    if abandon is not None and abandon(): return False
+                    now = time.monotonic()
+                    position = self.waiting.index(ticket)
+                    head_wait = self._head_wait(tokens, now) if position == 0 else None
+                    if head_wait == 0.0:
+                        self.requests.take(1, now)
+                        self.tokens.take(tokens, now)
+                        self.admitted += 1
+                        if waited: self.waited += 1
+                        return True
+                    # 앞 사람들 몫만큼 요청 간격을 더해 대략적인 대기 시간 추정
+                    eta = self._head_wait(0, now) + position * (self.window / self.rpm)
+                    if head_wait is not None: eta = head_wait
+                if timeout is not None and now - start >= timeout: return False
+                waited = True
+                if on_wait is not None: on_wait(position + 1, eta)
+                with self.cond:
+                    self.cond.wait(min(max(eta, 0.05), 1.0))
+        finally:
+            with self.cond:
+                if ticket in self.waiting: self.waiting.remove(ticket)
+                self.cond.notify_all()
+
+    def penalize(self, seconds):
+        """429 를 받았을 때 seconds 동안 모든 신규 호출을 멈춥니다. (일제 재시도 방지)"""
+        with self.cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.penalties += 1
+            self.cond.notify_all()
+
+    def wake(self):
+        """기다리는 호출들이 조건(abandon 등)을 바로 다시 확인하게 깨웁니다."""
+        with self.cond:
+            self.cond.notify_all()
+
+    def headroom(self):
+        """
+        지금 남은 여유(0~1): 요청/토큰 버킷 중 더 적게 남은 쪽의 비율.
+        멈춤(penalize) 중이면 0, 대기열이 있으면 그 길이만큼 나눠서 낮춤. (여러 키 중 고를 때 사용)
+        """
+        with self.cond:
+            now = time.monotonic()
+            if self.paused_until > now: return 0.0
+            self.requests._refill(now)
+            self.tokens._refill(now)
+            left = min(self.requests.tokens / self.requests.capacity, self.tokens.tokens / self.tokens.capacity)
+            return max(0.0, left) / (1 + len(self.waiting))
+
+    def stats(self):
+        with self.cond:
+            return {
+                "queued": len(self.waiting),
+                "admitted": self.admitted,
+                "waited": self.waited,
+                "penalties": self.penalties,
+                "paused_for": max(0.0, self.paused_until - time.monotonic()),
+            }
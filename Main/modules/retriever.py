@@ -0,0 +1,229 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+# ---------------------------------------------------------
+# 질문 관련 도구만 골라내는 로컬 BM25 인덱스
+# ---------------------------------------------------------
+# 한국어는 띄어쓰기/조사 때문에 단어 단위 매칭이 약하므로
+# 공백 단위 단어 + 글자 2-gram 을 함께 색인합니다.
+INDEX_FIELDS = ['직무', '상황', '결과물', '특징_및_팁']
+_TOKEN_RE = re.compile(r"[0-9A-Za-z가-힣]+")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+VOTE_WEIGHT = 0.5   # log(1 + 순추천수) 에 곱해 BM25 점수에 더하는 가중치
+
+# 검색에서 빼는 질문 상투어 (빠른 추천 양식 문구와 그 2-gram). 거의 모든 행에 나오므로 순위에 도움이 안 되고 비용만 큼
+QUERY_STOPWORDS = {
+    "나의", "직무는", "인데", "업무", "도움되는", "도움", "움되", "되는", "ai", "도구", "도구를", "구를",
+    "추천", "추천해", "추천해줘", "천해", "해줘", "알려줘", "알려", "려줘", "필요한", "필요", "요한", "결과물", "결과", "과물",
+    "좋은", "어떤", "위한", "좀", "줘", "할", "때",
+}
+MAX_DF_RATIO = 0.5  # 이보다 많은 비율의 행에 나오는 토큰은 검색에서 제외 (idf 가 작아 순위에 거의 영향 없음)
+
+
+def tokenize(text):
+    tokens = []
+    for word in _TOKEN_RE.findall(str(text).lower()):
+        tokens.append(word)
+        if len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+class ToolRetriever:
+    """
+    도구 테이블의 행을 문서로 보는 BM25 역색인.
+    sync(df) 는 바뀐 행만 다시 색인하고(추가/수정/삭제), advance() 는 로컬 변경(투표/등록/삭제)을
+    df 전체를 다시 훑지 않고 반영합니다. query() 는 질문과 관련도 높은 행의 위치(df 기준 iloc)를
+    점수 순으로 돌려줍니다.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.postings = defaultdict(dict)   # 토큰 -> {문서키: tf}
+        self.docs = {}                      # 문서키 -> (서명, 토큰 Counter, 길이)
+        self.total_len = 0
+        self.max_tf = {}                    # 토큰 -> 한 행에서의 최대 출현 수 (삭제해도 줄이지 않는 상한)
+        self.min_len = None                 # 가장 짧은 문서 길이 (하한)
+        self.positions = {}                 # 문서키 -> 현재 df 의 행 위치
+        self.order = []                     # 행 위치 -> 문서키
+        self.votes = {}                     # 문서키 -> 순추천수
+        self.vote_order = []                # (-순추천수, 문서키) 정렬 목록 (관련 행이 부족할 때 채우는 순서)
+        self.max_bonus = 0.0                # 추천수 가산점의 상한/하한 (검색 조기 종료 판단용)
+        self.min_bonus = 0.0
+        self._fields = []
+        self._df = None
+        self.increments = 0
+
+    # --- 색인 ---
+    def _add(self, key, signature, text):
+        counts = Counter(tokenize(text))
+        length = sum(counts.values())
+        for tok, tf in counts.items():
+            self.postings[tok][key] = tf
+            if tf > self.max_tf.get(tok, 0): self.max_tf[tok] = tf
+        if self.min_len is None or length < self.min_len: self.min_len = length
+        self.docs[key] = (signature, counts, length)
+        self.total_len += length
+
+    def _remove(self, key):
+        _, counts, length = self.docs.pop(key)
+        for tok in counts:
+            bucket = self.postings.get(tok)
+            if bucket is None: continue
+            bucket.pop(key, None)
+            if not bucket: del self.postings[tok]
+        self.total_len -= length
+
+    def _bonus(self, net):
+        return VOTE_WEIGHT * math.copysign(math.log1p(abs(net)), net)
+
+    def _set_vote(self, key, net):
+        old = self.votes.get(key)
+        if old is not None:
+            i = bisect.bisect_left(self.vote_order, (-old, key))
+            if i < len(self.vote_order) and self.vote_order[i] == (-old, key): del self.vote_order[i]
+        if net is None:
+            self.votes.pop(key, None)
+            return
+        self.votes[key] = net
+        bisect.insort(self.vote_order, (-net, key))
+        self.max_bonus = max(self.max_bonus, self._bonus(net))
+        self.min_bonus = min(self.min_bonus, self._bonus(net))
+
+    def _row_text(self, row):
+        # sync() 의 astype(str) + 공백 연결과 같은 문자열 (서명이 같아 다음 sync 때 다시 색인하지 않음)
+        return " ".join(str(row.get(c, math.nan)) for c in self._fields)
+
+    def sync(self, df):
+        """df(스냅샷)가 바뀌었으면 달라진 행만 다시 색인합니다."""
+        with self.lock:
+            if df is self._df: return
+            fields = [c for c in INDEX_FIELDS if c in df.columns]
+            seen = set()
+            positions, votes, order = {}, {}, []
+            names = df['추천도구'].astype(str).tolist() if '추천도구' in df.columns else [""] * len(df)
+            texts = [""] * len(df)
+            if fields and len(df):
+                texts = df[fields[0]].astype(str).str.cat([df[c].astype(str) for c in fields[1:]], sep=" ").tolist()
+            likes = df['추천수'].tolist() if '추천수' in df.columns else [0] * len(df)
+            dislikes = df['비추천수'].tolist() if '비추천수' in df.columns else [0] * len(df)
+
+            for pos, (name, text) in enumerate(zip(names, texts)):
+                key = name if name not in seen else f"{name}#{pos}"
+                seen.add(key)
+                positions[key] = pos
+                order.append(key)
+                votes[key] = _to_int(likes[pos]) - _to_int(dislikes[pos])
+                signature = hash(text)
+                old = self.docs.get(key)
+                if old is not None and old[0] == signature: continue
+                if old is not None: self._remove(key)
+                self._add(key, signature, text)
+
+            for key in [k for k in self.docs if k not in seen]:
+                self._remove(key)
+            self.positions, self.votes, self.order = positions, votes, order
+            self.vote_order = sorted((-net, key) for key, net in votes.items())
+            bonuses = [self._bonus(v) for v in votes.values()]
+            self.max_bonus, self.min_bonus = max(bonuses, default=0.0), min(bonuses + [0.0])
+            self._fields = fields
+            self._df = df
+
+    def ready(self, df):
+        """df 기준 색인이 이미 있는지 (없으면 sync 가 전체 색인을 만들어야 함)."""
+        return df is self._df
+
+    def advance(self, old_df, new_df, action, pos=None, row=None):
+        """
+        old_df → new_df 로컬 변경 반영. action: 'append'(row 추가) / 'delete'(pos 삭제) / 'update'(pos 의 추천수, row 는 새 행).
+        색인이 old_df 기준이 아니면 아무것도 하지 않음 (다음 sync 때 차이만 재색인).
+        """
+        with self.lock:
+            if old_df is not self._df: return False
+            if action == 'append' and row is not None:
+                name, pos = str(row.get('추천도구', "")), len(self.order)
+                key = name if name not in self.docs else f"{name}#{pos}"
+                text = self._row_text(row)
+                self._add(key, hash(text), text)
+                self.order.append(key)
+                self.positions[key] = pos
+            elif action == 'delete' and pos is not None and pos < len(self.order):
+                key = self.order.pop(pos)
+                self._remove(key)
+                self._set_vote(key, None)
+                self.positions = {k: i for i, k in enumerate(self.order)}
+                row = None
+            elif action != 'update' or pos is None or pos >= len(self.order):
+                self._df = None   # 알 수 없는 변경: 다음 sync 때 전체 비교
+                return False
+            else:
+                key = self.order[pos]
+            if row is not None:
+                self._set_vote(key, _to_int(row.get('추천수')) - _to_int(row.get('비추천수')))
+            self._df = new_df
+            self.increments += 1
+            return True
+
+    # --- 검색 ---
+    def query(self, text, k):
+        """질문과 관련된 상위 k 개 행의 위치 리스트. 매칭이 없으면 추천수 순."""
+        with self.lock:
+            n_docs = len(self.docs)
+            if n_docs == 0: return []
+            avg_len = (self.total_len / n_docs) or 1.0
+            # 상투어/거의 모든 행에 나오는 토큰은 빼고, 드문 토큰(긴 목록이 짧은)부터 처리
+            terms = []
+            for tok in set(tokenize(text)) - QUERY_STOPWORDS:
+                bucket = self.postings.get(tok)
+                if not bucket or len(bucket) > MAX_DF_RATIO * n_docs: continue
+                idf = math.log(1 + (n_docs - len(bucket) + 0.5) / (len(bucket) + 0.5))
+                # 이 토큰이 한 행에 더할 수 있는 최대 점수 (최대 tf, 가장 짧은 문서 기준)
+                tf = self.max_tf.get(tok, 1)
+                upper = idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * (self.min_len or 0) / avg_len))
+                terms.append((len(bucket), idf, upper, bucket))
+            terms.sort(key=lambda t: t[0])
+            remaining = sum(t[2] for t in terms)
+
+            def vote_bonus(key):
+                return self._bonus(self.votes.get(key, 0))
+
+            scores = defaultdict(float)
+            for _, idf, upper, bucket in terms:
+                # max-score 조기 종료: 남은 토큰을 모두 더해도 새 행이 현재 k 위를 넘을 수 없으면
+                # 긴 목록 전체 대신 이미 후보인 행만 갱신
+                candidates_only = False
+                # (후보의 가산점은 하한, 새 행의 가산점은 상한으로 잡아 항상 안전한 쪽으로 판단)
+                if len(scores) >= k and len(bucket) > k:
+                    kth = heapq.nlargest(k, scores.values())[-1] + self.min_bonus
+                    candidates_only = kth > remaining + self.max_bonus
+                remaining -= upper
+                if not candidates_only: items = bucket.items()
+                elif len(scores) < len(bucket): items = [(key, bucket[key]) for key in scores if key in bucket]
+                else: items = [(key, tf) for key, tf in bucket.items() if key in scores]
+                for key, tf in items:
+                    length = self.docs[key][2]
+                    norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len))
+                    scores[key] += idf * norm
+
+            ranked = heapq.nlargest(k, scores, key=lambda key: scores[key] + vote_bonus(key))
+            if len(ranked) < k:
+                # 관련 행이 부족하면 추천수 높은 도구로 채움 (섹션 1 후보 확보)
+                # (추천수 순 목록을 앞에서부터 읽으므로 행 수와 무관)
+                picked = set(ranked)
+                for _, key in self.vote_order:
+                    if len(ranked) >= k: break
+                    if key not in picked: ranked.append(key)
+            return [self.positions[key] for key in ranked]
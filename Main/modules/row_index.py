@@ -0,0 +1,83 @@
+import threading
+from .tool_identity import tool_key
+
+# ---------------------------------------------------------
+# 도구명 → 시트 행 번호 인덱스 (투표 시 전체 시트 재작성 방지용)
+# ---------------------------------------------------------
+# 시트 1행은 헤더이므로 데이터 i번째(0부터) 행의 시트 행 번호는 i + 2 입니다.
+# 이름은 tool_key() 로 정규화해 보관합니다. ("ChatGPT" 와 "chatgpt " 는 같은 행)
+HEADER_ROWS = 1
+
+
+class ToolRowIndex:
+    """
+    '추천도구' 이름으로 시트 행 번호를 O(1)에 찾기 위한 인덱스.
+    시트에 직접 쓰는 쪽(update_db)이 삽입/삭제 때마다 함께 갱신하며,
+    행 검증에 실패하면 stale 로 표시되어 다음 호출에서 전체 재동기화됩니다.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.header = []
+        self.rows = {}       # 정규화 도구명 -> 시트 행 번호 (1-based)
+        self.n_rows = 0      # 헤더를 제외한 데이터 행 수
+        self.stale = True
+
+    # --- 전체 재구성 ---
+    def rebuild(self, header, names):
+        """헤더 목록과 '추천도구' 열 값(헤더 제외)으로 인덱스를 새로 만듭니다."""
+        with self.lock:
+            self.header = [str(h) for h in header]
+            self.rows = {}
+            for i, name in enumerate(names):
+                # 중복 이름은 기존 로직(index[0])과 같이 첫 번째 행을 사용
+                self.rows.setdefault(tool_key(name), i + HEADER_ROWS + 1)
+            self.n_rows = len(names)
+            self.stale = False
+
+    def col(self, name):
+        """컬럼명의 1-based 열 번호. 없으면 None."""
+        try:
+            return self.header.index(name) + 1
+        except ValueError:
+            return None
+
+    def find(self, name):
+        with self.lock:
+            return self.rows.get(tool_key(name))
+
+    # --- 부분 갱신 ---
+    def add(self, name, row=None):
+        """새 행이 시트 끝에 추가되었을 때 호출합니다."""
+        with self.lock:
+            if row is None:
+                row = self.n_rows + HEADER_ROWS + 1
+            self.rows.setdefault(tool_key(name), row)
+            self.n_rows = max(self.n_rows + 1, row - HEADER_ROWS)
+
+    def remove(self, row):
+        """시트에서 row 행이 삭제되었을 때, 아래 행들의 번호를 한 칸씩 당깁니다."""
+        with self.lock:
+            self.rows = {
+                n: (r - 1 if r > row else r)
+                for n, r in self.rows.items() if r != row
+            }
+            self.n_rows = max(self.n_rows - 1, 0)
+
+    def invalidate(self):
+        with self.lock:
+            self.stale = True
+
+
+def parse_appended_row(response):
+    """
+    append_row 응답의 updatedRange(예: 'Sheet1!A10:I10')에서 행 번호를 꺼냅니다.
+    형식을 알 수 없으면 None.
+    """
+    try:
+        rng = response["updates"]["updatedRange"].split("!")[-1]
+        start = rng.split(":")[0]
+        digits = "".join(ch for ch in start if ch.isdigit())
+        return int(digits) if digits else None
+    except (KeyError, TypeError, AttributeError, ValueError):
+        return None
@@ -0,0 +1,314 @@
+import argparse
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager, aclosing
+import anyio
+from google.api_core import exceptions
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from .config import (SERVICE_HOST, SERVICE_PORT, SERVICE_MAX_CONCURRENCY, SERVICE_QUEUE_TIMEOUT,
+                     SERVICE_THREADS, SERVICE_MAX_RETRIES)
+from . import ai_manager, db_manager
+from .answer_parser import parse_answer_tools, is_quick_question
+from .local_ranker import degraded_answer
+from .metrics import metrics, new_trace
+
+# ---------------------------------------------------------
+# 추천 API 서비스 (Streamlit 실행 모델과 분리된 비동기 HTTP 계층, ASGI)
+# ---------------------------------------------------------
+#   POST /recommend  {"messages": [...]} 또는 {"question": "..."}, "stream": true 이면 NDJSON 이벤트
+#                    (preview → status/reset/chunk … → done). 헤더 X-API-Key 로 개인 키 사용
+#   POST /extract    {"question", "answer"} → {"tools": [...]}   (양식 파싱, 실패 시 AI 추출)
+#   POST /vote       {"action": "like"|"dislike", "tool": {...}} → {"ok", "message"}
+#   GET  /facets     사이드바 직무/상황 목록,  GET /health (공용 키별 상태 포함),  GET /metrics (Prometheus 텍스트)
+#
+# - 답변 생성은 SERVICE_MAX_CONCURRENCY 개 자리만큼만 동시에 진행하고, 나머지는 스레드 없이
+#   이벤트 루프에서 기다립니다. SERVICE_QUEUE_TIMEOUT 초를 넘기면 503(Retry-After).
+# - 시트/모델 같은 차단 호출은 SERVICE_THREADS 개로 제한된 작업 스레드에서 실행합니다.
+# - 429 재시도 대기는 anyio.sleep 이라 대기 중인 요청이 스레드를 잡고 있지 않습니다.
+# - 스냅샷/답변 캐시/single-flight/속도 제한/투표 저널은 ai_manager, db_manager 의 프로세스 공용 객체를 그대로 씁니다.
+DEFAULT_LOG_LABEL = "직접/기타"
+
+
+class Overloaded(Exception):
+    """답변 생성 차례를 기다리다 시간 초과."""
+
+
+class RecommendService:
+    def __init__(self, max_concurrency=SERVICE_MAX_CONCURRENCY, queue_timeout=SERVICE_QUEUE_TIMEOUT,
+                 threads=SERVICE_THREADS, max_retries=SERVICE_MAX_RETRIES):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.threads = threads
+        self.max_retries = max_retries
+        self.slots = None       # 이벤트 루프 안에서 start() 로 생성
+        self.limiter = None
+        self.inflight = 0       # 아래 카운터는 이벤트 루프에서만 고침
+        self.waiting = 0
+        self.served = 0
+        self.rejected = 0
+        self._facets = (None, None)   # (스냅샷 버전, 응답 본문)
+
+    def start(self):
+        self.slots = anyio.Semaphore(self.max_concurrency)
+        self.limiter = anyio.CapacityLimiter(self.threads)
+
+    async def run(self, fn, *args):
+        """차단 함수를 제한된 작업 스레드에서 실행 (contextvars 는 그대로 전달됨: 추적 ID, 요청 키)."""
+        return await anyio.to_thread.run_sync(fn, *args, limiter=self.limiter)
+
+    @asynccontextmanager
+    async def slot(self):
+        self.waiting += 1
+        try:
+            with anyio.move_on_after(self.queue_timeout) as scope:
+                await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        if scope.cancelled_caught:
+            self.rejected += 1
+            metrics.count("service.rejected")
+            raise Overloaded(f"{self.queue_timeout}초 안에 차례가 오지 않음")
+        self.inflight += 1
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            self.slots.release()
+
+    # --- 답변 ---
+    async def _stream(self, messages, snap, facets, api_key):
+        """stream_ai_response(동기 제너레이터)를 작업 스레드에서 한 청크씩 꺼내 비동기로 넘깁니다."""
+        cancel = threading.Event()
+        # 빠른 추천 첫 질문은 미리 만든 답변과 같은 (직무, 상황) 도구 목록 해시로 캐시를 찾음
+        version = ai_manager.answer_version(messages, facets, snap.version)
+        chunks = ai_manager.stream_ai_response(messages, snap.df, cancel_event=cancel, db_version=version)
+
+        def step():
+            with ai_manager.use_api_key(api_key):
+                return next(chunks, None)
+        try:
+            while True:
+                chunk = await self.run(step)
+                if chunk is None: return
+                yield chunk
+        finally:
+            # 클라이언트가 끊겼거나 재시도로 넘어가면 모델 스트림도 닫음
+            cancel.set()
+            with anyio.CancelScope(shield=True):
+                await self.run(chunks.close)
+
+    async def answer_events(self, messages, api_key=None, log_labels=None):
+        """추천 한 턴의 이벤트. preview → (status | reset | chunk)* → done"""
+        question = messages[-1]["content"]
+        snap = await self.run(db_manager.get_tools_snapshot)
+        facets = await self.run(db_manager.get_facets, snap)
+        ai_manager.warm_quick_answers(snap.df, snap.version, facets)
+        local = await self.run(ai_manager.rank_local_tools, question, snap.df, facets.job_names())
+        yield {"type": "preview", "tools": local}
+
+        text, overloaded = None, False
+        with metrics.timer("service.answer"):
+            try:
+                async with self.slot():
+                    for attempt in range(self.max_retries):
+                        parts = []
+                        try:
+                            async with aclosing(self._stream(messages, snap, facets, api_key)) as chunks:
+                                async for chunk in chunks:
+                                    parts.append(chunk)
+                                    yield {"type": "chunk", "text": chunk}
+                            text = "".join(parts)
+                            break
+                        except exceptions.ResourceExhausted:
+                            retrying = attempt < self.max_retries - 1
+                            ai_manager.record_model_error("service", "ResourceExhausted", retrying)
+                            if parts: yield {"type": "reset"}
+                            if not retrying: break
+                            with ai_manager.use_api_key(api_key):
+                                delay = ai_manager.rate_limited_backoff(attempt)
+                            yield {"type": "status", "label": f"⏳ 사용량이 많아 잠시 쉬고 있습니다... "
+                                                              f"{delay:.0f}초 ({attempt + 1}/{self.max_retries})"}
+                            await anyio.sleep(delay)
+                        except Exception as e:
+                            ai_manager.record_model_error("service", type(e).__name__, False)
+                            text = f"❌ 오류가 발생했습니다: {str(e)}"
+                            break
+            except Overloaded:
+                overloaded = True
+                text = "❌ 요청이 많아 답변을 시작하지 못했습니다. 잠시 후 다시 질문해 주세요."
+        if text is None: text = "❌ 재시도 횟수를 초과했습니다. 잠시 후 다시 질문해 주세요."
+
+        # Main.py 와 같은 규칙: 오류면 로컬 DB 추천으로 대체 답변, 정상 답변만 로그
+        degraded = text.startswith(("❌", "⚠️")) and bool(local)
+        if degraded: text = degraded_answer(local, text)
+        if log_labels and not text.startswith("❌") and not degraded:
+            db_manager.save_log(*log_labels, question, text)
+        self.served += 1
+        # 자유 질문의 도구는 직무/상황을 유추해야 하므로 /extract(AI 추출)로 받음
+        tools = parse_answer_tools(question, text) if is_quick_question(question) else []
+        yield {"type": "done", "answer": text, "tools": tools,
+               "degraded": degraded, "overloaded": overloaded, "version": snap.version}
+
+    async def extract(self, question, answer, api_key=None):
+        # 빠른 추천 질문만 로컬 추출 (자유 질문은 직무/상황을 AI 가 유추, 실패하면 로컬 결과)
+        tools = parse_answer_tools(question, answer)
+        if tools and is_quick_question(question): return tools
+
+        def fallback():
+            with ai_manager.use_api_key(api_key):
+                return ai_manager.parse_tools_ai(question, answer)
+        async with self.slot():
+            return await self.run(fallback) or tools
+
+    async def facets(self):
+        snap = await self.run(db_manager.get_tools_snapshot)
+        version, body = self._facets
+        if version == snap.version: return body
+        index = await self.run(db_manager.get_facets, snap)
+        jobs = list(index.job_names())
+        body = {"version": snap.version, "source": snap.source, "rows": len(snap.df), "jobs": jobs,
+                "situations": {job: index.situation_options(job) for job in jobs}}
+        self._facets = (snap.version, body)
+        return body
+
+    def stats(self):
+        return {"inflight": self.inflight, "waiting": self.waiting, "served": self.served,
+                "rejected": self.rejected, "max_concurrency": self.max_concurrency}
+
+
+# ---------------------------------------------------------
+# HTTP 엔드포인트
+# ---------------------------------------------------------
+def _bad_request(message):
+    return JSONResponse({"error": message}, status_code=400)
+
+
+async def _json_body(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def _messages(body):
+    """{"messages": [{"role", "content"}, ...]} 또는 {"question": "..."} → 마지막이 사용자 질문인 메시지 목록."""
+    messages = body.get("messages")
+    if messages is None and body.get("question"):
+        messages = [{"role": "user", "content": str(body["question"])}]
+    if not isinstance(messages, list) or not messages: return None
+    if not all(isinstance(m, dict) and m.get("role") in ("user", "assistant") and isinstance(m.get("content"), str)
+               for m in messages): return None
+    return messages if messages[-1]["role"] == "user" else None
+
+
+async def recommend(request):
+    body = await _json_body(request)
+    messages = _messages(body) if body is not None else None
+    if messages is None: return _bad_request("messages(마지막은 user) 또는 question 이 필요합니다.")
+    new_trace()
+    metrics.count("service.request", route="recommend")
+    log_labels = None
+    if body.get("log", True):
+        log_labels = (body.get("job") or DEFAULT_LOG_LABEL, body.get("situation") or DEFAULT_LOG_LABEL)
+    events = request.app.state.service.answer_events(messages, request.headers.get("X-API-Key"), log_labels)
+
+    if body.get("stream"):
+        async def ndjson():
+            # 클라이언트가 끊기면 답변 생성(모델 스트림)까지 함께 닫힘
+            async with aclosing(events):
+                async for event in events:
+                    yield json.dumps(event, ensure_ascii=False) + "\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    done = None
+    async for event in events:
+        if event["type"] == "done": done = event
+    if done["overloaded"]:
+        return JSONResponse(done, status_code=503, headers={"Retry-After": str(SERVICE_QUEUE_TIMEOUT)})
+    return JSONResponse(done)
+
+
+async def extract(request):
+    body = await _json_body(request)
+    if body is None or not isinstance(body.get("answer"), str): return _bad_request("answer 가 필요합니다.")
+    new_trace()
+    metrics.count("service.request", route="extract")
+    try:
+        tools = await request.app.state.service.extract(str(body.get("question", "")), body["answer"],
+                                                        request.headers.get("X-API-Key"))
+    except Overloaded as e:
+        return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": str(SERVICE_QUEUE_TIMEOUT)})
+    return JSONResponse({"tools": tools})
+
+
+async def vote(request):
+    body = await _json_body(request)
+    if body is None or body.get("action") not in ("like", "dislike") or not isinstance(body.get("tool"), dict):
+        return _bad_request("action(like/dislike) 과 tool 이 필요합니다.")
+    new_trace()
+    metrics.count("service.request", route="vote")
+    ok, message = await request.app.state.service.run(db_manager.submit_vote, body["action"], dict(body["tool"]))
+    return JSONResponse({"ok": ok, "message": message})
+
+
+async def facets(request):
+    metrics.count("service.request", route="facets")
+    return JSONResponse(await request.app.state.service.facets())
+
+
+async def health(request):
+    service = request.app.state.service
+    # 공용 키별 상태 (키 원문 대신 해시)
+    return JSONResponse(dict(service.stats(), ok=True, keys=ai_manager.get_key_pool().stats()))
+
+
+async def metrics_text(request):
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+def create_app(service=None):
+    service = service or RecommendService()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        service.start()
+        yield
+
+    app = Starlette(routes=[
+        Route("/recommend", recommend, methods=["POST"]),
+        Route("/extract", extract, methods=["POST"]),
+        Route("/vote", vote, methods=["POST"]),
+        Route("/facets", facets, methods=["GET"]),
+        Route("/health", health, methods=["GET"]),
+        Route("/metrics", metrics_text, methods=["GET"]),
+    ], lifespan=lifespan)
+    app.state.service = service
+    return app
+
+
+# ---------------------------------------------------------
+# CLI: 서비스 실행
+#   (Main 폴더에서) python -m modules.service   # 시트/Gemini 사용 (.streamlit/secrets.toml)
+#   가짜 시트/모델(네트워크 없음)로 띄우려면 python -m benchmarks.fake_service --rows 2000
+# ---------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Job-Fit 추천 API 서비스 (ASGI)")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--concurrency", type=int, default=SERVICE_MAX_CONCURRENCY, help="동시 답변 생성 수")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    # Streamlit 밖에서 cache_resource 를 쓸 때마다 나오는 bare mode 경고 끄기
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    print(f"🚀 추천 API 서비스: http://{args.host}:{args.port}")
+    uvicorn.run(create_app(RecommendService(max_concurrency=args.concurrency)),
+                host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import json
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .config import SERVICE_URL, SERVICE_CLIENT_POOL, SERVICE_CLIENT_TIMEOUT, SERVICE_MAX_RETRIES
+
+# ---------------------------------------------------------
+# 추천 API 서비스 클라이언트 (Main.py 를 얇은 화면으로 쓸 때)
+# ---------------------------------------------------------
+# config.SERVICE_URL 이 설정되면 Main.py 는 스냅샷/모델/투표를 직접 다루지 않고 이 클라이언트로 서비스(modules/service.py)를 부릅니다.
+# 연결은 프로세스 공용 세션의 커넥션 풀(SERVICE_CLIENT_POOL 개)을 재사용합니다.
+# 조회(GET)만 연결 오류/503 에 자동 재시도하고, 답변/투표(POST)는 중복 실행을 피하려고 재시도하지 않습니다.
+MANUAL_OPTION = "직접 입력"
+
+
+class ServiceError(Exception):
+    """서비스 호출 실패 (연결 오류, 4xx/5xx)."""
+
+
+class RemoteFacets:
+    """서비스 /facets 응답을 FacetIndex 와 같은 모양으로 읽기."""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.version = payload.get("version")
+        self.source = payload.get("source", "loader")
+        self.rows = payload.get("rows", 0)
+        self._jobs = list(payload.get("jobs", []))
+        self._situations = payload.get("situations", {})
+
+    @classmethod
+    def empty(cls):
+        return cls({"rows": 0})
+
+    def job_names(self):
+        return self._jobs
+
+    def job_options(self):
+        return [MANUAL_OPTION] + self._jobs
+
+    def situation_options(self, job):
+        return self._situations.get(job, [])
+
+
+class ServiceClient:
+    def __init__(self, base_url, pool_size=SERVICE_CLIENT_POOL, timeout=SERVICE_CLIENT_TIMEOUT,
+                 max_retries=SERVICE_MAX_RETRIES):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        retry = Retry(total=max_retries, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset({"GET"}), respect_retry_after_header=False,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _request(self, method, path, api_key=None, **kwargs):
+        headers = {"X-API-Key": api_key} if api_key else {}
+        try:
+            response = self.session.request(method, self.base_url + path, headers=headers,
+                                            timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise ServiceError(f"서비스 연결 실패: {e}") from e
+        if response.status_code >= 400 and response.status_code != 503:
+            raise ServiceError(f"서비스 오류 {response.status_code}: {response.text[:200]}")
+        return response
+
+    def health(self):
+        return self._request("GET", "/health").json()
+
+    def facets(self):
+        return RemoteFacets(self._request("GET", "/facets").json())
+
+    def recommend(self, messages, api_key=None, job=None, situation=None):
+        """답변 한 번에 받기. {"answer", "tools", "degraded", "overloaded", "version"}"""
+        body = {"messages": messages, "job": job, "situation": situation}
+        return self._request("POST", "/recommend", api_key, json=body).json()
+
+    def recommend_stream(self, messages, api_key=None, job=None, situation=None):
+        """답변 이벤트(preview, status, reset, chunk, done)를 받는 대로 yield."""
+        body = {"messages": messages, "job": job, "situation": situation, "stream": True}
+        response = self._request("POST", "/recommend", api_key, json=body, stream=True)
+        with response:
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if line: yield json.loads(line)
+            except requests.RequestException as e:
+                raise ServiceError(f"답변 수신 중 연결 끊김: {e}") from e
+
+    def extract(self, question, answer, api_key=None):
+        response = self._request("POST", "/extract", api_key, json={"question": question, "answer": answer})
+        return response.json().get("tools", []) if response.status_code == 200 else []
+
+    def vote(self, action_type, tool_data):
+        """db_manager.submit_vote 와 같은 (성공 여부, 메시지)."""
+        response = self._request("POST", "/vote", json={"action": action_type, "tool": tool_data})
+        if response.status_code != 200: return False, "⚠️ 투표가 몰려 잠시 후 다시 시도해 주세요."
+        body = response.json()
+        return body["ok"], body["message"]
+
+
+# 프로세스 공용 클라이언트 (모든 세션이 커넥션 풀 공유)
+@st.cache_resource
+def get_service_client():
+    return ServiceClient(SERVICE_URL)
@@ -0,0 +1,119 @@
+import threading
+from .storage import TOOL_COLUMNS
+from .tool_identity import tool_key
+
+# ---------------------------------------------------------
+# SQLite ↔ 구글 시트 주기적 동기화 (SQLite 저장소 사용 시, 선택 사항)
+# ---------------------------------------------------------
+# 기본 방향은 SQLite → 시트(미러)입니다. 다만 시트를 사람이 직접 고친 흔적이 있으면
+# (마지막 반영 이후 시트 수정 시각이 바뀜) 시트를 먼저 가져오고,
+# 그 사이 SQLite 에 쌓인 투표 증감분을 다시 더한 뒤 미러링합니다.
+# 미러링은 마지막으로 시트에 있던 행과 비교해 바뀐 행만 올립니다. (도구는 tool_key 로 맞춤)
+# 같은 도구가 여러 행이면 행을 특정할 수 없으므로 그때만 시트 전체를 다시 씁니다.
+_NAME = TOOL_COLUMNS.index('추천도구')
+_COUNT = TOOL_COLUMNS.index('추천수')
+
+
+def _rows(df):
+    """도구 키 → 행 값(문자열, TOOL_COLUMNS 순서). 같은 키가 여러 행이면 None."""
+    values = df.reindex(columns=TOOL_COLUMNS, fill_value="").astype(str).values.tolist()
+    rows = {tool_key(v[_NAME]): tuple(v) for v in values}
+    return rows if len(rows) == len(values) else None
+
+
+class SheetSync:
+    def __init__(self, local, sheet, interval=60.0, on_pull=None):
+        """
+        local: SQLiteStorage, sheet: SheetsStorage
+        on_pull(): 시트 내용을 가져온 뒤 호출 (스냅샷 무효화 등)
+        """
+        self.local = local
+        self.sheet = sheet
+        self.interval = interval
+        self.on_pull = on_pull
+        self.lock = threading.Lock()
+        self.pushed_revision = None     # 마지막으로 시트에 올린 SQLite revision
+        self.pushed_rows = None         # 그때 시트에 있는 행 {도구 키: 행 값} (증분 반영/증감분 계산용)
+        self.sheet_stamp = None         # 그때의 시트 수정 시각
+        self.pushes = 0
+        self.rows_pushed = 0
+        self.pulls = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self.thread = None
+
+    # --- 한 번 동기화 ---
+    def _pull(self):
+        df = self.sheet.load_tools()
+        sheet_rows = _rows(df)
+        if self.pushed_rows:
+            # 시트 값 + (현재 SQLite 값 - 마지막 반영 값) : 반영 이후의 투표를 잃지 않도록
+            local = self.local.load_tools()
+            local_counts = {tool_key(n): int(c) for n, c in zip(local['추천도구'], local['추천수'])}
+            drift = {key: local_counts[key] - int(row[_COUNT])
+                     for key, row in self.pushed_rows.items() if key in local_counts}
+            df['추천수'] = df['추천수'] + df['추천도구'].map(lambda n: drift.get(tool_key(n), 0)).astype(int)
+        self.local.replace_tools(df)
+        # 지금 시트에 있는 행이 다음 반영의 비교 기준 (증감분이 더해진 행만 올라감)
+        self.pushed_rows = sheet_rows
+        self.pulls += 1
+        if self.on_pull is not None: self.on_pull()
+
+    def _push(self):
+        # revision 을 먼저 읽음: 읽는 사이 들어온 투표는 다음 주기에 다시 올라감
+        revision = self.local.revision()
+        df = self.local.load_tools()
+        rows = _rows(df)
+        if self.pushed_rows is None:
+            # 처음: 시트에 이미 있는 행과 비교 (읽기 한 번, 같은 행은 다시 쓰지 않음)
+            self.pushed_rows = _rows(self.sheet.load_tools())
+        if rows is None or self.pushed_rows is None:
+            self.sheet.replace_tools(df)
+            self.rows_pushed += len(df)
+        else:
+            upserts = [dict(zip(TOOL_COLUMNS, row)) for key, row in rows.items() if self.pushed_rows.get(key) != row]
+            deletes = [row[_NAME] for key, row in self.pushed_rows.items() if key not in rows]
+            if upserts or deletes: self.sheet.apply_changes(upserts, deletes)
+            self.rows_pushed += len(upserts) + len(deletes)
+        self.pushed_revision = revision
+        self.pushed_rows = rows
+        self.pushes += 1
+
+    def sync_once(self):
+        """반환: "pull" / "push" / None (변경 없음)"""
+        with self.lock:
+            stamp = self.sheet.last_update_time()
+            action = None
+            first = self.pushed_revision is None
+            if (first and self.local.load_tools().empty) or (not first and stamp != self.sheet_stamp):
+                # 처음인데 SQLite 가 비어 있거나, 시트를 누군가 직접 고침 → 시트 가져오기
+                self._pull()
+                action = "pull"
+            if action == "pull" or self.local.revision() != self.pushed_revision:
+                self._push()
+                action = action or "push"
+                self.sheet_stamp = self.sheet.last_update_time()
+            return action
+
+    # --- 백그라운드 ---
+    def _run(self):
+        while True:
+            try:
+                self.sync_once()
+            except Exception as e:
+                self.errors += 1
+                print(f"💥 [시트 동기화 실패] {e}")
+            if self._stop.wait(self.interval): return
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="sheet-sync", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=10.0):
+        self._stop.set()
+        if self.thread is not None: self.thread.join(timeout)
+
+    def stats(self):
+        return {"pushes": self.pushes, "rows_pushed": self.rows_pushed, "pulls": self.pulls,
+                "errors": self.errors, "revision": self.pushed_revision}
@@ -0,0 +1,195 @@
+import pandas as pd
+from .row_index import ToolRowIndex, parse_appended_row
+from .storage import ToolStorage, coerce_counts, empty_tools
+from .tool_identity import same_tool
+from .metrics import metrics
+
+# ---------------------------------------------------------
+# 구글 시트 저장소 (시트 0: 도구 DB, 시트 1: 대화 로그)
+# ---------------------------------------------------------
+# 투표는 행 인덱스로 대상 행만 찾아 셀 하나만 고칩니다. (전체 시트 재작성 X)
+
+
+def _col_letter(n):
+    """1-based 열 번호 → A1 표기 열 문자 (1 → A, 27 → AA)."""
+    letters = ""
+    while n:
+        n, r = divmod(n - 1, 26)
+        letters = chr(65 + r) + letters
+    return letters
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+class SheetsStorage(ToolStorage):
+    """client_fn() 은 gspread 클라이언트(또는 None)를 돌려주는 함수입니다."""
+
+    def __init__(self, client_fn, sheet_url, index=None):
+        self.client_fn = client_fn
+        self.sheet_url = sheet_url
+        self.index = index or ToolRowIndex()
+
+    def _spreadsheet(self):
+        client = self.client_fn()
+        if client is None: raise ConnectionError("구글 시트에 연결할 수 없습니다.")
+        return client.open_by_url(self.sheet_url)
+
+    def _tools_sheet(self):
+        return self._spreadsheet().get_worksheet(0)
+
+    # --- 읽기 ---
+    @metrics.timed("storage.read", backend="sheets", op="load_tools")
+    def load_tools(self):
+        data = self._tools_sheet().get_all_records()
+        df = pd.DataFrame(data) if data else empty_tools()
+        return coerce_counts(df)
+
+    def last_update_time(self):
+        """시트 파일의 마지막 수정 시각 (Drive 메타데이터)."""
+        return self._spreadsheet().get_lastUpdateTime()
+
+    @metrics.timed("storage.read", backend="sheets", op="revision")
+    def revision(self):
+        # 전체 레코드를 읽지 않고 변경 여부만 확인 (사람이 직접 고친 경우 포함)
+        return self.last_update_time()
+
+    # --- 행 인덱스 ---
+    def _sync_index(self, ws):
+        # 전체 레코드 대신 헤더 + '추천도구' 한 열만 읽어 인덱스 재구성
+        header = ws.row_values(1)
+        if '추천도구' not in header: raise ValueError("도구 시트에 '추천도구' 열이 없습니다. (1행 헤더 확인)")
+        name_col = header.index('추천도구') + 1
+        self.index.rebuild(header, ws.col_values(name_col)[1:])
+
+    def _col(self, name):
+        """인덱스 헤더에서 열 번호. 열이 없으면 엉뚱한 칸을 고치지 않도록 바로 실패합니다."""
+        col = self.index.col(name)
+        if col is None: raise ValueError(f"도구 시트에 '{name}' 열이 없습니다. (1행 헤더 확인)")
+        return col
+
+    def _locate_row(self, ws, target):
+        """
+        인덱스로 도구의 시트 행을 찾고, 해당 한 행만 읽어 검증합니다.
+        인덱스가 어긋나 있으면(다른 곳에서 시트 수정) 한 번만 전체 재동기화 후 다시 찾습니다.
+        반환: (행 번호, 행 값 리스트) / 없으면 (None, None)
+        """
+        index = self.index
+        synced = False
+        for _ in range(2):
+            if index.stale:
+                self._sync_index(ws)
+                synced = True
+            row = index.find(target)
+            if row is not None:
+                values = ws.row_values(row)
+                name_col = self._col('추천도구')
+                if len(values) >= name_col and same_tool(values[name_col - 1], target):
+                    return row, values
+            elif synced:
+                return None, None
+            index.invalidate()
+        return None, None
+
+    # --- 쓰기 ---
+    @metrics.timed("storage.write", backend="sheets", op="vote")
+    def vote(self, name, delta, delete_at=None):
+        ws = self._tools_sheet()
+        with self.index.lock:
+            row, values = self._locate_row(ws, name)
+            if row is None: return None
+            count_col = self._col('추천수')
+            score = _to_int(values[count_col - 1] if len(values) >= count_col else 0) + delta
+            if delete_at is not None and score <= delete_at:
+                ws.delete_rows(row)
+                self.index.remove(row)
+                return score, True
+            ws.update_cell(row, count_col, score)
+            return score, False
+
+    @metrics.timed("storage.read", backend="sheets", op="read_score")
+    def read_score(self, name):
+        ws = self._tools_sheet()
+        with self.index.lock:
+            row, values = self._locate_row(ws, name)
+            if row is None: return None
+            count_col = self._col('추천수')
+            raw = values[count_col - 1] if len(values) >= count_col else ""
+            return _to_int(raw), (row, raw)
+
+    @metrics.timed("storage.write", backend="sheets", op="write_score")
+    def write_score(self, name, token, score, delete=False):
+        row, raw = token
+        ws = self._tools_sheet()
+        with self.index.lock:
+            # 쓰기 직전 그 한 행을 다시 읽어 이름/점수가 그대로인지 확인 (다른 곳에서 고쳤으면 충돌)
+            values = ws.row_values(row)
+            name_col, count_col = self._col('추천도구'), self._col('추천수')
+            current = values[count_col - 1] if len(values) >= count_col else ""
+            if len(values) < name_col or not same_tool(values[name_col - 1], name) or current != raw:
+                self.index.invalidate()
+                return False
+            if delete:
+                ws.delete_rows(row)
+                self.index.remove(row)
+            else:
+                ws.update_cell(row, count_col, score)
+            return True
+
+    @metrics.timed("storage.write", backend="sheets", op="insert_tool")
+    def insert_tool(self, row):
+        ws = self._tools_sheet()
+        name = row.get('추천도구')
+        with self.index.lock:
+            if self.index.stale: self._sync_index(ws)
+            if self.index.find(name) is not None: return False
+            # 시트 끝에 한 행만 추가 (헤더 순서대로)
+            resp = ws.append_row([str(row.get(h, "")) for h in self.index.header])
+            self.index.add(name, parse_appended_row(resp))
+            return True
+
+    @metrics.timed("storage.write", backend="sheets", op="replace_tools")
+    def replace_tools(self, df):
+        """도구 시트 전체를 df 로 덮어씁니다. (중복 병합, 증분 반영을 못 할 때의 미러링용)"""
+        ws = self._tools_sheet()
+        out = df.astype(str)
+        with self.index.lock:
+            ws.clear()
+            ws.update(range_name='A1', values=[out.columns.tolist()] + out.values.tolist())
+            self.index.invalidate()
+
+    @metrics.timed("storage.write", backend="sheets", op="apply_changes")
+    def apply_changes(self, upserts, deletes=()):
+        """
+        바뀐 행만 시트에 반영합니다. (SQLite → 시트 증분 미러링용)
+        upserts: 도구 행 dict 목록. 같은 도구(tool_key)의 행을 덮어쓰고, 없으면 끝에 추가
+        deletes: 지울 도구 이름 목록
+        """
+        ws = self._tools_sheet()
+        with self.index.lock:
+            # 행 번호는 헤더 + '추천도구' 열만 다시 읽어 맞춤 (전체 레코드는 읽지 않음)
+            self._sync_index(ws)
+            header = self.index.header
+            last = _col_letter(len(header))
+            updates, appends = [], []
+            for row in upserts:
+                values = [str(row.get(h, "")) for h in header]
+                r = self.index.find(row.get('추천도구'))
+                if r is None: appends.append(values)
+                else: updates.append({"range": f"A{r}:{last}{r}", "values": [values]})
+            if updates: ws.batch_update(updates)
+            # 아래 행부터 지워야 남은 행 번호가 바뀌지 않음
+            for r in sorted({self.index.find(n) for n in deletes} - {None}, reverse=True):
+                ws.delete_rows(r)
+            if appends: ws.append_rows(appends)
+            self.index.invalidate()
+
+    def open_log_table(self):
+        return self._spreadsheet().get_worksheet(1)
+
+    def invalidate(self):
+        self.index.invalidate()
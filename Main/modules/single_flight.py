@@ -0,0 +1,74 @@
+import threading
+
+# ---------------------------------------------------------
+# 동일 요청 합치기 (single-flight)
+# ---------------------------------------------------------
+# 같은 키의 요청이 이미 진행 중이면 새로 호출하지 않고 그 결과(또는 오류)를 함께 받습니다.
+
+
+class FlightAbandoned(Exception):
+    """선행 요청이 결과 없이 끝남(취소 등). 기다리던 쪽은 직접 다시 호출해야 합니다."""
+
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+    def wait(self, timeout=None):
+        if not self.done.wait(timeout): raise FlightAbandoned("선행 요청 대기 시간 초과")
+        if self.error is not None: raise self.error
+        return self.result
+
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def begin(self, key):
+        """(flight, 선행 여부). 선행이면 직접 호출한 뒤 반드시 finish() 해야 합니다."""
+        with self.lock:
+            self.calls += 1
+            flight = self.flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self.coalesced += 1
+                return flight, False
+            flight = self.flights[key] = Flight()
+            self.executions += 1
+            return flight, True
+
+    def finish(self, key, flight, result=None, error=None):
+        with self.lock:
+            if self.flights.get(key) is flight: del self.flights[key]
+        flight.result, flight.error = result, error
+        flight.done.set()
+
+    def do(self, key, fn, timeout=None):
+        """fn() 을 키당 한 번만 실행하고, 동시에 들어온 같은 키의 호출은 결과를 공유합니다."""
+        flight, leader = self.begin(key)
+        if not leader: return flight.wait(timeout)
+        try:
+            result = fn()
+        except BaseException as e:
+            # 다른 스레드에 전달할 수 없는 중단(rerun 등)은 '포기'로 알림
+            shared = e if isinstance(e, Exception) else FlightAbandoned(repr(e))
+            self.finish(key, flight, error=shared)
+            raise
+        self.finish(key, flight, result=result)
+        return result
+
+    def stats(self):
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self.flights),
+            }
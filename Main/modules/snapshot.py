@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import namedtuple
+
+# ---------------------------------------------------------
+# 프로세스 공용 도구 DB 스냅샷 (세션별 DataFrame 복사본 대체)
+# ---------------------------------------------------------
+# df 는 모든 세션이 공유하므로 읽기 전용으로만 사용합니다. (수정은 store.update 로)
+# source: "loader"(원본에서 읽음/검증됨) / "disk"(디스크 사본, 검증 전) / "local"(투표 등 로컬 변경 반영)
+Snapshot = namedtuple("Snapshot", ["version", "df", "loaded_at", "source"], defaults=("loader",))
+
+
+class ToolSnapshotStore:
+    """
+    loader() 로 읽어 온 도구 테이블을 버전 번호와 함께 보관합니다.
+    - ttl 초가 지나면 다음 get() 에서 다시 읽어 옵니다.
+    - invalidate() 후에는 다음 get() 에서 즉시 다시 읽어 옵니다.
+    - update(fn) 은 최신 df 에 fn 을 적용한 결과를 새 버전으로 게시합니다. (재조회 없음)
+    로더가 빈 결과(연결 실패)를 돌려주면 기존 스냅샷을 유지합니다.
+
+    stamp_fn() 을 주면 (원본의 수정 시각/리비전을 싸게 읽는 함수)
+    - 스냅샷이 이미 있으면 만료돼도 기존 것을 바로 돌려주고 백그라운드에서 검증합니다.
+      stamp 가 그대로면 재조회 없이 유효 기간만 연장하고, 바뀌었을 때만 새로 읽어 교체합니다.
+    disk(DiskSnapshotCache) 를 주면 새로 읽을 때마다 저장해 두고,
+    프로세스 시작 시 첫 get() 은 디스크 사본으로 바로 응답합니다. (검증은 백그라운드)
+    """
+
+    def __init__(self, loader, ttl=300, stamp_fn=None, disk=None):
+        self.loader = loader
+        self.ttl = ttl
+        self.stamp_fn = stamp_fn
+        self.disk = disk
+        self.lock = threading.RLock()
+        self.version = 0
+        self.stamp = None
+        self._snapshot = None
+        self._expired = True
+        self._forced = False
+        self._refreshing = False
+
+    def _fresh(self):
+        if self._snapshot is None or self._expired: return False
+        return (time.time() - self._snapshot.loaded_at) < self.ttl
+
+    def _has_data(self):
+        return self._snapshot is not None and not self._snapshot.df.empty
+
+    def _read_stamp(self):
+        if self.stamp_fn is None: return None
+        try:
+            return self.stamp_fn()
+        except Exception as e:
+            print(f"💥 [스냅샷 리비전 확인 실패] {e}")
+            return None
+
+    def _touch(self, verified=False):
+        # 같은 데이터로 유효 기간만 연장 (verified: 원본과 같음을 확인함)
+        self._snapshot = self._snapshot._replace(loaded_at=time.time())
+        if verified and self._snapshot.source == "disk":
+            self._snapshot = self._snapshot._replace(source="loader")
+        self._expired = False
+
+    def _save(self, df, stamp):
+        if self.disk is None or df.empty: return
+        try:
+            self.disk.save(df, stamp)
+        except Exception as e:
+            print(f"💥 [스냅샷 디스크 저장 실패] {e}")
+
+    def _load_disk(self):
+        cached = self.disk.load() if self.disk is not None else None
+        if cached is None or cached[0].empty: return False
+        df, stamp, _ = cached
+        self.stamp = stamp
+        self._publish(df, source="disk")
+        self._expired = True   # 아직 원본과 대조 전
+        return True
+
+    def get(self):
+        snap = self._snapshot
+        if snap is not None and self._fresh(): return snap
+
+        with self.lock:
+            # 다른 스레드가 먼저 갱신했는지 다시 확인
+            if self._fresh(): return self._snapshot
+            if self._snapshot is None: self._load_disk()
+            if self.stamp_fn is not None and self._has_data():
+                # 있는 데이터로 바로 응답하고 검증/갱신은 백그라운드에서
+                self._revalidate_async()
+                return self._snapshot
+            return self._reload()
+
+    def _reload(self):
+        stamp = self._read_stamp()
+        df = self.loader()
+        if df.empty and self._has_data():
+            # 일시적 로드 실패: 기존 데이터로 버티고 다음 TTL 에 재시도
+            self._touch()
+            return self._snapshot
+        snap = self._publish(df)
+        self.stamp, self._forced = stamp, False
+        # 처음부터 로드에 실패했다면 다음 요청에서 바로 다시 시도
+        self._expired = df.empty
+        self._save(df, stamp)
+        return snap
+
+    def _revalidate_async(self):
+        if self._refreshing: return
+        self._refreshing = True
+        threading.Thread(target=self._revalidate, name="snapshot-revalidate", daemon=True).start()
+
+    def _revalidate(self):
+        try:
+            stamp = self._read_stamp()
+            with self.lock:
+                if not self._forced and stamp is not None and stamp == self.stamp:
+                    self._touch(verified=True)
+                    return
+            df = self.loader()   # 느린 원본 읽기는 잠금 밖에서
+            with self.lock:
+                if df.empty:
+                    if self._has_data(): self._touch()
+                    return
+                self._publish(df)
+                self.stamp, self._forced = stamp, False
+            self._save(df, stamp)
+        except Exception as e:
+            print(f"💥 [스냅샷 검증 실패] {e}")
+            with self.lock:
+                if self._has_data(): self._touch()
+        finally:
+            self._refreshing = False
+
+    def _publish(self, df, source="loader"):
+        self.version += 1
+        self._snapshot = Snapshot(self.version, df, time.time(), source)
+        self._expired = False
+        return self._snapshot
+
+    def publish(self, df):
+        with self.lock:
+            return self._publish(df, source="local")
+
+    def update(self, fn):
+        """최신 스냅샷의 df 에 fn(df) -> new_df 를 적용해 새 버전으로 게시합니다."""
+        with self.lock:
+            return self._publish(fn(self.get().df), source="local")
+
+    def invalidate(self):
+        """다음 get() 에서 stamp 와 상관없이 원본을 다시 읽습니다."""
+        with self.lock:
+            self._expired = True
+            self._forced = True
+
+    def wait_refresh(self, timeout=30.0):
+        """진행 중인 백그라운드 검증이 끝날 때까지 대기 (벤치마크/테스트용)."""
+        deadline = time.monotonic() + timeout
+        while self._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._refreshing
@@ -0,0 +1,213 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+import pandas as pd
+from .storage import ToolStorage, TOOL_COLUMNS, COUNT_COLUMNS, LOG_COLUMNS, coerce_counts
+from .tool_identity import KEY_VERSION, tool_key
+from .metrics import metrics
+
+# ---------------------------------------------------------
+# 로컬 SQLite 저장소
+# ---------------------------------------------------------
+# - WAL 모드: 쓰기 중에도 다른 스레드/프로세스가 막힘 없이 읽음
+# - 이름 조회는 정규화 키(name_key = tool_key(추천도구)) 인덱스, 직무는 '직무' 인덱스
+# - 투표는 UPDATE ... SET 추천수 = 추천수 + ? 한 문장 (읽고-고치고-쓰기 경합 없음)
+# - 도구 테이블이 바뀔 때마다 트리거가 meta.revision 을 올림 (시트 동기화/캐시 판별용)
+_TEXT_COLUMNS = [c for c in TOOL_COLUMNS if c not in COUNT_COLUMNS]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS tools (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    {", ".join(f'"{c}" TEXT NOT NULL DEFAULT ' + "''" for c in _TEXT_COLUMNS)},
+    "비추천수" INTEGER NOT NULL DEFAULT 0,
+    "추천수" INTEGER NOT NULL DEFAULT 0,
+    name_key TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_tools_name ON tools("추천도구");
+CREATE INDEX IF NOT EXISTS idx_tools_job ON tools("직무");
+
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    {", ".join(f'"{c}" TEXT' for c in LOG_COLUMNS)}
+);
+
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', 0);
+
+CREATE TRIGGER IF NOT EXISTS tools_rev_ins AFTER INSERT ON tools
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'revision'; END;
+CREATE TRIGGER IF NOT EXISTS tools_rev_upd AFTER UPDATE ON tools
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'revision'; END;
+CREATE TRIGGER IF NOT EXISTS tools_rev_del AFTER DELETE ON tools
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'revision'; END;
+"""
+
+
+
+def _insert_sql(table, columns):
+    cols = ", ".join(f'"{c}"' for c in columns)
+    return f"INSERT INTO {table} ({cols}) VALUES ({', '.join('?' for _ in columns)})"
+
+
+_COLS_SQL = ", ".join(f'"{c}"' for c in TOOL_COLUMNS)
+_INSERT_TOOL = _insert_sql("tools", TOOL_COLUMNS + ["name_key"])
+_INSERT_LOG = _insert_sql("logs", LOG_COLUMNS)
+
+
+def _tool_values(row):
+    values = []
+    for c in TOOL_COLUMNS:
+        v = row.get(c, 0 if c in COUNT_COLUMNS else "")
+        if c in COUNT_COLUMNS:
+            try:
+                v = int(float(v))
+            except (TypeError, ValueError):
+                v = 0
+        else:
+            v = "" if v is None else str(v)
+        values.append(v)
+    values.append(tool_key(row.get('추천도구', "")))
+    return values
+
+
+class _LogTable:
+    def __init__(self, storage):
+        self.storage = storage
+
+    def append_rows(self, rows):
+        with self.storage._transaction() as conn:
+            conn.executemany(_INSERT_LOG, [[str(v) for v in r][:len(LOG_COLUMNS)] for r in rows])
+
+
+class SQLiteStorage(ToolStorage):
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+        self._migrate()
+
+    # --- 연결 (스레드마다 하나) ---
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: 트랜잭션은 _transaction() 에서 직접 BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        # 쓰기 잠금을 처음부터 잡아 동시 쓰기끼리 교착되지 않도록
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _migrate(self):
+        # name_key 열이 없던 DB: 열을 추가하고 기존 행의 키를 채움
+        # 이름 정규화 규칙이 바뀐 DB(user_version < KEY_VERSION): 기존 행의 키를 다시 계산
+        conn = self._conn()
+        columns = [r[1] for r in conn.execute("PRAGMA table_info(tools)")]
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if "name_key" not in columns or version < KEY_VERSION:
+            with self._transaction() as tx:
+                if "name_key" not in columns:
+                    tx.execute("ALTER TABLE tools ADD COLUMN name_key TEXT NOT NULL DEFAULT ''")
+                rows = tx.execute('SELECT id, "추천도구" FROM tools').fetchall()
+                tx.executemany("UPDATE tools SET name_key = ? WHERE id = ?",
+                               [(tool_key(name), tool_id) for tool_id, name in rows])
+                tx.execute(f"PRAGMA user_version = {KEY_VERSION}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tools_key ON tools(name_key)")
+
+    # --- 읽기 ---
+    @metrics.timed("storage.read", backend="sqlite", op="load_tools")
+    def load_tools(self):
+        df = pd.read_sql_query(f"SELECT {_COLS_SQL} FROM tools ORDER BY id", self._conn())
+        return coerce_counts(df)
+
+    @metrics.timed("storage.read", backend="sqlite", op="find_tool")
+    def find_tool(self, name):
+        """이름으로 도구 한 행(dict). 없으면 None. (정규화 키 인덱스 사용)"""
+        cur = self._conn().execute(
+            f'SELECT {_COLS_SQL} FROM tools WHERE name_key = ? ORDER BY id LIMIT 1', (tool_key(name),))
+        row = cur.fetchone()
+        return dict(zip(TOOL_COLUMNS, row)) if row else None
+
+    @metrics.timed("storage.read", backend="sqlite", op="tools_by_job")
+    def tools_by_job(self, job):
+        return pd.read_sql_query(
+            f'SELECT {_COLS_SQL} FROM tools WHERE "직무" = ? ORDER BY id', self._conn(), params=(job,))
+
+    @metrics.timed("storage.read", backend="sqlite", op="revision")
+    def revision(self):
+        return self._conn().execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+
+    # --- 쓰기 ---
+    @metrics.timed("storage.write", backend="sqlite", op="vote")
+    def vote(self, name, delta, delete_at=None):
+        with self._transaction() as conn:
+            row = conn.execute(
+                'UPDATE tools SET "추천수" = "추천수" + ? '
+                'WHERE id = (SELECT id FROM tools WHERE name_key = ? ORDER BY id LIMIT 1) '
+                'RETURNING id, "추천수"', (delta, tool_key(name))).fetchone()
+            if row is None: return None
+            tool_id, score = row
+            if delete_at is not None and score <= delete_at:
+                conn.execute("DELETE FROM tools WHERE id = ?", (tool_id,))
+                return score, True
+            return score, False
+
+    @metrics.timed("storage.read", backend="sqlite", op="read_score")
+    def read_score(self, name):
+        row = self._conn().execute(
+            'SELECT id, "추천수" FROM tools WHERE name_key = ? ORDER BY id LIMIT 1', (tool_key(name),)).fetchone()
+        if row is None: return None
+        return row[1], row
+
+    @metrics.timed("storage.write", backend="sqlite", op="write_score")
+    def write_score(self, name, token, score, delete=False):
+        tool_id, expected = token
+        with self._transaction() as conn:
+            if delete:
+                cur = conn.execute('DELETE FROM tools WHERE id = ? AND "추천수" = ?', (tool_id, expected))
+            else:
+                cur = conn.execute('UPDATE tools SET "추천수" = ? WHERE id = ? AND "추천수" = ?',
+                                   (score, tool_id, expected))
+            return cur.rowcount == 1
+
+    @metrics.timed("storage.write", backend="sqlite", op="insert_tool")
+    def insert_tool(self, row):
+        with self._transaction() as conn:
+            exists = conn.execute('SELECT 1 FROM tools WHERE name_key = ? LIMIT 1',
+                                  (tool_key(row.get('추천도구', "")),)).fetchone()
+            if exists: return False
+            conn.execute(_INSERT_TOOL, _tool_values(row))
+            return True
+
+    @metrics.timed("storage.write", backend="sqlite", op="replace_tools")
+    def replace_tools(self, df):
+        """도구 테이블 전체를 df 로 교체합니다. (시트 → SQLite 가져오기용, 한 트랜잭션)"""
+        rows = [_tool_values(r) for r in df.to_dict("records")]
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM tools")
+            conn.executemany(_INSERT_TOOL, rows)
+
+    def open_log_table(self):
+        return _LogTable(self)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
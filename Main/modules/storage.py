@@ -0,0 +1,80 @@
+from abc import ABC, abstractmethod
+import pandas as pd
+
+# ---------------------------------------------------------
+# 도구 DB / 대화 로그 저장소 인터페이스
+# ---------------------------------------------------------
+# db_manager 는 이 인터페이스만 사용합니다. 구현체:
+#   - sheets_backend.SheetsStorage : 구글 시트 (기존 방식)
+#   - sqlite_backend.SQLiteStorage : 로컬 SQLite (시트는 sheet_sync 로 선택적 미러링)
+TOOL_COLUMNS = ['직무', '상황', '결과물', '추천도구', '특징_및_팁', '유료여부', '링크', '비추천수', '추천수']
+COUNT_COLUMNS = ['비추천수', '추천수']
+LOG_COLUMNS = ['시간', '직무', '상황', '질문', '답변']
+
+
+def coerce_counts(df):
+    """추천수/비추천수 열을 정수로 맞춥니다. (없으면 0으로 추가)"""
+    for col in COUNT_COLUMNS:
+        if col not in df.columns: df[col] = 0
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+    return df
+
+
+def empty_tools():
+    return pd.DataFrame(columns=TOOL_COLUMNS)
+
+
+class ToolStorage(ABC):
+    """
+    저장소 구현체가 채워야 하는 메서드 모음. (추상 메서드를 빠뜨린 구현체는 생성 시 TypeError)
+    모든 쓰기 메서드는 스레드 안전해야 하며, 실패하면 예외를 던집니다.
+    """
+
+    @abstractmethod
+    def load_tools(self):
+        """도구 테이블 전체를 DataFrame 으로. (추천수/비추천수는 int)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def vote(self, name, delta, delete_at=None):
+        """
+        '추천도구' 가 name 과 같은(tool_key 기준) 첫 번째 도구의 추천수에 delta 를 원자적으로 더합니다.
+        결과 점수가 delete_at 이하이면 그 도구를 삭제합니다.
+        반환: (새 점수, 삭제 여부) / 도구가 없으면 None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_score(self, name):
+        """(추천수, 버전 토큰). 도구가 없으면 None. 토큰은 write_score 의 충돌 확인용입니다."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def write_score(self, name, token, score, delete=False):
+        """
+        읽은 뒤 아무도 고치지 않았을 때만(token 확인) 추천수를 score 로 쓰거나, delete=True 면 삭제합니다.
+        반환: 성공 True / 충돌 False (다시 읽고 재시도)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_tool(self, row):
+        """row(dict) 를 새 도구로 추가. 같은 이름이 이미 있으면 추가하지 않고 False."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def replace_tools(self, df):
+        """도구 테이블 전체를 df 로 교체합니다. (동기화/중복 병합용)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def open_log_table(self):
+        """append_rows(rows) 를 가진 로그 테이블 객체. (LogWriter 가 사용)"""
+        raise NotImplementedError
+
+    def revision(self):
+        """도구 테이블이 바뀔 때마다 달라지는 값. 알 수 없으면 None."""
+        return None
+
+    def invalidate(self):
+        """쓰기 실패 후 내부 캐시(행 인덱스 등)를 버립니다."""
@@ -0,0 +1,162 @@
+import argparse
+import functools
+import re
+import threading
+import unicodedata
+import pandas as pd
+from .config import TOOL_NAME_ALIASES
+from .storage import COUNT_COLUMNS
+
+# ---------------------------------------------------------
+# 도구 이름 정규화 + 스냅샷용 이름 → 행 위치 인덱스 + 중복 도구 병합
+# ---------------------------------------------------------
+# "ChatGPT", "chatgpt ", "ＣｈａｔＧＰＴ", "Chat GPT" 는 모두 같은 도구로 봅니다.
+#   1. ™ ® © 제거, NFKC (전각 → 반각), casefold (대소문자)
+#   2. 공백 제거 ("Chat GPT" == "ChatGPT")
+#   3. config.TOOL_NAME_ALIASES 에 등록된 별칭만 대표 이름으로 ("chatgpt.com" → ChatGPT)
+# 괄호 설명("Copilot (GitHub)" / "Copilot (Microsoft)")이나 도메인("Claude.com")은 다른 제품일 수 있어
+# 자동으로 지우지 않습니다. (이 키로 투표 대상과 --apply 병합이 정해지고, 병합은 되돌릴 수 없음)
+# 저장소/스냅샷의 모든 이름 조회와 투표 경로가 tool_key() 로 비교합니다.
+KEY_VERSION = 2   # 규칙이 바뀌면 올림 (SQLite 저장소가 name_key 를 다시 계산)
+_MARKS = re.compile(r"[™℠®©]")   # NFKC 가 ™ 를 'TM' 으로 바꾸므로 먼저 제거
+_SPACES = re.compile(r"\s+")
+
+
+def _normalize(name):
+    text = unicodedata.normalize("NFKC", _MARKS.sub("", str(name))).casefold()
+    return _SPACES.sub("", text)
+
+
+_ALIASES = {_normalize(alias): _normalize(name) for alias, name in TOOL_NAME_ALIASES.items()}
+
+
+@functools.lru_cache(maxsize=100_000)
+def tool_key(name):
+    """도구 이름의 동일성 비교 키."""
+    key = _normalize(name)
+    return _ALIASES.get(key, key)
+
+
+def same_tool(a, b):
+    return tool_key(a) == tool_key(b)
+
+
+class ToolNameIndex:
+    """
+    스냅샷 df 의 정규화 이름 → 행 위치(iloc). 같은 이름이 여러 행이면 첫 행.
+    df 가 바뀌면 다시 만들고(이름 키는 캐시됨), 로컬 변경은 advance() 로 반영합니다.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._df = None
+        self.positions = {}
+
+    def _sync(self, df):
+        if df is self._df: return
+        positions = {}
+        if '추천도구' in df.columns:
+            for i, name in enumerate(df['추천도구'].tolist()):
+                positions.setdefault(tool_key(name), i)
+        self._df, self.positions = df, positions
+
+    def find(self, df, name):
+        """df 에서 name 과 같은 도구의 행 위치. 없으면 None."""
+        with self.lock:
+            self._sync(df)
+            return self.positions.get(tool_key(name))
+
+    def advance(self, old_df, new_df, action, pos=None, name=None):
+        """old_df → new_df 변경 반영. action: 'append'(name 추가) / 'delete'(pos 삭제) / 'update'."""
+        with self.lock:
+            self._sync(old_df)
+            if action == 'append':
+                self.positions.setdefault(tool_key(name), len(old_df))
+            elif action == 'delete' and pos is not None:
+                self.positions = {k: (p - 1 if p > pos else p) for k, p in self.positions.items() if p != pos}
+                # 지운 행과 같은 이름의 다른 행이 남아 있으면 그 행을 가리키도록
+                if name is not None and '추천도구' in new_df.columns:
+                    key = tool_key(name)
+                    for i, other in enumerate(new_df['추천도구'].tolist()):
+                        if tool_key(other) == key:
+                            self.positions[key] = i
+                            break
+            self._df = new_df
+
+
+# ---------------------------------------------------------
+# 중복 도구 병합
+# ---------------------------------------------------------
+def find_duplicates(df):
+    """{정규화 키: [행 위치, ...]} 중 두 행 이상인 것만."""
+    groups = {}
+    if '추천도구' not in df.columns: return groups
+    for i, name in enumerate(df['추천도구'].tolist()):
+        groups.setdefault(tool_key(name), []).append(i)
+    return {k: rows for k, rows in groups.items() if len(rows) > 1}
+
+
+def merge_duplicates(df):
+    """
+    같은 도구로 보이는 행들을 첫 행 하나로 합칩니다.
+    추천수/비추천수는 합산하고, 첫 행의 빈 칸은 뒤 행의 값으로 채웁니다.
+    반환: (병합된 df, [(남긴 이름, [합친 이름들], 합산 추천수), ...])
+    """
+    groups = find_duplicates(df)
+    if not groups: return df, []
+    df = df.reset_index(drop=True)
+    drop, report = [], []
+    text_cols = [c for c in df.columns if c not in COUNT_COLUMNS]
+    merged = df.copy()
+    for rows in groups.values():
+        first, rest = rows[0], rows[1:]
+        for col in COUNT_COLUMNS:
+            if col in df.columns:
+                merged.at[first, col] = int(pd.to_numeric(df.loc[rows, col], errors='coerce').fillna(0).sum())
+        for col in text_cols:
+            if str(merged.at[first, col]).strip() not in ("", "nan"): continue
+            for r in rest:
+                if str(df.at[r, col]).strip() not in ("", "nan"):
+                    merged.at[first, col] = df.at[r, col]
+                    break
+        drop.extend(rest)
+        report.append((df.at[first, '추천도구'], [df.at[r, '추천도구'] for r in rest],
+                       int(merged.at[first, '추천수']) if '추천수' in df.columns else 0))
+    return merged.drop(index=drop).reset_index(drop=True), report
+
+
+# ---------------------------------------------------------
+# CLI: 저장소의 중복 도구 병합
+#   (Main 폴더에서) python -m modules.tool_identity            # 미리보기
+#   (Main 폴더에서) python -m modules.tool_identity --apply    # 저장소에 반영
+#   합성 테이블(네트워크 없음)로 돌려 보려면 python -m benchmarks.fake_tool_identity
+# ---------------------------------------------------------
+def build_parser():
+    parser = argparse.ArgumentParser(description="이름만 다른 중복 도구 행을 합치고 추천수를 합산")
+    parser.add_argument("--apply", action="store_true", help="병합 결과로 도구 테이블을 교체 (없으면 미리보기)")
+    return parser
+
+
+def merge_storage(storage, apply=False):
+    """저장소의 중복 도구를 찾아 출력하고, apply 면 병합 결과로 교체합니다. 반환: 병합 보고"""
+    df = storage.load_tools()
+    merged, report = merge_duplicates(df)
+    for kept, names, score in report:
+        print(f"🔗 '{kept}' ← {', '.join(repr(n) for n in names)} (추천수 합계 {score})")
+    print(f"{len(df)}행 → {len(merged)}행 (중복 그룹 {len(report)}개)")
+    if report and apply:
+        storage.replace_tools(merged)
+        print("✅ 저장소에 반영했습니다.")
+    elif report:
+        print("미리보기입니다. 반영하려면 --apply")
+    return report
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    from .db_manager import get_storage
+    merge_storage(get_storage(), args.apply)
+
+
+if __name__ == "__main__":
+    main()
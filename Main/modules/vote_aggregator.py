@@ -0,0 +1,199 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from .log_writer import LogWriter
+from .tool_identity import tool_key
+from .metrics import metrics, current_trace, use_trace
+
+# ---------------------------------------------------------
+# 투표 저널 + 단일 기록기 (동시 투표 유실 방지)
+# ---------------------------------------------------------
+# - submit() 은 투표 이벤트를 저널(spool 파일 + 큐, LogWriter 재사용)에 추가하고 바로 반환
+# - 저널 워커 스레드 하나만 저장소에 쓰며, 묶음마다 도구별 '순증감'만 반영
+# - 반영은 낙관적 동시성: 점수를 읽고(토큰) → 그대로일 때만 쓰기, 충돌하면 다시 읽고 재시도
+#   (다른 프로세스/수동 편집과 겹쳐도 증감분을 잃지 않음)
+# - 반영 도중 실패한 도구의 증감분은 새 이벤트로 저널에 다시 넣습니다.
+#   (묶음 전체를 재시도하면 이미 반영한 도구가 두 번 반영되므로)
+#   max_requeues 번 넘게 실패한 증감분은 저널 옆 dead-letter 파일(*.dead.jsonl)로 옮기고 더 재시도하지 않습니다.
+# 반영 직후 ~ 저널 오프셋 기록 전 사이에 프로세스가 죽으면 그 묶음은 재시작 때 한 번 더 반영될 수 있습니다.
+# 도구는 tool_key() 로 묶으므로 "ChatGPT" 와 "chatgpt " 투표는 한 도구의 순증감으로 합쳐집니다.
+# 이벤트에 투표한 요청의 추적 ID 를 함께 저널에 남기고, 워커는 도구별 반영을 그 ID 로 기록합니다.
+
+
+class VoteAggregator:
+    """
+    storage: ToolStorage (read_score / write_score / insert_tool)
+    prepare_new(row) -> row : 신규 도구 등록 직전 호출 (직무 표준화 등, 워커 스레드에서 실행)
+    on_applied(results)      : 묶음 반영 후 호출. results = {도구명: (종류, 값)}
+        종류: 'update'(새 점수) / 'delete'(최종 점수) / 'insert'(등록한 행 dict)
+    """
+
+    def __init__(self, storage, journal_path, prepare_new=None, on_applied=None, delete_at=-3,
+                 batch_size=200, flush_interval=1.0, max_conflicts=5, max_requeues=5):
+        self.storage = storage
+        self.prepare_new = prepare_new
+        self.on_applied = on_applied
+        self.delete_at = delete_at
+        self.max_conflicts = max_conflicts
+        self.max_requeues = max_requeues
+        self.dead_letter_path = os.path.splitext(journal_path)[0] + ".dead.jsonl"
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._prefix = f"{os.getpid()}-{int(time.time() * 1000)}"
+        self.unapplied = {}                 # 이벤트 id -> (도구 키, 증감) : 이 프로세스에서 받은 미반영분
+        self.pending_delta = defaultdict(int)   # 도구 키 -> 미반영 순증감
+        self.pending_rows = {}              # 도구 키 -> 미반영 신규 도구 행
+        self.applied = 0
+        self.batches = 0
+        self.conflicts = 0
+        self.requeued = 0
+        self.dead_lettered = 0
+        self.journal = LogWriter(lambda: self, journal_path, max_queue=100_000,
+                                 batch_size=batch_size, flush_interval=flush_interval, max_retries=0,
+                                 name="vote")
+
+    # --- 요청 경로 (논블로킹) ---
+    def submit(self, name, delta, row=None, attempts=0):
+        """투표 한 건을 저널에 넣습니다. 저널이 가득 차면 False. attempts: 반영 실패로 다시 넣은 횟수"""
+        event = {"id": f"{self._prefix}-{next(self._ids)}", "tool": name, "delta": delta,
+                 "row": row, "ts": time.time(), "attempts": attempts, "trace": current_trace()}
+        key = tool_key(name)
+        with self.lock:
+            self.unapplied[event["id"]] = (key, delta)
+            self.pending_delta[key] += delta
+            if row is not None: self.pending_rows.setdefault(key, row)
+        if self.journal.submit(event): return True
+        self._settle([event["id"]])
+        return False
+
+    def pending(self, name):
+        """(아직 저장소에 반영되지 않은 순증감, 미등록 신규 도구 여부)"""
+        key = tool_key(name)
+        with self.lock:
+            return self.pending_delta.get(key, 0), key in self.pending_rows
+
+    def _settle(self, ids):
+        with self.lock:
+            for event_id in ids:
+                entry = self.unapplied.pop(event_id, None)
+                if entry is None: continue   # 재시작 후 다시 읽은 이벤트
+                key, delta = entry
+                self.pending_delta[key] -= delta
+                if not self.pending_delta[key]:
+                    del self.pending_delta[key]
+                    self.pending_rows.pop(key, None)
+
+    # --- 워커 (LogWriter 가 묶음으로 호출) ---
+    def _dead_letter(self, name, delta, row, attempts, error):
+        """계속 실패하는 증감분을 따로 기록 (수동 확인/재반영용)."""
+        record = {"tool": name, "delta": delta, "row": row, "attempts": attempts,
+                  "error": f"{type(error).__name__}: {error}", "ts": time.time()}
+        try:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"💥 [투표 dead-letter 기록 실패] {name}: {e}")
+        with self.lock: self.dead_lettered += 1
+        metrics.count("vote.dead_letter", error=type(error).__name__)
+
+    def _apply_one(self, name, delta, row):
+        for _ in range(self.max_conflicts):
+            current = self.storage.read_score(name)
+            if current is None:
+                # 없는 도구: 👍 로 등록 정보가 들어왔으면 순증감이 0 이하여도 등록
+                # (기존처럼 👍 등록 → 👎 차감을 차례로 한 것과 같은 결과, 삭제 기준 이하면 등록 후 삭제와 같음)
+                if row is None: return None
+                if self.delete_at is not None and delta <= self.delete_at: return None
+                new_row = dict(self.prepare_new(dict(row)) if self.prepare_new else row)
+                new_row['비추천수'] = 0
+                new_row['추천수'] = delta
+                if self.storage.insert_tool(new_row): return 'insert', new_row
+                continue  # 그 사이 다른 곳에서 먼저 등록됨 → 점수 갱신으로 재시도
+            score, token = current
+            if not delta: return None
+            score += delta
+            deleted = self.delete_at is not None and score <= self.delete_at
+            if self.storage.write_score(name, token, score, delete=deleted):
+                return ('delete' if deleted else 'update'), score
+            with self.lock: self.conflicts += 1
+        raise RuntimeError(f"'{name}' 점수 갱신 충돌이 {self.max_conflicts}회 반복됨")
+
+    def append_rows(self, events):
+        # 도구 키별 순증감 (저장소 호출/결과에는 처음 받은 이름을 씀)
+        names, deltas, rows, ids, submitted, attempts = {}, {}, {}, defaultdict(list), defaultdict(list), {}
+        traces = {}
+        for ev in events:
+            key = tool_key(ev["tool"])
+            names.setdefault(key, ev["tool"])
+            traces.setdefault(key, ev.get("trace"))
+            deltas[key] = deltas.get(key, 0) + ev["delta"]
+            if ev.get("row") is not None: rows.setdefault(key, ev["row"])
+            ids[key].append(ev.get("id"))
+            if ev.get("ts"): submitted[key].append((ev["ts"], ev.get("trace")))
+            attempts[key] = max(attempts.get(key, 0), ev.get("attempts", 0))
+
+        results = {}
+        for key, delta in deltas.items():
+            name = names[key]
+            # 도구별 반영 계측은 그 도구에 처음 투표한 요청의 추적 ID 로 (다시 넣는 이벤트에도 이어짐)
+            with use_trace(traces[key]):
+                try:
+                    with metrics.timer("vote.apply"):
+                        # 순증감 0 이어도 신규 도구(등록 정보 있음)는 등록 경로를 거침
+                        result = self._apply_one(name, delta, rows.get(key)) if delta or key in rows else None
+                except Exception as e:
+                    print(f"💥 [투표 반영 실패] {name}: {e}")
+                    self._settle(ids[key])
+                    tries = attempts[key] + 1
+                    if tries > self.max_requeues:
+                        self._dead_letter(name, delta, rows.get(key), tries, e)
+                        continue
+                    self.submit(name, delta, rows.get(key), attempts=tries)
+                    with self.lock: self.requeued += 1
+                    metrics.count("vote.requeued", error=type(e).__name__)
+                    continue
+                self._settle(ids[key])
+                # 투표 클릭 → 저장소 반영까지 걸린 시간
+                now = time.time()
+                for ts, trace_id in submitted[key]:
+                    with use_trace(trace_id): metrics.observe_seconds("vote.lag", now - ts)
+                if result is not None: results[name] = result
+
+        with self.lock:
+            self.applied += len(events)
+            self.batches += 1
+        if results and self.on_applied is not None:
+            try:
+                self.on_applied(results)
+            except Exception as e:
+                print(f"💥 [투표 반영 후처리 실패] {e}")
+
+    # --- 관리 ---
+    def wait_idle(self, timeout=30.0):
+        """저널의 모든 투표가 반영될 때까지 대기. 시간 안에 끝나면 True."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.journal.stats()["pending"] == 0:
+                with self.lock:
+                    if not self.unapplied: return True
+            time.sleep(0.02)
+        return False
+
+    def close(self):
+        self.journal.close()
+
+    def stats(self):
+        journal = self.journal.stats()
+        with self.lock:
+            return {
+                "submitted": journal["submitted"],
+                "applied": self.applied,
+                "pending": journal["pending"],
+                "batches": self.batches,
+                "conflicts": self.conflicts,
+                "requeued": self.requeued,
+                "dead_lettered": self.dead_lettered,
+            }
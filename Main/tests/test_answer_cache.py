@@ -0,0 +1,89 @@
+import pandas as pd
+from modules.answer_cache import AnswerCache, answer_version, normalize_question
+from modules.cache_warmer import CacheWarmer
+from modules.config import QUICK_ASK_TEMPLATE, QUICK_ASK_OUTPUTS_TEMPLATE
+from modules.facets import FacetIndex
+
+# 실행: (Main 폴더에서) python -m pytest -q tests
+OUTPUTS = [[], ["엑셀"], ["코드"], ["영상"], ["보고서"], ["엑셀", "보고서"]]
+
+
+def quick_ask(outputs, job="마케터", sit="보고서 작성"):
+    outs_msg = QUICK_ASK_OUTPUTS_TEMPLATE.format(outputs=", ".join(outputs)) if outputs else ""
+    return [{"role": "user", "content": QUICK_ASK_TEMPLATE.format(job=job, sit=sit, outs_msg=outs_msg)}]
+
+
+def test_different_outputs_never_share_an_entry():
+    for cached in OUTPUTS:
+        cache = AnswerCache(similarity=0.5)
+        cache.put(quick_ask(cached), 1, f"answer for {cached}")
+        for asked in OUTPUTS:
+            got = cache.get(quick_ask(asked), 1)
+            assert got == (f"answer for {cached}" if asked == cached else None), (cached, asked)
+
+
+def test_output_order_and_wording_still_near_match():
+    cache = AnswerCache()
+    cache.put(quick_ask(["엑셀", "보고서"]), 1, "excel+report")
+    assert cache.get(quick_ask(["보고서", "엑셀"]), 1) == "excel+report"
+    assert cache.stats()["near_hits"] == 1
+
+
+def test_different_job_is_a_miss():
+    cache = AnswerCache(similarity=0.5)
+    cache.put(quick_ask(["엑셀"], job="마케터"), 1, "marketer")
+    assert cache.get(quick_ask(["엑셀"], job="마케팅"), 1) is None
+
+
+def test_warmed_answer_survives_votes_but_not_new_tools():
+    df = pd.DataFrame([["마케터", "보고서 작성", "ChatGPT", 3], ["마케터", "보고서 작성", "Gamma", 1],
+                       ["개발자", "코드 리뷰", "Copilot", 2]], columns=["직무", "상황", "추천도구", "추천수"])
+    facets = FacetIndex().sync(df)
+    cache, calls = AnswerCache(), []
+    warmer = CacheWarmer(lambda messages, _df: calls.append(messages) or "warm", cache,
+                         lambda job, sit, outs: quick_ask(outs, job, sit)[0]["content"], rate_per_min=0)
+    assert warmer.run(df, db_version=1, facets=facets)["done"] == 2
+
+    # 투표: 추천수만 바뀌고 스냅샷 버전은 올라감 → 미리 만든 답변을 그대로 찾고, 다시 워밍해도 모델 호출 없음
+    voted = df.copy()
+    voted.loc[0, "추천수"] = 4
+    facets.advance(df, voted, removed=[df.iloc[0].to_dict()], added=[voted.iloc[0].to_dict()])
+    messages = quick_ask([])
+    assert cache.get(messages, answer_version(messages, facets, 2)) == "warm"
+    assert warmer.run(voted, db_version=2, facets=facets)["skipped"] == 2 and len(calls) == 2
+
+    # 같은 조합에 새 도구가 들어오면 다른 답변이어야 하므로 캐시를 쓰지 않음
+    added = pd.concat([voted, pd.DataFrame([["마케터", "보고서 작성", "Claude", 0]], columns=df.columns)],
+                      ignore_index=True)
+    facets.advance(voted, added, added=[added.iloc[-1].to_dict()])
+    assert cache.get(messages, answer_version(messages, facets, 3)) is None
+    other = quick_ask([], "개발자", "코드 리뷰")
+    assert cache.get(other, answer_version(other, facets, 3)) == "warm"
+
+
+FREE_FORM_PAIRS = [
+    ("회사에서 매달 매출 보고서를 엑셀로 정리하고 차트까지 자동으로 만들어 주는 AI 도구 추천해 줘",
+     "회사에서 매달 매출 보고서를 구글시트로 정리하고 차트까지 자동으로 만들어 주는 AI 도구 추천해 줘"),
+    ("데이터 분석 자동화 스크립트를 Python 으로 작성할 때 코드 리뷰까지 해 주는 AI 도구 추천해 줘",
+     "데이터 분석 자동화 스크립트를 Java 로 작성할 때 코드 리뷰까지 해 주는 AI 도구 추천해 줘"),
+    ("윈도우 노트북에서 회의 녹음 파일을 자동으로 요약하고 할 일까지 정리해 주는 도구 알려줘",
+     "맥 노트북에서 회의 녹음 파일을 자동으로 요약하고 할 일까지 정리해 주는 도구 알려줘"),
+    ("마케팅 카드뉴스 이미지를 빠르게 만들고 문구까지 다듬어 주는 무료 AI 도구 추천해 줘",
+     "마케팅 카드뉴스 이미지를 빠르게 만들고 문구까지 다듬어 주는 유료 AI 도구 추천해 줘"),
+]
+
+
+def test_free_form_questions_differing_in_one_word_never_share_an_entry():
+    for first, second in FREE_FORM_PAIRS:
+        cache = AnswerCache()
+        cache.put([{"role": "user", "content": first}], 1, "first")
+        assert cache.get([{"role": "user", "content": second}], 1) is None, second
+        assert cache.get([{"role": "user", "content": first + "?"}], 1) == "first"
+
+
+def test_symbols_that_name_a_language_are_kept():
+    cache = AnswerCache()
+    cache.put([{"role": "user", "content": "C++ 개발자를 위한 도구"}], 1, "cpp")
+    assert cache.get([{"role": "user", "content": "C# 개발자를 위한 도구"}], 1) is None
+    assert cache.get([{"role": "user", "content": "C++ 개발자를 위한 도구!"}], 1) == "cpp"
+    assert normalize_question("Node.js 도구 추천해 줘.") == "node.js 도구 추천해 줘"
@@ -0,0 +1,35 @@
+from modules import ai_manager
+from modules.answer_parser import is_quick_question, parse_question
+from benchmarks.fake_gemini import make_answer
+
+FREE_FORM = "회의록을 자동으로 요약해 주는 도구 알려줘"
+
+
+def test_quick_question_round_trips_through_the_template():
+    question = ai_manager.build_quick_question("데이터 분석가", "주간 리포트", ["엑셀", "PPT"])
+    assert is_quick_question(question)
+    assert parse_question(question) == ("데이터 분석가", "주간 리포트", "엑셀, PPT")
+    assert not is_quick_question(FREE_FORM)
+    assert parse_question(FREE_FORM) == ("기타", "", "")
+
+
+def test_free_form_questions_infer_job_and_situation_with_the_model(monkeypatch):
+    inferred = [{"추천도구": "Clova Note", "직무": "기획자", "상황": "회의록 정리"}]
+    calls = []
+    monkeypatch.setattr(ai_manager, "parse_tools_ai", lambda q, a: calls.append(q) or inferred)
+    answer = make_answer(["Clova Note"])
+
+    assert ai_manager.parse_tools(FREE_FORM, answer) == inferred
+    # 빠른 추천 질문은 모델 호출 없이 양식에서 바로
+    quick = ai_manager.build_quick_question("기획자", "회의록 정리", [])
+    tools = ai_manager.parse_tools(quick, answer)
+    assert calls == [FREE_FORM]
+    assert {(t["직무"], t["상황"]) for t in tools} == {("기획자", "회의록 정리")}
+    assert tools[0]["추천도구"] == "Clova Note"
+
+
+def test_free_form_falls_back_to_local_tools_when_the_model_fails(monkeypatch):
+    monkeypatch.setattr(ai_manager, "parse_tools_ai", lambda q, a: [])
+    tools = ai_manager.parse_tools(FREE_FORM, make_answer(["Clova Note"]))
+    assert tools[0]["추천도구"] == "Clova Note"
+    assert {t["직무"] for t in tools} == {"기타"}
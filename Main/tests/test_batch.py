@@ -0,0 +1,98 @@
+import json
+from google.api_core import exceptions
+from modules.batch import BatchRunner, ResultLog, compare, read_questions, read_results
+
+
+def items(*ids):
+    return [{"id": i, "question": f"질문 {i}", "job": None, "situation": None, "outputs": []} for i in ids]
+
+
+def run(path, answer_fn, ids, max_retries=3, restart=False):
+    runner = BatchRunner(answer_fn, max_workers=2, max_retries=max_retries, backoff_base=0.0, prompt="p1")
+    log = ResultLog(str(path), runner.prompt, restart=restart)
+    try:
+        return runner.run(items(*ids), log)
+    finally:
+        log.close()
+
+
+def lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]   # 모든 줄이 온전한 JSON 이어야 함
+
+
+def test_resume_skips_ids_already_ok(tmp_path):
+    out = tmp_path / "results.jsonl"
+    asked = []
+    def flaky(messages):
+        asked.append(messages[-1]["content"])
+        if messages[-1]["content"] == "질문 b" and asked.count("질문 b") == 1: raise ValueError("boom")
+        return "answer"
+
+    first = run(out, flaky, ["a", "b", "c"])
+    assert (first["ok"], first["failed"]) == (2, 1)
+    second = run(out, flaky, ["a", "b", "c"])
+    # 성공한 a, c 는 건너뛰고 실패한 b 만 다시
+    assert (second["skipped"], second["ok"], second["failed"]) == (2, 1, 0)
+    assert sorted(asked) == ["질문 a", "질문 b", "질문 b", "질문 c"]
+    assert {rid: r["status"] for rid, r in read_results(str(out)).items()} == {"a": "ok", "b": "ok", "c": "ok"}
+
+
+def test_retries_stop_at_the_limit(tmp_path):
+    calls = []
+    def overloaded(messages):
+        calls.append(1)
+        raise exceptions.ResourceExhausted("429")
+
+    result = run(tmp_path / "results.jsonl", overloaded, ["a"], max_retries=3)
+    assert len(calls) == 3 and result["retries"] == 2 and result["failed"] == 1
+    record = lines(tmp_path / "results.jsonl")[0]
+    assert record["status"] == "error" and record["error"].startswith("ResourceExhausted")
+
+
+def test_interrupted_run_leaves_valid_jsonl_and_resumes(tmp_path):
+    out = tmp_path / "results.jsonl"
+    # 이전 실행이 줄 중간에 끊김
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "a", "status": "ok", "prompt": "p1", "answer": "x"}) + "\n")
+        f.write('{"id": "b", "status": "o')
+    assert list(read_results(str(out))) == ["a"]
+
+    def interrupt_on_c(messages):
+        if messages[-1]["content"] == "질문 c": raise KeyboardInterrupt
+        return "answer"
+    result = run(out, interrupt_on_c, ["a", "b", "c", "d"])
+    assert result["interrupted"] and result["skipped"] == 1
+
+    with open(out, encoding="utf-8") as f:
+        raw = f.read().splitlines()
+    assert raw[1] == '{"id": "b", "status": "o'   # 끊긴 줄은 그대로 두고 새 줄에서 이어 씀
+    valid = [json.loads(line) for line in raw[:1] + raw[2:]]
+    assert all(r["id"] in "abcd" for r in valid)
+
+    resumed = run(out, lambda messages: "answer", ["a", "b", "c", "d"])
+    assert not resumed["interrupted"]
+    assert {rid: r["status"] for rid, r in read_results(str(out)).items()} == dict.fromkeys("abcd", "ok")
+
+
+def test_compare_reports_tool_overlap(tmp_path):
+    def write(path, tools_by_id):
+        with open(path, "w", encoding="utf-8") as f:
+            for rid, tools in tools_by_id.items():
+                f.write(json.dumps({"id": rid, "tools": [{"추천도구": t} for t in tools]}, ensure_ascii=False) + "\n")
+    write(tmp_path / "old.jsonl", {"a": ["ChatGPT", "Gamma"], "b": ["Notion AI"], "c": ["Claude"]})
+    write(tmp_path / "new.jsonl", {"a": ["chatgpt ", "Gamma"], "b": ["Copilot"], "d": ["Gemini"]})
+    assert compare(str(tmp_path / "old.jsonl"), str(tmp_path / "new.jsonl")) == [("b", 0.0), ("a", 1.0)]
+
+
+def test_csv_and_jsonl_accept_korean_aliases(tmp_path):
+    quick = lambda job, sit, outs: f"{job}/{sit}/{','.join(outs)}"
+    csv_path = tmp_path / "questions.csv"
+    csv_path.write_text("id,직무,상황,결과물\nq1,마케터,보고서 작성,\"엑셀, PPT\"\n", encoding="utf-8-sig")
+    assert read_questions(str(csv_path), quick) == [{"id": "q1", "question": "마케터/보고서 작성/엑셀,PPT",
+                                                     "job": "마케터", "situation": "보고서 작성",
+                                                     "outputs": ["엑셀", "PPT"]}]
+    jsonl_path = tmp_path / "questions.jsonl"
+    jsonl_path.write_text('{"질문": "회의록 요약 도구"}\n\n{"id": "x", "question": "번역 도구"}\n', encoding="utf-8")
+    assert [(q["id"], q["question"]) for q in read_questions(str(jsonl_path))] == [("1", "회의록 요약 도구"),
+                                                                                  ("x", "번역 도구")]
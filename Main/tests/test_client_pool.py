@@ -0,0 +1,44 @@
+from google.ai import generativelanguage as glm
+from modules.client_pool import ModelPool
+
+
+class RecordingClient:
+    """generate_content / stream_generate_content 요청을 기록하고 고정 응답을 돌려주는 서비스 클라이언트."""
+
+    def __init__(self):
+        self.requests = []
+
+    def _response(self, text):
+        return glm.GenerateContentResponse(candidates=[glm.Candidate(
+            content=glm.Content(role="model", parts=[glm.Part(text=text)]), finish_reason="STOP")])
+
+    def generate_content(self, request):
+        self.requests.append(request)
+        return self._response("답변")
+
+    def stream_generate_content(self, request):
+        self.requests.append(request)
+        return iter([self._response("답"), self._response("변")])
+
+
+def test_model_is_reused_across_turns_and_keys_stay_separate():
+    clients = {}
+    pool = ModelPool(client_factory=lambda key: clients.setdefault(key, RecordingClient()))
+    history = [{"role": "user", "parts": ["이전 질문"]}, {"role": "model", "parts": ["이전 답변"]}]
+
+    for turn in range(3):
+        chat = pool.get("key-a", "gemini-test").start_chat(history, system_instruction=f"DB 컨텍스트 {turn}")
+        assert chat.send_message("질문").text == "답변"
+    assert pool.misses == 1 and pool.hits == 2
+
+    # 턴마다 바뀌는 시스템 프롬프트와 이전 대화는 요청에 실림
+    request = clients["key-a"].requests[-1]
+    assert request.model == "models/gemini-test"
+    assert request.system_instruction.parts[0].text == "DB 컨텍스트 2"
+    assert [(c.role, c.parts[0].text) for c in request.contents] == [
+        ("user", "이전 질문"), ("model", "이전 답변"), ("user", "질문")]
+
+    model = pool.get("key-b", "gemini-test", generation_config={"temperature": 0.7})
+    assert "".join(chunk.text for chunk in model.generate_content("질문", stream=True)) == "답변"
+    assert abs(clients["key-b"].requests[0].generation_config.temperature - 0.7) < 1e-6
+    assert len(clients["key-a"].requests) == 3
@@ -0,0 +1,52 @@
+from modules.history import compact_history, history_tokens
+from modules.rate_limiter import estimate_tokens
+from benchmarks.fake_gemini import CANNED_ANSWER
+
+BUDGET = 2000
+KEEP_RECENT = 4
+
+
+def conversation(turns, answer=CANNED_ANSWER):
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"나의 직무는 **직무{i % 7}**인데, **상황{i}** 업무 할 때 도움되는 AI 도구 좀 추천해 줘."})
+        messages.append({"role": "assistant", "content": answer})
+    messages.append({"role": "user", "content": "방금 추천한 것 중에 무료인 것만 다시 알려줘"})
+    return messages
+
+
+def assert_alternating(history):
+    roles = [h["role"] for h in history]
+    assert all(a != b for a, b in zip(roles, roles[1:]))
+
+
+def test_long_conversation_is_compacted_to_the_budget():
+    messages = conversation(300)
+    history = compact_history(messages, BUDGET, KEEP_RECENT)
+
+    assert history_tokens(history) <= BUDGET
+    assert sum(estimate_tokens(m["content"]) for m in messages[:-1]) > BUDGET * 10
+    # 뺀 대화는 첫 메시지 앞의 요약 줄로 남음
+    assert history[0]["role"] == "user" and history[0]["parts"][0].startswith("[앞선 대화 ")
+    assert_alternating(history)
+
+
+def test_recent_messages_are_kept_verbatim_even_over_budget():
+    # 답변 하나가 예산보다 길어도 최근 메시지는 자르지 않고, 오래된 대화만 요약/생략
+    messages = conversation(20, CANNED_ANSWER * 8)
+    history = compact_history(messages, BUDGET, KEEP_RECENT)
+
+    recent = [m["content"] for m in messages[:-1][-KEEP_RECENT:]]
+    kept = [h["parts"][0] for h in history[-KEEP_RECENT:]]
+    assert all(k.endswith(r) for k, r in zip(kept, recent))
+    assert history_tokens(history[:-KEEP_RECENT]) <= BUDGET
+    assert_alternating(history)
+
+
+def test_older_answers_are_summarized_to_tool_names():
+    messages = conversation(5)
+    history = compact_history(messages, BUDGET, KEEP_RECENT)
+
+    older = [h["parts"][0] for h in history[:-KEEP_RECENT] if h["role"] == "model"]
+    assert older and all(text.startswith("[이전 답변 요약] 추천 도구: ") for text in older)
+    assert history[-1]["parts"][0] == CANNED_ANSWER
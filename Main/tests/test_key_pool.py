@@ -0,0 +1,79 @@
+import time
+from google.api_core import exceptions
+from modules.key_pool import KeyPool, CLOSED, OPEN, HALF_OPEN, QUARANTINED, key_id
+
+UNAVAILABLE = exceptions.ServiceUnavailable("overloaded")
+RATE_LIMITED = exceptions.ResourceExhausted("quota")
+
+
+def state(pool, api_key):
+    return pool.keys[key_id(api_key)].state
+
+
+def make_pool(keys=("k1", "k2"), **kwargs):
+    kwargs.setdefault("cooldown", 0.05)
+    return KeyPool(list(keys), rpm=1000, tpm=1_000_000, window=1.0, **kwargs)
+
+
+def test_consecutive_unavailable_errors_open_the_circuit():
+    pool = make_pool(failure_threshold=3)
+    pool.report("k1", UNAVAILABLE)
+    pool.report("k1", UNAVAILABLE)
+    assert state(pool, "k1") == CLOSED
+    # 성공하면 연속 실패 수는 처음부터
+    pool.report("k1")
+    pool.report("k1", UNAVAILABLE)
+    pool.report("k1", UNAVAILABLE)
+    assert state(pool, "k1") == CLOSED
+    pool.report("k1", UNAVAILABLE)
+    assert state(pool, "k1") == OPEN
+    # 쉬는 동안 새 호출은 다른 키로
+    assert {pool.select() for _ in range(5)} == {"k2"}
+
+
+def test_rate_limit_opens_at_once_and_half_open_allows_one_probe():
+    pool = make_pool(keys=("k1",))
+    pool.report("k1", RATE_LIMITED)
+    assert state(pool, "k1") == OPEN
+    time.sleep(0.06)
+    assert pool.select() == "k1" and state(pool, "k1") == HALF_OPEN
+    # 시험 호출 결과가 오기 전에는 가장 먼저 풀리는 키로 대기만
+    assert pool.available() == 0
+    pool.report("k1")
+    assert state(pool, "k1") == CLOSED and pool.available() == 1
+
+
+def test_failed_probe_reopens_with_doubled_cooldown():
+    pool = make_pool(keys=("k1",), cooldown=0.05, max_cooldown=0.15)
+    entry = pool.keys[key_id("k1")]
+    pool.report("k1", RATE_LIMITED)
+    time.sleep(0.06)
+    pool.select()
+    pool.report("k1", UNAVAILABLE)
+    assert entry.state == OPEN
+    assert 0.08 < entry.open_until - time.monotonic() <= 0.1
+    time.sleep(0.11)
+    pool.select()
+    pool.report("k1", UNAVAILABLE)
+    assert entry.open_until - time.monotonic() <= 0.15   # max_cooldown 에서 멈춤
+
+
+def test_invalid_key_is_quarantined_until_released():
+    dropped = []
+    pool = make_pool(on_quarantine=dropped.append)
+    pool.report("k1", exceptions.PermissionDenied("API key not valid"))
+    assert state(pool, "k1") == QUARANTINED and dropped == ["k1"]
+    assert len(pool) == 1
+    assert {pool.select() for _ in range(5)} == {"k2"}
+    # 키와 무관한 오류는 상태를 바꾸지 않음
+    pool.report("k2", exceptions.InvalidArgument("bad request"))
+    assert state(pool, "k2") == CLOSED
+    pool.release("k1")
+    assert state(pool, "k1") == CLOSED and len(pool) == 2
+
+
+def test_open_key_holds_callers_and_personal_keys_bypass_the_pool():
+    pool = make_pool(keys=("k1",), cooldown=10.0)
+    pool.report("k1", RATE_LIMITED)
+    assert pool.acquire("k1", timeout=0.05) is False
+    assert pool.acquire("personal-key") is None
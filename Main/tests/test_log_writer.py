@@ -0,0 +1,38 @@
+import json
+import os
+import time
+from modules.log_writer import LogWriter
+
+
+class MemoryTable:
+    """append_rows 만 있는 메모리 로그 테이블."""
+
+    def __init__(self):
+        self.rows = []
+
+    def append_rows(self, rows):
+        self.rows.extend(rows)
+
+
+def wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline: time.sleep(0.01)
+    return cond()
+
+
+def test_backlog_larger_than_queue_is_replayed_before_truncating(tmp_path):
+    # 이전 실행의 미기록분 10건이 큐(3칸)보다 많음
+    spool = str(tmp_path / "log.jsonl")
+    with open(spool, "w", encoding="utf-8") as f:
+        for i in range(10): f.write(json.dumps([f"old-{i}"]) + "\n")
+
+    table = MemoryTable()
+    writer = LogWriter(lambda: table, spool, max_queue=3, batch_size=2, flush_interval=0.02)
+    # 앞부분이 기록된 뒤 새 로그가 들어와도, 중간의 재생 못 한 로그를 버리고 spool 을 비우면 안 됨
+    assert wait_for(lambda: len(table.rows) >= 2)
+    assert writer.submit(["new"])
+    assert wait_for(lambda: len(table.rows) == 11)
+    writer.close()
+
+    assert table.rows == [[f"old-{i}"] for i in range(10)] + [["new"]]
+    assert os.path.getsize(spool) == 0
@@ -0,0 +1,108 @@
+import socket
+import threading
+import time
+import pytest
+from modules import metrics as metrics_module
+from modules.log_writer import LogWriter
+from modules.metrics import Metrics, metrics, new_trace, serve_prometheus
+from modules.vote_aggregator import VoteAggregator
+
+
+class MemoryTable:
+    def __init__(self):
+        self.rows = []
+
+    def append_rows(self, rows):
+        self.rows.extend(rows)
+
+
+class MemoryScores:
+    """read_score / write_score 만 있는 메모리 저장소."""
+
+    def __init__(self, scores):
+        self.scores = dict(scores)
+
+    def read_score(self, name):
+        return self.scores[name], self.scores[name]
+
+    def write_score(self, name, token, score, delete=False):
+        self.scores[name] = score
+        return True
+
+
+def wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline: time.sleep(0.01)
+    return cond()
+
+
+class ListSink:
+    def __init__(self):
+        self.events = []
+
+    def write(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def sink(monkeypatch):
+    sink = ListSink()
+    monkeypatch.setattr(metrics, "enabled", True)
+    monkeypatch.setattr(metrics, "sink", sink)
+    yield sink
+    metrics.reset()
+
+
+def traces_of(sink, name):
+    return [ev["trace"] for ev in sink.events if ev["name"] == name]
+
+
+def submit_in_thread(fn):
+    # 요청마다 새 스레드 = 새 컨텍스트 (Streamlit 실행/서비스 요청처럼)
+    result = {}
+
+    def run():
+        result["trace"] = new_trace()
+        fn()
+
+    t = threading.Thread(target=run)
+    t.start()
+    t.join()
+    return result["trace"]
+
+
+def test_log_rows_are_recorded_under_the_submitting_request(sink, tmp_path):
+    table = MemoryTable()
+    writer = LogWriter(lambda: table, str(tmp_path / "log.jsonl"), batch_size=10, flush_interval=0.05)
+    a = submit_in_thread(lambda: writer.submit(["a"]))
+    b = submit_in_thread(lambda: writer.submit(["b"]))
+    assert wait_for(lambda: len(table.rows) == 2)
+    writer.close()
+
+    assert sorted(traces_of(sink, "writer.rows")) == sorted([a, b])
+    assert traces_of(sink, "writer.flush")[0] == a
+
+
+def test_vote_apply_is_recorded_under_the_voter_request(sink, tmp_path):
+    storage = MemoryScores({"ChatGPT": 0, "Gemini": 0})
+    agg = VoteAggregator(storage, str(tmp_path / "journal.jsonl"), flush_interval=0.05)
+    a = submit_in_thread(lambda: agg.submit("ChatGPT", +1))
+    b = submit_in_thread(lambda: agg.submit("Gemini", +1))
+    assert agg.wait_idle(10)
+    agg.close()
+
+    assert sorted(traces_of(sink, "vote.apply")) == sorted([a, b])
+    assert sorted(traces_of(sink, "vote.lag")) == sorted([a, b])
+
+
+def test_prometheus_endpoint_binds_to_localhost_by_default(monkeypatch):
+    monkeypatch.setattr(metrics_module, "_server", None)
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = serve_prometheus(port, registry=Metrics(enabled=True))
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,56 @@
+import threading
+import time
+from modules.rate_limiter import RateLimiter
+
+
+def wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline: time.sleep(0.005)
+    return cond()
+
+
+def test_burst_is_admitted_then_callers_wait_for_refill():
+    # 순간 허용량 2건, 나머지는 window(0.5초) 동안 채움
+    limiter = RateLimiter(rpm=10, tpm=100_000, window=0.5)
+    assert limiter.acquire(timeout=0) and limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=2)
+    assert limiter.stats()["admitted"] == 3
+
+
+def test_waiting_callers_are_admitted_in_arrival_order():
+    limiter = RateLimiter(rpm=10, tpm=100_000, window=0.5)
+    while limiter.acquire(timeout=0): pass   # 버킷을 비워 모두 대기열에 서게 함
+    order, positions = [], {}
+
+    def caller(i):
+        limiter.acquire(on_wait=lambda pos, eta: positions.setdefault(i, pos))
+        order.append(i)
+
+    threads = []
+    for i in range(5):
+        t = threading.Thread(target=caller, args=(i,))
+        t.start()
+        threads.append(t)
+        assert wait_for(lambda: len(limiter.waiting) + len(order) == i + 1)
+    for t in threads: t.join(5)
+
+    assert order == list(range(5))
+    assert positions == {i: i + 1 for i in range(5)}
+
+
+def test_large_token_requests_block_the_queue_head():
+    # 토큰 할당량이 모자라면 요청 수 여유가 있어도 기다림
+    limiter = RateLimiter(rpm=1000, tpm=100, window=0.5)
+    assert limiter.acquire(tokens=20, timeout=0)
+    assert not limiter.acquire(tokens=20, timeout=0)
+    assert limiter.acquire(tokens=20, timeout=2)
+
+
+def test_penalize_pauses_and_abandon_leaves_the_queue():
+    limiter = RateLimiter(rpm=1000, tpm=100_000, window=0.5)
+    limiter.penalize(10)
+    assert limiter.headroom() == 0.0
+    assert not limiter.acquire(timeout=0.05)
+    assert not limiter.acquire(abandon=lambda: True)
+    assert limiter.stats()["queued"] == 0
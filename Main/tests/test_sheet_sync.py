@@ -0,0 +1,62 @@
+import pytest
+from modules.sheet_sync import SheetSync
+from modules.sheets_backend import SheetsStorage
+from modules.sqlite_backend import SQLiteStorage
+from modules.storage import ToolStorage
+from benchmarks.fake_sheets import FakeClient, FakeWorksheet, make_rows
+
+NAME, COUNT = 3, 8   # HEADER 의 '추천도구' / '추천수' 위치
+
+
+def make_sync(tmp_path, rows=20):
+    ws = FakeWorksheet(make_rows(rows))
+    local = SQLiteStorage(str(tmp_path / "tools.db"))
+    sheet = SheetsStorage(lambda: FakeClient(ws, FakeWorksheet([])), "fake")
+    sync = SheetSync(local, sheet)
+    assert sync.sync_once() == "pull"
+    return ws, local, sync
+
+
+def sheet_counts(ws):
+    return {r[NAME]: r[COUNT] for r in ws.values[1:]}
+
+
+def test_push_writes_only_the_changed_rows(tmp_path):
+    ws, local, sync = make_sync(tmp_path)
+    ws.reset_stats()
+    assert sync.sync_once() is None and ws.cells == 0
+
+    local.vote("Tool-3", +5)
+    local.insert_tool({"추천도구": "New Tool", "직무": "기타", "추천수": 1})
+    local.vote("Tool-5", -100, delete_at=-3)
+    ws.reset_stats()
+    assert sync.sync_once() == "push"
+
+    counts = sheet_counts(ws)
+    assert counts["Tool-3"] == "8" and counts["New Tool"] == "1" and "Tool-5" not in counts
+    assert len(counts) == 20
+    # 바뀐 3행 + 헤더/이름 열 읽기만 (시트 전체 재작성 X)
+    assert ws.cells < 20 * 9
+    assert sync.stats()["rows_pushed"] == 3
+    df = local.load_tools()
+    assert sheet_counts(ws) == dict(zip(df['추천도구'], df['추천수'].astype(str)))
+
+
+def test_pull_keeps_local_votes_by_tool_key(tmp_path):
+    ws, local, sync = make_sync(tmp_path)
+    # 사람이 시트에서 이름 표기를 바꾸고(tool_key 는 같음) 점수를 고친 사이 로컬 투표 +2
+    ws.update_cell(2, NAME + 1, " tool-0 ")
+    ws.update_cell(2, COUNT + 1, 10)
+    local.vote("Tool-0", +2)
+
+    assert sync.sync_once() == "pull"
+    assert local.read_score("Tool-0")[0] == 12
+    assert ws.values[1][COUNT] == "12"
+
+
+def test_storage_interface_requires_every_method():
+    class Partial(ToolStorage):
+        def load_tools(self): return None
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,29 @@
+import pytest
+from modules.sheets_backend import SheetsStorage
+from benchmarks.fake_sheets import FakeWorksheet, FakeClient, make_rows
+
+
+def storage_without(column):
+    ws = FakeWorksheet(make_rows(5), rtt=0.0)
+    col = ws.values[0].index(column)
+    for row in ws.values: del row[col]
+    return SheetsStorage(lambda: FakeClient(ws, FakeWorksheet([], rtt=0.0)), "fake://sheet"), ws
+
+
+def test_missing_count_column_fails_with_a_clear_error():
+    storage, ws = storage_without('추천수')
+    name = ws.values[1][ws.values[0].index('추천도구')]
+    before = [list(row) for row in ws.values]
+    with pytest.raises(ValueError, match="'추천수' 열이 없습니다"):
+        storage.vote(name, 1)
+    with pytest.raises(ValueError, match="'추천수' 열이 없습니다"):
+        storage.read_score(name)
+    with pytest.raises(ValueError, match="'추천수' 열이 없습니다"):
+        storage.write_score(name, (2, "0"), 1)
+    assert ws.values == before   # 어느 칸도 고치지 않음
+
+
+def test_missing_name_column_fails_with_a_clear_error():
+    storage, _ = storage_without('추천도구')
+    with pytest.raises(ValueError, match="'추천도구' 열이 없습니다"):
+        storage.vote("ChatGPT", 1)
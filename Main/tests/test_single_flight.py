@@ -0,0 +1,35 @@
+import threading
+import pandas as pd
+from modules import ai_manager
+from benchmarks.fake_gemini import FakeGenerativeModel, install
+from benchmarks.fake_sheets import make_rows, HEADER
+
+DF = pd.DataFrame(make_rows(20), columns=HEADER)
+
+
+def ask_together(questions):
+    """questions 를 동시에 get_ai_response 로 보내고 (답변 목록, 모델 호출 수)를 돌려줍니다."""
+    model = install(ai_manager, FakeGenerativeModel(lambda prompt: f"answer: {prompt}", first_delay=0.3, interval=0.0))
+    answers = [None] * len(questions)
+    barrier = threading.Barrier(len(questions))
+
+    def ask(i):
+        barrier.wait()
+        answers[i] = ai_manager.get_ai_response([{"role": "user", "content": questions[i]}], DF)
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(len(questions))]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return answers, model.calls
+
+
+def test_prompts_differing_only_in_symbols_do_not_coalesce(monkeypatch):
+    # install 이 바꿔 끼우는 함수들은 테스트가 끝나면 되돌림
+    for name in ("get_api_key", "get_shared_api_key", "get_key_pool", "configure_genai"):
+        monkeypatch.setattr(ai_manager, name, getattr(ai_manager, name))
+    answers, calls = ask_together(["C++ 개발자를 위한 도구", "C# 개발자를 위한 도구"])
+    assert calls == 2
+    assert answers == ["answer: C++ 개발자를 위한 도구", "answer: C# 개발자를 위한 도구"]
+
+    answers, calls = ask_together(["C++ 개발자를 위한 도구"] * 2)
+    assert calls == 1 and answers[0] == answers[1]
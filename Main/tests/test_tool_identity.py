@@ -0,0 +1,48 @@
+import pandas as pd
+from modules.sqlite_backend import SQLiteStorage
+from modules.tool_identity import merge_duplicates, tool_key
+
+DIFFERENT = [
+    ("Copilot (GitHub)", "Copilot (Microsoft)"),
+    ("Claude.com", "Claude"),
+    ("Perplexity.ai", "Perplexity"),
+    ("Gemini (무료)", "Gemini"),
+]
+SAME = [
+    ("ChatGPT", " chatgpt "),
+    ("ChatGPT", "ＣｈａｔＧＰＴ"),
+    ("ChatGPT", "Chat GPT"),
+    ("ChatGPT™", "ChatGPT"),
+    ("chatgpt.com", "ChatGPT"),   # 별칭 표에 등록된 이름
+]
+
+
+def test_qualifiers_and_domains_are_not_stripped():
+    for a, b in DIFFERENT:
+        assert tool_key(a) != tool_key(b), (a, b)
+
+
+def test_case_width_whitespace_and_aliases_match():
+    for a, b in SAME:
+        assert tool_key(a) == tool_key(b), (a, b)
+
+
+def test_merge_keeps_distinct_products_apart():
+    names = ["Copilot (GitHub)", "Copilot (Microsoft)", "Gemini", "Gemini (무료)", "gemini "]
+    df = pd.DataFrame({'추천도구': names, '추천수': [1, 2, 3, 4, 5]})
+    merged, report = merge_duplicates(df)
+    assert merged['추천도구'].tolist() == ["Copilot (GitHub)", "Copilot (Microsoft)", "Gemini", "Gemini (무료)"]
+    assert report == [("Gemini", ["gemini "], 8)]
+
+
+def test_sqlite_rekeys_rows_saved_under_older_rules(tmp_path):
+    path = str(tmp_path / "tools.db")
+    storage = SQLiteStorage(path)
+    storage.replace_tools(pd.DataFrame({'추천도구': ["Copilot (GitHub)"], '추천수': [1]}))
+    conn = storage._conn()
+    conn.execute("UPDATE tools SET name_key = 'copilot'")   # 예전 규칙의 키
+    conn.execute("PRAGMA user_version = 1")
+    conn.close()
+    reopened = SQLiteStorage(path)
+    assert reopened.vote("Copilot (Microsoft)", 1) is None
+    assert reopened.vote("copilot (github)", 1) == (2, False)
@@ -0,0 +1,141 @@
+import json
+import threading
+from modules.vote_aggregator import VoteAggregator
+
+
+class MemoryStorage:
+    """read_score / write_score / insert_tool 만 있는 메모리 저장소. fail 이면 모든 호출이 실패."""
+
+    def __init__(self, scores=None, fail=False):
+        self.scores = dict(scores or {})
+        self.rows = {}
+        self.fail = fail
+
+    def read_score(self, name):
+        if self.fail: raise OSError("storage down")
+        if name not in self.scores: return None
+        return self.scores[name], self.scores[name]
+
+    def write_score(self, name, token, score, delete=False):
+        if self.scores.get(name) != token: return False
+        if delete: del self.scores[name]
+        else: self.scores[name] = score
+        return True
+
+    def insert_tool(self, row):
+        name = row['추천도구']
+        if name in self.scores: return False
+        self.scores[name], self.rows[name] = row['추천수'], row
+        return True
+
+
+def aggregator(storage, tmp_path, **kwargs):
+    return VoteAggregator(storage, str(tmp_path / "journal.jsonl"), flush_interval=0.02, **kwargs)
+
+
+def test_like_then_dislike_on_new_tool_in_one_batch_inserts_with_zero(tmp_path):
+    storage = MemoryStorage()
+    agg = aggregator(storage, tmp_path)
+    # 같은 묶음으로 반영되도록 직접 호출
+    agg.append_rows([
+        {"id": "a", "tool": "New Tool", "delta": +1, "row": {"추천도구": "New Tool", "직무": "기타"}},
+        {"id": "b", "tool": "New Tool", "delta": -1, "row": None},
+    ])
+    agg.close()
+    assert storage.scores == {"New Tool": 0}
+
+
+def test_net_zero_on_existing_tool_does_not_write(tmp_path):
+    storage = MemoryStorage({"ChatGPT": 5})
+    agg = aggregator(storage, tmp_path)
+    agg.append_rows([{"id": "a", "tool": "ChatGPT", "delta": +1}, {"id": "b", "tool": "ChatGPT", "delta": -1}])
+    agg.close()
+    assert storage.scores == {"ChatGPT": 5}
+
+
+def test_permanent_storage_error_is_dead_lettered(tmp_path):
+    agg = aggregator(MemoryStorage(fail=True), tmp_path, max_requeues=2)
+    assert agg.submit("ChatGPT", +1)
+    assert agg.wait_idle(10)
+    stats = agg.stats()
+    agg.close()
+    assert stats["requeued"] == 2 and stats["dead_lettered"] == 1
+    with open(agg.dead_letter_path, encoding="utf-8") as f:
+        dead = [json.loads(line) for line in f]
+    assert [(d["tool"], d["delta"], d["attempts"]) for d in dead] == [("ChatGPT", 1, 3)]
+
+
+class FlakyStorage(MemoryStorage):
+    """처음 failures 번 읽기는 실패, 첫 쓰기 직전에는 다른 곳에서 점수를 바꿔 충돌을 냄."""
+
+    def __init__(self, scores, failures=0, edit=0):
+        super().__init__(scores)
+        self.failures = failures
+        self.edit = edit
+
+    def read_score(self, name):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("temporary")
+        return super().read_score(name)
+
+    def write_score(self, name, token, score, delete=False):
+        if self.edit:
+            self.scores[name] += self.edit
+            self.edit = 0
+        return super().write_score(name, token, score, delete)
+
+
+def test_concurrent_votes_are_all_applied(tmp_path):
+    storage = MemoryStorage({"ChatGPT": 0})
+    agg = aggregator(storage, tmp_path)
+
+    def voter(delta):
+        for _ in range(50): agg.submit("ChatGPT", delta)
+
+    threads = [threading.Thread(target=voter, args=(d,)) for d in (+1, +1, +1, -1)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert agg.wait_idle(10)
+    agg.close()
+    assert storage.scores == {"ChatGPT": 100}
+
+
+def test_votes_for_the_same_tool_key_are_netted(tmp_path):
+    storage = MemoryStorage({"ChatGPT": 5})
+    agg = aggregator(storage, tmp_path)
+    agg.append_rows([{"id": "a", "tool": "ChatGPT", "delta": +1}, {"id": "b", "tool": " chatgpt ", "delta": +1}])
+    agg.close()
+    assert storage.scores == {"ChatGPT": 7}
+
+
+def test_failed_tool_is_requeued_without_reapplying_the_others(tmp_path):
+    storage = FlakyStorage({"ChatGPT": 5, "Gemini": 3}, failures=1)
+    agg = aggregator(storage, tmp_path)
+    # 첫 도구(ChatGPT) 읽기만 실패 → ChatGPT 증감분만 다시 저널로
+    agg.append_rows([{"id": "a", "tool": "ChatGPT", "delta": +2}, {"id": "b", "tool": "Gemini", "delta": +1}])
+    assert agg.wait_idle(10)
+    stats = agg.stats()
+    agg.close()
+    assert storage.scores == {"ChatGPT": 7, "Gemini": 4}
+    assert stats["requeued"] == 1 and stats["dead_lettered"] == 0
+
+
+def test_write_conflict_rereads_and_keeps_the_other_update(tmp_path):
+    storage = FlakyStorage({"ChatGPT": 5}, edit=10)
+    agg = aggregator(storage, tmp_path)
+    agg.append_rows([{"id": "a", "tool": "ChatGPT", "delta": +1}])
+    stats = agg.stats()
+    agg.close()
+    assert storage.scores == {"ChatGPT": 16}
+    assert stats["conflicts"] == 1
+
+
+def test_unapplied_journal_is_replayed_on_restart(tmp_path):
+    with open(tmp_path / "journal.jsonl", "w", encoding="utf-8") as f:
+        for i in range(3): f.write(json.dumps({"id": f"old-{i}", "tool": "ChatGPT", "delta": +1}) + "\n")
+    storage = MemoryStorage({"ChatGPT": 0})
+    agg = aggregator(storage, tmp_path)
+    assert agg.wait_idle(10)
+    agg.close()
+    assert storage.scores == {"ChatGPT": 3}